@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""SQLite history of metadata audit runs, with run-to-run diffs and compliance trends."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sqlite3
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+from report_io import METADATA_AUDIT, read_report
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    started_at TEXT NOT NULL,
+    org TEXT NOT NULL,
+    policy_name TEXT NOT NULL,
+    visibility TEXT NOT NULL,
+    checked_repositories INTEGER,
+    non_compliant_count INTEGER,
+    warning_count INTEGER
+);
+CREATE TABLE IF NOT EXISTS repos (
+    id INTEGER PRIMARY KEY,
+    org TEXT NOT NULL,
+    name TEXT NOT NULL,
+    UNIQUE (org, name)
+);
+CREATE TABLE IF NOT EXISTS results (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    repo_id INTEGER NOT NULL REFERENCES repos (id),
+    visibility TEXT NOT NULL,
+    compliant INTEGER NOT NULL,
+    readme_bytes INTEGER,
+    PRIMARY KEY (run_id, repo_id)
+);
+CREATE TABLE IF NOT EXISTS issues (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    repo_id INTEGER NOT NULL REFERENCES repos (id),
+    kind TEXT NOT NULL CHECK (kind IN ('violation', 'warning')),
+    code TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_by_repo ON results (repo_id, run_id);
+CREATE INDEX IF NOT EXISTS issues_by_run ON issues (run_id, repo_id);
+CREATE INDEX IF NOT EXISTS issues_by_repo ON issues (repo_id, run_id);
+"""
+
+# Issues present in the first run but not the second; used both ways round for a diff.
+ISSUE_DIFF = """
+SELECT repos.org, repos.name, issues.kind, issues.code
+FROM issues JOIN repos ON repos.id = issues.repo_id WHERE issues.run_id = ?
+EXCEPT
+SELECT repos.org, repos.name, issues.kind, issues.code
+FROM issues JOIN repos ON repos.id = issues.repo_id WHERE issues.run_id = ?
+ORDER BY 1, 2, 3, 4
+"""
+
+COMPLIANCE_CHANGES = """
+SELECT repos.org, repos.name, new.compliant
+FROM results AS old
+JOIN results AS new ON new.repo_id = old.repo_id AND new.run_id = ?
+JOIN repos ON repos.id = old.repo_id
+WHERE old.run_id = ? AND old.compliant != new.compliant
+ORDER BY 1, 2
+"""
+
+REPOS_ONLY_IN = """
+SELECT repos.org, repos.name FROM results JOIN repos ON repos.id = results.repo_id
+WHERE results.run_id = ? AND results.repo_id NOT IN (SELECT repo_id FROM results WHERE run_id = ?)
+ORDER BY 1, 2
+"""
+
+RUN_KEYS = ("id", "started_at", "org", "policy_name", "visibility", "checked", "non_compliant", "warnings")
+
+
+def utc_now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+def file_time(path: str) -> str:
+    return datetime.fromtimestamp(Path(path).stat().st_mtime, timezone.utc).isoformat(timespec="seconds")
+
+
+class AuditHistory:
+    def __init__(self, path: str) -> None:
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(SCHEMA)
+        self.repo_ids: dict[tuple[str, str], int] = {}
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def start_run(self, header: dict[str, Any], started_at: str | None = None) -> int:
+        # A run stays in an open transaction until finish_run, so an interrupted audit leaves no partial run.
+        cursor = self.connection.execute(
+            "INSERT INTO runs (started_at, org, policy_name, visibility) VALUES (?, ?, ?, ?)",
+            (
+                started_at or utc_now(),
+                header.get("org", ""),
+                header.get("policy_name", ""),
+                header.get("visibility", ""),
+            ),
+        )
+        return int(cursor.lastrowid or 0)
+
+    def add_result(self, run_id: int, result: dict[str, Any], default_org: str = "") -> None:
+        repo_id = self.repo_id(result.get("org") or default_org, result["name"])
+        # A skipped README is reported as 0 bytes; the history keeps it apart from an empty one.
+        readme_bytes = None if "readme" in result.get("skipped_fetches", []) else result["readme_bytes"]
+        self.connection.execute(
+            "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)",
+            (run_id, repo_id, result["visibility"], 0 if result["violations"] else 1, readme_bytes),
+        )
+        self.connection.executemany(
+            "INSERT INTO issues VALUES (?, ?, ?, ?)",
+            [(run_id, repo_id, "violation", code) for code in result["violations"]]
+            + [(run_id, repo_id, "warning", code) for code in result["warnings"]],
+        )
+
+    def finish_run(self, run_id: int, summary: dict[str, Any]) -> None:
+        self.connection.execute(
+            "UPDATE runs SET checked_repositories = ?, non_compliant_count = ?, warning_count = ?"
+            " WHERE id = ?",
+            (
+                summary["checked_repositories"],
+                summary["non_compliant_count"],
+                summary["warning_count"],
+                run_id,
+            ),
+        )
+        self.connection.commit()
+
+    def repo_id(self, org: str, name: str) -> int:
+        key = (org, name)
+        if key not in self.repo_ids:
+            self.connection.execute("INSERT OR IGNORE INTO repos (org, name) VALUES (?, ?)", key)
+            row = self.connection.execute("SELECT id FROM repos WHERE org = ? AND name = ?", key).fetchone()
+            self.repo_ids[key] = int(row[0])
+        return self.repo_ids[key]
+
+    def import_report(self, payload: dict[str, Any], started_at: str | None = None) -> int:
+        run_id = self.start_run(payload, started_at)
+        for result in payload["results"]:
+            self.add_result(run_id, result, payload.get("org", ""))
+        self.finish_run(run_id, payload)
+        return run_id
+
+    def runs(self, last: int | None = None) -> list[dict[str, Any]]:
+        rows = self.connection.execute(
+            "SELECT id, started_at, org, policy_name, visibility, checked_repositories, non_compliant_count,"
+            " warning_count FROM runs WHERE checked_repositories IS NOT NULL ORDER BY id DESC LIMIT ?",
+            (-1 if last is None else last,),
+        ).fetchall()
+        return [dict(zip(RUN_KEYS, row)) for row in reversed(rows)]
+
+    def latest_run_ids(self, count: int) -> list[int]:
+        return [run["id"] for run in self.runs(count)]
+
+    def diff(self, old_run: int, new_run: int) -> dict[str, Any]:
+        def issues(first: int, second: int) -> list[dict[str, str]]:
+            rows = self.connection.execute(ISSUE_DIFF, (first, second)).fetchall()
+            return [{"repo": f"{org}/{name}", "kind": kind, "code": code} for org, name, kind, code in rows]
+
+        def repos(first: int, second: int) -> list[str]:
+            return [f"{org}/{name}" for org, name in self.connection.execute(REPOS_ONLY_IN, (first, second))]
+
+        changes = self.connection.execute(COMPLIANCE_CHANGES, (new_run, old_run)).fetchall()
+        return {
+            "old_run": old_run,
+            "new_run": new_run,
+            "regressed": [f"{org}/{name}" for org, name, compliant in changes if not compliant],
+            "fixed": [f"{org}/{name}" for org, name, compliant in changes if compliant],
+            "added_issues": issues(new_run, old_run),
+            "resolved_issues": issues(old_run, new_run),
+            "added_repos": repos(new_run, old_run),
+            "removed_repos": repos(old_run, new_run),
+        }
+
+    def repo_history(self, org: str, name: str, last: int | None = None) -> list[dict[str, Any]]:
+        rows = self.connection.execute(
+            "SELECT runs.id, runs.started_at, results.compliant,"
+            " (SELECT group_concat(code, ',') FROM issues"
+            "  WHERE issues.run_id = results.run_id AND issues.repo_id = results.repo_id"
+            "  AND kind = 'violation') FROM results"
+            " JOIN runs ON runs.id = results.run_id JOIN repos ON repos.id = results.repo_id"
+            " WHERE repos.org = ? AND repos.name = ? ORDER BY runs.id DESC LIMIT ?",
+            (org, name, -1 if last is None else last),
+        ).fetchall()
+        return [
+            {"run": run_id, "started_at": started_at, "compliant": bool(compliant), "violations": violations}
+            for run_id, started_at, compliant, violations in reversed(rows)
+        ]
+
+
+def load_report(path: str) -> dict[str, Any]:
+    report, payload = read_report(path)
+    if report != METADATA_AUDIT:
+        raise ValueError(f"{path} is a {report} report, not a metadata audit report")
+    return payload
+
+
+def print_diff(diff: dict[str, Any]) -> None:
+    print(f"Run {diff['old_run']} -> {diff['new_run']}")
+    for heading in ("regressed", "fixed", "added_repos", "removed_repos"):
+        print(f"{heading}: {len(diff[heading])}")
+        for repo in diff[heading]:
+            print(f"  {repo}")
+    for heading, sign in (("added_issues", "+"), ("resolved_issues", "-")):
+        print(f"{heading}: {len(diff[heading])}")
+        for issue in diff[heading]:
+            print(f"  {sign} {issue['repo']}\t{issue['kind']}\t{issue['code']}")
+
+
+def print_runs(runs: list[dict[str, Any]]) -> None:
+    print("run\tstarted_at\torg\tchecked\tnon_compliant\twarnings\tcompliant_pct")
+    for run in runs:
+        checked = run["checked"] or 0
+        percent = 100.0 * (checked - run["non_compliant"]) / checked if checked else 100.0
+        print(
+            f"{run['id']}\t{run['started_at']}\t{run['org']}\t{checked}\t{run['non_compliant']}"
+            f"\t{run['warnings']}\t{percent:.1f}"
+        )
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--db", required=True, help="History database written by repo_metadata_audit.py")
+    commands = parser.add_subparsers(dest="command", required=True)
+    trend = commands.add_parser("trend", help="Per-run compliance counts, oldest first.")
+    trend.add_argument("--last", type=int, default=None, help="Only the most recent N runs")
+    diff = commands.add_parser("diff", help="Compare two runs (default: the latest two).")
+    diff.add_argument("old_run", type=int, nargs="?", default=None)
+    diff.add_argument("new_run", type=int, nargs="?", default=None)
+    diff.add_argument("--json", action="store_true", help="Print the diff as JSON")
+    repo = commands.add_parser("repo", help="Compliance history of one repo.")
+    repo.add_argument("repo", help="org/name")
+    repo.add_argument("--last", type=int, default=None, help="Only the most recent N runs")
+    record = commands.add_parser("import", help="Add existing JSON or NDJSON reports as runs, in order.")
+    record.add_argument("reports", nargs="+", help="Report files")
+    args = parser.parse_args()
+    if args.command == "diff" and (args.old_run is None) != (args.new_run is None):
+        parser.error("diff takes either two run ids or none")
+    if args.command == "repo" and "/" not in args.repo:
+        parser.error("repo must be given as org/name")
+    return args
+
+
+def main() -> int:
+    args = parse_args()
+    history = AuditHistory(args.db)
+    try:
+        if args.command == "import":
+            for path in args.reports:
+                run_id = history.import_report(load_report(path), file_time(path))
+                print(f"{path}\trun {run_id}")
+        elif args.command == "trend":
+            print_runs(history.runs(args.last))
+        elif args.command == "diff":
+            if args.old_run is None:
+                latest = history.latest_run_ids(2)
+                if len(latest) < 2:
+                    print("diff needs at least two recorded runs", file=sys.stderr)
+                    return 1
+                args.old_run, args.new_run = latest
+            diff = history.diff(args.old_run, args.new_run)
+            if args.json:
+                print(json.dumps(diff, indent=2))
+            else:
+                print_diff(diff)
+            return 1 if diff["regressed"] else 0
+        elif args.command == "repo":
+            org, name = args.repo.split("/", 1)
+            print("run\tstarted_at\tcompliant\tviolations")
+            for row in history.repo_history(org, name, args.last):
+                compliant = "yes" if row["compliant"] else "no"
+                print(f"{row['run']}\t{row['started_at']}\t{compliant}\t{row['violations'] or '-'}")
+    finally:
+        history.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
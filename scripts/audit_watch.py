@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+"""Webhook-driven watch mode: re-audit only the repositories that events touch."""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import hmac
+import json
+import signal
+import sys
+import threading
+import time
+import urllib.request
+from collections.abc import Iterable
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+
+from github_client import GitHubClient, add_transport_arguments, client_from_args
+from repo_metadata_audit import (
+    CompiledPolicy,
+    RepoResult,
+    audit_repos,
+    compile_policy,
+    fetch_and_evaluate,
+    fetch_repo_record,
+    include_repo,
+    iter_repository_pages,
+    iter_targets,
+    load_policy,
+    policy_fingerprints,
+    result_from_dict,
+    result_to_dict,
+)
+from report_io import METADATA_AUDIT, build_report, read_report, summarize_results, write_json_report
+from work_pool import ordered_map, round_robin
+
+WATCHED_EVENTS = ("repository", "label", "push", "security_and_analysis")
+RepoKey = tuple[str, str]
+
+
+def repos_from_event(event: str, payload: dict[str, Any]) -> list[RepoKey]:
+    if event not in WATCHED_EVENTS:
+        return []
+    repository = payload.get("repository") or {}
+    owner = (repository.get("owner") or {}).get("login") or (payload.get("organization") or {}).get("login")
+    if not owner or not repository.get("name"):
+        return []
+    keys = [(owner, repository["name"])]
+    # A rename keeps the index honest by re-auditing the old name too, which then drops out as not found.
+    previous_name = ((payload.get("changes") or {}).get("repository") or {}).get("name", {}).get("from")
+    if event == "repository" and payload.get("action") == "renamed" and previous_name:
+        keys.append((owner, previous_name))
+    return keys
+
+
+def signature_matches(secret: str, body: bytes, signature: str) -> bool:
+    expected = "sha256=" + hmac.new(secret.encode("utf-8"), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature)
+
+
+# A touched repo becomes due `delay` seconds after its first event since it was last taken, so a burst of
+# pushes, label edits and settings changes costs one re-audit and a steady stream cannot starve it.
+class RepoCoalescer:
+    def __init__(self, delay: float) -> None:
+        self.delay = delay
+        self.condition = threading.Condition()
+        self.pending: dict[RepoKey, float] = {}
+        self.active = 0
+        self.received = 0
+        self.coalesced = 0
+        self.closed = False
+
+    def add(self, key: RepoKey) -> None:
+        with self.condition:
+            self.received += 1
+            if key in self.pending:
+                self.coalesced += 1
+                return
+            self.pending[key] = time.monotonic() + self.delay
+            self.condition.notify_all()
+
+    def take_due(self) -> list[RepoKey]:
+        with self.condition:
+            while not self.closed:
+                now = time.monotonic()
+                due = sorted(key for key, deadline in self.pending.items() if deadline <= now)
+                if due:
+                    for key in due:
+                        del self.pending[key]
+                    self.active += len(due)
+                    return due
+                timeout = min(self.pending.values()) - now if self.pending else None
+                self.condition.wait(timeout)
+            return []
+
+    def done(self, count: int) -> None:
+        with self.condition:
+            self.active -= count
+            self.condition.notify_all()
+
+    def wait_idle(self, timeout: float) -> bool:
+        with self.condition:
+            return self.condition.wait_for(lambda: not self.pending and not self.active, timeout)
+
+    def close(self) -> None:
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+
+class ComplianceIndex:
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.results: dict[RepoKey, RepoResult] = {}
+
+    def update(self, result: RepoResult) -> None:
+        with self.lock:
+            self.results[(result.org, result.name)] = result
+
+    def remove(self, key: RepoKey) -> None:
+        with self.lock:
+            self.results.pop(key, None)
+
+    def get(self, key: RepoKey) -> RepoResult | None:
+        with self.lock:
+            return self.results.get(key)
+
+    def report(self, header: dict[str, Any]) -> dict[str, Any]:
+        with self.lock:
+            rows = [result_to_dict(self.results[key]) for key in sorted(self.results)]
+        return build_report(header, summarize_results(METADATA_AUDIT, rows), rows)
+
+
+class AuditWatcher:
+    def __init__(
+        self,
+        client: GitHubClient,
+        orgs: list[str],
+        policy: CompiledPolicy,
+        header: dict[str, Any],
+        visibility: str,
+        excluded: set[str],
+        concurrency: int = 4,
+        coalesce_seconds: float = 5.0,
+    ) -> None:
+        self.client = client
+        # Logins are case-insensitive, so events are matched to the configured spelling of each org.
+        self.orgs = {org.lower(): org for org in orgs}
+        self.policy = policy
+        self.header = header
+        self.visibility = visibility
+        self.excluded = excluded
+        self.concurrency = concurrency
+        self.coalescer = RepoCoalescer(coalesce_seconds)
+        self.index = ComplianceIndex()
+        self.audits = 0
+        self.failures = 0
+        self.thread: threading.Thread | None = None
+
+    def seed(self, results: Iterable[RepoResult]) -> None:
+        for result in results:
+            self.index.update(result)
+
+    def handle_event(self, event: str, payload: dict[str, Any]) -> bool:
+        keys = [
+            (self.orgs[owner.lower()], name)
+            for owner, name in repos_from_event(event, payload)
+            if owner.lower() in self.orgs
+        ]
+        for key in keys:
+            self.coalescer.add(key)
+        return bool(keys)
+
+    def audit(self, key: RepoKey) -> bool:
+        org, name = key
+        try:
+            record = fetch_repo_record(self.client, org, name)
+            if record is None or not include_repo(record, self.visibility, self.excluded):
+                self.index.remove(key)
+                return True
+            result = fetch_and_evaluate(self.client, org, record, self.policy, None)
+        except Exception as error:
+            # Anything escaping here would end the worker thread while webhooks keep being accepted.
+            print(f"{org}/{name}: keeping previous result, {error}", file=sys.stderr)
+            return False
+        result.org = org
+        self.index.update(result)
+        return True
+
+    def run(self) -> None:
+        while True:
+            keys = self.coalescer.take_due()
+            if not keys:
+                return
+            try:
+                for audited in ordered_map(self.audit, keys, self.concurrency):
+                    self.failures += 0 if audited else 1
+            finally:
+                self.audits += len(keys)
+                self.coalescer.done(len(keys))
+
+    def scan(self) -> None:
+        pages = round_robin([iter_repository_pages(self.client, org) for org in self.orgs.values()])
+        targets = iter_targets(pages, self.visibility, self.excluded)
+        for result in audit_repos(self.client, "", targets, self.policy, self.concurrency):
+            self.index.update(result)
+
+    def start(self) -> None:
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        self.coalescer.close()
+        if self.thread is not None:
+            self.thread.join()
+
+    def status(self) -> dict[str, Any]:
+        with self.coalescer.condition:
+            pending = len(self.coalescer.pending)
+            received, coalesced = self.coalescer.received, self.coalescer.coalesced
+        return {
+            "received": received,
+            "coalesced": coalesced,
+            "pending": pending,
+            "audits": self.audits,
+            "failures": self.failures,
+            "worker_alive": self.thread is not None and self.thread.is_alive(),
+            "indexed": len(self.index.results),
+        }
+
+    def report(self) -> dict[str, Any]:
+        return self.index.report(self.header)
+
+
+def make_server(watcher: AuditWatcher, host: str, port: int, secret: str | None) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format: str, *args: Any) -> None:
+            pass
+
+        def reply(self, status: int, payload: Any) -> None:
+            data = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self) -> None:
+            if self.path == "/report":
+                self.reply(200, watcher.report())
+            elif self.path == "/status":
+                self.reply(200, watcher.status())
+            else:
+                self.reply(404, {"message": "Not Found"})
+
+        def do_POST(self) -> None:
+            body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            if secret and not signature_matches(secret, body, self.headers.get("X-Hub-Signature-256", "")):
+                self.reply(401, {"message": "bad signature"})
+                return
+            try:
+                payload = json.loads(body or b"{}")
+            except ValueError:
+                self.reply(400, {"message": "body is not JSON"})
+                return
+            queued = watcher.handle_event(self.headers.get("X-GitHub-Event", ""), payload)
+            self.reply(202, {"status": "queued" if queued else "ignored"})
+
+    return ThreadingHTTPServer((host, port), Handler)
+
+
+def load_seed_results(path: str) -> list[RepoResult]:
+    _, payload = read_report(path)
+    results = [result_from_dict(row) for row in payload.get("results", [])]
+    for result in results:
+        result.org = result.org or payload.get("org", "")
+    return results
+
+
+def iter_replay_events(paths: Iterable[str]) -> Iterable[tuple[str, dict[str, Any]]]:
+    for path in paths:
+        for line in Path(path).read_text(encoding="utf-8").splitlines():
+            if line.strip():
+                record = json.loads(line)
+                yield record["event"], record["payload"]
+
+
+def replay(url: str, events: Iterable[tuple[str, dict[str, Any]]], secret: str | None, delay: float) -> int:
+    sent = 0
+    for event, payload in events:
+        body = json.dumps(payload).encode("utf-8")
+        headers = {"Content-Type": "application/json", "X-GitHub-Event": event}
+        if secret:
+            headers["X-Hub-Signature-256"] = "sha256=" + hmac.new(
+                secret.encode("utf-8"), body, hashlib.sha256
+            ).hexdigest()
+        request = urllib.request.Request(url, data=body, headers=headers, method="POST")
+        with urllib.request.urlopen(request) as response:
+            response.read()
+        sent += 1
+        if delay:
+            time.sleep(delay)
+    return sent
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser("serve", help="Receive webhooks and keep a compliance index up to date.")
+    serve.add_argument("--org", action="append", default=[], required=True, help="Organization (repeatable)")
+    serve.add_argument("--policy", default="config/repo-metadata-policy.json", help="JSON policy config")
+    serve.add_argument("--visibility", choices=("public", "private", "all"), default=None)
+    serve.add_argument("--host", default="127.0.0.1", help="Listen address (default: 127.0.0.1)")
+    serve.add_argument("--port", type=int, default=8787, help="Listen port (default: 8787)")
+    serve.add_argument("--coalesce-seconds", type=float, default=5.0, help="Wait before re-auditing a repo")
+    serve.add_argument("--concurrency", type=int, default=4, help="Repos re-audited in parallel")
+    serve.add_argument("--webhook-secret", default=None, help="Verify X-Hub-Signature-256 with this secret")
+    serve.add_argument("--seed-report", default=None, help="JSON or NDJSON report that fills the index")
+    serve.add_argument("--initial-scan", action="store_true", help="Audit every repo before listening")
+    serve.add_argument("--output-json", default=None, help="Write the index as a report on shutdown")
+    add_transport_arguments(serve)
+
+    send = commands.add_parser("replay", help="POST recorded webhook payloads to a watch endpoint.")
+    send.add_argument("events", nargs="+", help='NDJSON files of {"event": ..., "payload": ...} lines')
+    send.add_argument("--url", default="http://127.0.0.1:8787/", help="Watch endpoint")
+    send.add_argument("--webhook-secret", default=None, help="Sign payloads with this secret")
+    send.add_argument("--delay-ms", type=float, default=0.0, help="Pause between events")
+
+    dump = commands.add_parser("dump", help="Write the watch endpoint's current index as a JSON report.")
+    dump.add_argument("output", help="Output JSON report path")
+    dump.add_argument("--url", default="http://127.0.0.1:8787/", help="Watch endpoint")
+
+    args = parser.parse_args()
+    if args.command == "serve" and args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    return args
+
+
+def serve(args: argparse.Namespace) -> int:
+    policy = load_policy(args.policy)
+    visibility = args.visibility or policy.get("default_visibility", "public")
+    orgs = list(dict.fromkeys(args.org))
+    compiled = compile_policy(policy)
+    header = {
+        "org": ", ".join(orgs),
+        "orgs": orgs,
+        "policy_name": compiled.name,
+        "visibility": visibility,
+        "policy_fingerprints": policy_fingerprints(policy),
+    }
+    watcher = AuditWatcher(
+        client_from_args(args),
+        orgs,
+        compiled,
+        header,
+        visibility,
+        set(policy.get("exclude_repositories", [])),
+        args.concurrency,
+        args.coalesce_seconds,
+    )
+    if args.seed_report:
+        watcher.seed(load_seed_results(args.seed_report))
+    if args.initial_scan:
+        watcher.scan()
+    server = make_server(watcher, args.host, args.port, args.webhook_secret)
+    watcher.start()
+    signal.signal(signal.SIGTERM, lambda *_: threading.Thread(target=server.shutdown).start())
+    print(f"Watching {header['org']} on http://{args.host}:{server.server_address[1]}/", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        watcher.stop()
+        if args.output_json:
+            write_json_report(args.output_json, watcher.report())
+    return 0
+
+
+def main() -> int:
+    args = parse_args()
+    if args.command == "serve":
+        return serve(args)
+    if args.command == "replay":
+        sent = replay(args.url, iter_replay_events(args.events), args.webhook_secret, args.delay_ms / 1000)
+        print(f"Replayed {sent} events", file=sys.stderr)
+        return 0
+    with urllib.request.urlopen(args.url.rstrip("/") + "/report") as response:
+        write_json_report(args.output, json.loads(response.read()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""Benchmark the org scripts against a synthetic org served by fake_github.py."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shlex
+import subprocess
+import sys
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+from fake_github import FakeGitHubServer, SyntheticOrg, add_server_arguments
+from instrumentation import percentile
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+DEFAULT_POLICY = SCRIPTS_DIR.parent / "config" / "repo-metadata-policy.json"
+SCRIPT_COMMANDS = {
+    "audit": ["repo_metadata_audit.py", "--policy", str(DEFAULT_POLICY), "--visibility", "all"],
+    "baseline": ["enforce_security_baseline.py", "--visibility", "all"],
+}
+
+
+@dataclass
+class BenchmarkResult:
+    script: str
+    repos: int
+    exit_code: int
+    wall_seconds: float
+    api_calls: int
+    calls_by_endpoint: dict[str, int]
+    statuses: dict[str, int]
+    peak_rss_mb: float
+    repo_latency_p50_ms: float
+    repo_latency_p95_ms: float
+    repo_latency_max_ms: float
+
+
+def run_script(command: list[str], env: dict[str, str]) -> tuple[int, float, float]:
+    started = time.perf_counter()
+    process = subprocess.Popen(command, cwd=SCRIPTS_DIR, env=env, stdout=subprocess.DEVNULL)
+    _, status, usage = os.wait4(process.pid, 0)
+    elapsed = time.perf_counter() - started
+    process.returncode = os.waitstatus_to_exitcode(status)
+    # ru_maxrss is kilobytes on Linux and bytes on macOS.
+    peak_rss_mb = usage.ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+    return process.returncode, elapsed, peak_rss_mb
+
+
+def benchmark_script(
+    server: FakeGitHubServer,
+    script: str,
+    org: str,
+    concurrency: int,
+    extra_args: list[str],
+) -> BenchmarkResult:
+    server.reset_stats()
+    command = [
+        sys.executable,
+        *SCRIPT_COMMANDS[script],
+        "--org",
+        org,
+        "--transport",
+        "http",
+        "--api-url",
+        server.url,
+        "--concurrency",
+        str(concurrency),
+        *extra_args,
+    ]
+    env = {**os.environ, "GH_TOKEN": "benchmark-token"}
+    exit_code, wall_seconds, peak_rss_mb = run_script(command, env)
+    latencies = [seconds * 1000 for seconds in server.repo_latencies()]
+    return BenchmarkResult(
+        script=script,
+        repos=len(server.org.repos),
+        exit_code=exit_code,
+        wall_seconds=round(wall_seconds, 3),
+        api_calls=sum(server.calls.values()),
+        calls_by_endpoint=dict(sorted(server.calls.items())),
+        statuses={str(status): count for status, count in sorted(server.statuses.items())},
+        peak_rss_mb=round(peak_rss_mb, 1),
+        repo_latency_p50_ms=round(percentile(latencies, 0.50), 2),
+        repo_latency_p95_ms=round(percentile(latencies, 0.95), 2),
+        repo_latency_max_ms=round(max(latencies, default=0.0), 2),
+    )
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--repos",
+        type=int,
+        action="append",
+        default=None,
+        help="Synthetic org size (repeatable, 100 to 50000; default: 100 and 1000).",
+    )
+    parser.add_argument(
+        "--script",
+        choices=tuple(SCRIPT_COMMANDS),
+        action="append",
+        default=None,
+        help="Script to benchmark (repeatable; default: both).",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Synthetic org seed")
+    parser.add_argument("--max-readme-kb", type=int, default=64, help="Upper bound for large README bodies")
+    parser.add_argument("--concurrency", type=int, default=8, help="--concurrency passed to the scripts")
+    parser.add_argument("--audit-args", default="", help="Extra arguments for repo_metadata_audit.py")
+    parser.add_argument("--baseline-args", default="", help="Extra arguments for the baseline script")
+    parser.add_argument("--output-json", default=None, help="Optional output path for the results")
+    add_server_arguments(parser)
+    return parser.parse_args()
+
+
+def print_result_row(result: BenchmarkResult) -> None:
+    print(
+        f"{result.script}\t{result.repos}\t{result.exit_code}\t{result.wall_seconds:.2f}\t{result.api_calls}"
+        f"\t{result.peak_rss_mb:.1f}\t{result.repo_latency_p50_ms:.1f}\t{result.repo_latency_p95_ms:.1f}",
+        flush=True,
+    )
+
+
+def main() -> int:
+    args = parse_args()
+    sizes = args.repos or [100, 1000]
+    scripts = args.script or list(SCRIPT_COMMANDS)
+    extra = {"audit": shlex.split(args.audit_args), "baseline": shlex.split(args.baseline_args)}
+    results: list[BenchmarkResult] = []
+    print("script\trepos\texit\twall_s\tapi_calls\tpeak_rss_mb\trepo_p50_ms\trepo_p95_ms")
+    for size in sizes:
+        for script in scripts:
+            # A fresh org per script keeps baseline writes from leaking into the next measurement.
+            org = SyntheticOrg("bench-org", size, args.seed, args.max_readme_kb)
+            server = FakeGitHubServer(
+                org,
+                latency_ms=args.latency_ms,
+                jitter_ms=args.jitter_ms,
+                rate_limit=args.rate_limit,
+                rate_window=args.rate_window,
+                max_inflight=args.max_inflight,
+            )
+            server.start()
+            try:
+                result = benchmark_script(server, script, org.name, args.concurrency, extra[script])
+            finally:
+                server.stop()
+            print_result_row(result)
+            results.append(result)
+
+    if args.output_json:
+        payload: dict[str, Any] = {"results": [asdict(result) for result in results]}
+        Path(args.output_json).write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,74 @@
+"""Append-only journal of completed (repo, step) pairs for resumable baseline backfills."""
+
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+
+class CheckpointJournal:
+    def __init__(self, path: str, org: str, resume: bool = False, overwrite: bool = False) -> None:
+        self.path = Path(path)
+        self.org = org
+        self.lock = threading.Lock()
+        self.completed: dict[str, set[str]] = {}
+        if resume and self.path.exists():
+            has_header = self.load()
+            self.handle = self.path.open("a", encoding="utf-8")
+            if not has_header:
+                self.append({"org": org})
+        else:
+            # Rerunning the original command after a crash must not throw away the progress it recorded.
+            if not resume and not overwrite and self.path.exists() and self.path.stat().st_size > 0:
+                raise ValueError(
+                    f"Journal {self.path} already has records; --resume it or pass --overwrite-journal"
+                )
+            self.handle = self.path.open("w", encoding="utf-8")
+            self.append({"org": org})
+
+    def load(self) -> bool:
+        with self.path.open(encoding="utf-8") as handle:
+            lines = handle.read().split("\n")
+        has_header = False
+        # The last element is "" after a clean write or a torn record after a crash; drop it either way.
+        for line in lines[:-1]:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if "org" in record:
+                if record["org"] != self.org:
+                    raise ValueError(f"Journal {self.path} belongs to org {record['org']}, not {self.org}")
+                has_header = True
+                continue
+            self.completed.setdefault(record["repo"], set()).add(record["step"])
+        if lines[-1]:
+            # Rewritten beside the journal and swapped in, so a crash here cannot lose the completed records.
+            handle, temp_path = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+            with os.fdopen(handle, "w", encoding="utf-8") as out:
+                out.write("\n".join(lines[:-1]) + "\n")
+                out.flush()
+                os.fsync(out.fileno())
+            os.replace(temp_path, self.path)
+        return has_header
+
+    def append(self, record: dict[str, str]) -> None:
+        self.handle.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self.handle.flush()
+        os.fsync(self.handle.fileno())
+
+    def record(self, repo: str, step: str) -> None:
+        with self.lock:
+            if step in self.completed.get(repo, ()):
+                return
+            self.append({"repo": repo, "step": step})
+            self.completed.setdefault(repo, set()).add(step)
+
+    def steps_done(self, repo: str) -> set[str]:
+        with self.lock:
+            return set(self.completed.get(repo, ()))
+
+    def close(self) -> None:
+        self.handle.close()
@@ -4,20 +4,43 @@
 from __future__ import annotations
 
 import argparse
-import json
-import os
-import subprocess
 import sys
 import time
-from dataclasses import dataclass
-from pathlib import Path
+from collections.abc import Callable, Iterator
+from concurrent.futures import Executor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
 from typing import Any
 
+from checkpoint_journal import CheckpointJournal
+from github_client import (
+    ApiError,
+    GitHubClient,
+    OfflineTransport,
+    add_transport_arguments,
+    client_from_args,
+    next_page_query,
+)
+from instrumentation import CallRecorder, print_profile, timed_phase
+from report_io import SECURITY_BASELINE, NdjsonReportWriter, build_report, write_json_report
+from snapshot_io import Snapshot, load_snapshot
+from work_pool import add_shard_argument, in_shard, ordered_map
+
+ALERTS_PROPAGATION_DELAYS = (0.5, 1.0, 2.0, 4.0)
+CONFIGURATION_PENDING_STATUSES = ("attaching", "updating")
+CONFIGURATION_APPLIED_STATUSES = ("attached", "enforced")
+CONFIGURATION_STEP = "code_security_configuration"
+
 
 @dataclass
 class RepoRecord:
     name: str
     is_private: bool
+    security_and_analysis: dict[str, Any] | None = None
+    repo_id: int | None = None
+    # Captured by a snapshot; None means read them from the API.
+    vulnerability_alerts: bool | None = None
+    codeql_state: str | None = None
 
 
 @dataclass
@@ -50,37 +73,87 @@ def parse_args() -> argparse.Namespace:
         default=None,
         help="Optional output path for full run report.",
     )
+    parser.add_argument(
+        "--output-ndjson",
+        default=None,
+        help="Optional NDJSON run report, appended as each repo finishes (see report_io.py to-json).",
+    )
     parser.add_argument(
         "--strict",
         action="store_true",
         help="Exit non-zero if any repository fails baseline application.",
     )
-    return parser.parse_args()
-
-
-def run_gh(args: list[str]) -> tuple[int, str, str]:
-    env = os.environ.copy()
-    if "GH_TOKEN" not in env and "GITHUB_TOKEN" in env:
-        env["GH_TOKEN"] = env["GITHUB_TOKEN"]
-    proc = subprocess.run(
-        ["gh", *args],
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        text=True,
-        env=env,
-        check=False,
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=1,
+        help="Repositories processed in parallel; independent steps within a repo also overlap.",
     )
-    return proc.returncode, proc.stdout, proc.stderr
-
-
-def gh_json(args: list[str]) -> Any:
-    code, out, err = run_gh(args)
-    if code != 0:
-        raise RuntimeError(err.strip() or f"gh command failed: {' '.join(args)}")
-    return json.loads(out)
-
-
-def list_repos(org: str) -> list[RepoRecord]:
+    parser.add_argument(
+        "--read-first",
+        action="store_true",
+        help="Read current settings first and write only the controls that differ from the baseline.",
+    )
+    parser.add_argument(
+        "--plan",
+        action="store_true",
+        help="Print the per-repo diff against the baseline without applying it (implies --read-first).",
+    )
+    parser.add_argument(
+        "--configuration-id",
+        type=int,
+        default=None,
+        help="Org code security configuration to attach in bulk; uncovered repos get per-repo calls.",
+    )
+    parser.add_argument(
+        "--attach-batch-size",
+        type=int,
+        default=100,
+        help="Repository IDs per configuration attach request.",
+    )
+    parser.add_argument(
+        "--attach-timeout",
+        type=float,
+        default=900.0,
+        help="Seconds to wait for configuration attachment before falling back to per-repo calls.",
+    )
+    journal = parser.add_mutually_exclusive_group()
+    journal.add_argument(
+        "--journal",
+        default=None,
+        help="Record each completed repo/step to this new file so an interrupted run can --resume.",
+    )
+    journal.add_argument(
+        "--resume",
+        default=None,
+        metavar="JOURNAL",
+        help="Skip repo/steps already completed in JOURNAL and keep appending to it.",
+    )
+    parser.add_argument(
+        "--overwrite-journal",
+        action="store_true",
+        help="Let --journal replace an existing journal instead of refusing to discard its records.",
+    )
+    parser.add_argument(
+        "--snapshot",
+        default=None,
+        help="Plan against a file from org_snapshot.py instead of the live API (requires --plan).",
+    )
+    add_shard_argument(parser)
+    add_transport_arguments(parser)
+    args = parser.parse_args()
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    if args.attach_batch_size < 1:
+        parser.error("--attach-batch-size must be at least 1")
+    if args.plan and (args.journal or args.resume):
+        parser.error("--journal/--resume have no effect with --plan")
+    if args.snapshot and not args.plan:
+        parser.error("--snapshot is read-only and requires --plan")
+    return args
+
+
+def iter_repos(client: GitHubClient, org: str) -> Iterator[RepoRecord]:
     query = """
     query($org: String!, $cursor: String) {
       organization(login: $org) {
@@ -90,6 +163,7 @@ def list_repos(org: str) -> list[RepoRecord]:
             endCursor
           }
           nodes {
+            databaseId
             name
             isPrivate
           }
@@ -98,20 +172,53 @@ def list_repos(org: str) -> list[RepoRecord]:
     }
     """.strip()
 
-    repos: list[RepoRecord] = []
     cursor = ""
     while True:
-        args = ["api", "graphql", "-f", f"query={query}", "-f", f"org={org}"]
+        variables = {"org": org}
         if cursor:
-            args.extend(["-f", f"cursor={cursor}"])
-        data = gh_json(args)
+            variables["cursor"] = cursor
+        data = client.graphql(query, variables)
         page = data["data"]["organization"]["repositories"]
         for node in page["nodes"]:
-            repos.append(RepoRecord(name=node["name"], is_private=bool(node["isPrivate"])))
+            yield RepoRecord(
+                name=node["name"],
+                is_private=bool(node["isPrivate"]),
+                repo_id=node.get("databaseId"),
+            )
         if not page["pageInfo"]["hasNextPage"]:
             break
         cursor = page["pageInfo"]["endCursor"]
-    return repos
+
+
+def iter_repos_with_security(client: GitHubClient, org: str) -> Iterator[RepoRecord]:
+    page = 1
+    while True:
+        repos = client.rest(
+            "GET",
+            f"orgs/{org}/repos?type=all&sort=full_name&direction=asc&per_page=100&page={page}",
+        )
+        for repo in repos:
+            yield RepoRecord(
+                name=repo["name"],
+                is_private=bool(repo["private"]),
+                security_and_analysis=repo.get("security_and_analysis") or {},
+                repo_id=repo["id"],
+            )
+        if len(repos) < 100:
+            break
+        page += 1
+
+
+def iter_snapshot_repos(snapshot: Snapshot, org: str) -> Iterator[RepoRecord]:
+    for repo in snapshot.repos(org):
+        yield RepoRecord(
+            name=repo.name,
+            is_private=repo.is_private,
+            security_and_analysis=dict(repo.security_and_analysis),
+            repo_id=repo.repo_id,
+            vulnerability_alerts=repo.vulnerability_alerts,
+            codeql_state=repo.codeql_state,
+        )
 
 
 def include_repo(repo: RepoRecord, visibility: str, excluded: set[str]) -> bool:
@@ -126,116 +233,480 @@ def include_repo(repo: RepoRecord, visibility: str, excluded: set[str]) -> bool:
     raise ValueError(f"Unsupported visibility: {visibility}")
 
 
-def api_call(method: str, path: str, fields: list[str] | None = None) -> tuple[bool, str, str]:
-    args = ["api", "-X", method, path, "-H", "Accept: application/vnd.github+json"]
-    for field in fields or []:
-        args.extend(["-f", field])
-    code, out, err = run_gh(args)
-    return (code == 0, out.strip(), err.strip())
+def api_call(
+    client: GitHubClient,
+    method: str,
+    path: str,
+    payload: dict[str, Any] | None = None,
+) -> tuple[bool, str, str]:
+    try:
+        response = client.request(method, path, payload)
+    except RuntimeError as error:
+        return (False, "", str(error))
+    if response.ok:
+        return (True, response.body.decode("utf-8", errors="replace").strip(), "")
+    return (False, "", response.error_message())
+
+
+@dataclass
+class StepOutcome:
+    details: list[str] = field(default_factory=list)
+    errors: list[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
 
 
-def enable_dependabot(repo_full: str, run: RepoRun) -> None:
-    ok, _, err = api_call("PUT", f"repos/{repo_full}/vulnerability-alerts")
+def enable_vulnerability_alerts(client: GitHubClient, repo_full: str, repo: RepoRecord) -> StepOutcome:
+    ok, _, err = api_call(client, "PUT", f"repos/{repo_full}/vulnerability-alerts")
     if ok:
-        run.details.append("vulnerability_alerts=enabled")
-    else:
-        run.errors.append(f"vulnerability_alerts_failed:{err}")
-        return
+        return StepOutcome(details=["vulnerability_alerts=enabled"])
+    return StepOutcome(errors=[f"vulnerability_alerts_failed:{err}"])
+
 
-    ok, _, err = api_call("PUT", f"repos/{repo_full}/automated-security-fixes")
-    if not ok and "Vulnerability alerts must be enabled" in err:
-        time.sleep(1)
-        ok, _, err = api_call("PUT", f"repos/{repo_full}/automated-security-fixes")
+def enable_automated_security_fixes(client: GitHubClient, repo_full: str, repo: RepoRecord) -> StepOutcome:
+    ok, _, err = api_call(client, "PUT", f"repos/{repo_full}/automated-security-fixes")
+    for delay in ALERTS_PROPAGATION_DELAYS:
+        if ok or "Vulnerability alerts must be enabled" not in err:
+            break
+        time.sleep(delay)
+        ok, _, err = api_call(client, "PUT", f"repos/{repo_full}/automated-security-fixes")
     if ok:
-        run.details.append("dependabot_security_updates=enabled")
-    else:
-        run.errors.append(f"automated_security_fixes_failed:{err}")
+        return StepOutcome(details=["dependabot_security_updates=enabled"])
+    return StepOutcome(errors=[f"automated_security_fixes_failed:{err}"])
 
 
-def enable_secret_scanning(repo_full: str, is_private: bool, run: RepoRun) -> None:
+def baseline_security_fields(is_private: bool) -> list[str]:
     fields = [
-        "security_and_analysis[dependabot_security_updates][status]=enabled",
-        "security_and_analysis[secret_scanning][status]=enabled",
-        "security_and_analysis[secret_scanning_push_protection][status]=enabled",
-        "security_and_analysis[secret_scanning_non_provider_patterns][status]=enabled",
+        "dependabot_security_updates",
+        "secret_scanning",
+        "secret_scanning_push_protection",
+        "secret_scanning_non_provider_patterns",
     ]
     if is_private:
-        fields.append("security_and_analysis[code_security][status]=enabled")
+        fields.append("code_security")
+    return fields
+
+
+def security_fields_to_enable(repo: RepoRecord) -> list[str]:
+    fields = baseline_security_fields(repo.is_private)
+    if repo.security_and_analysis is None:
+        return fields
+    current = repo.security_and_analysis
+    return [
+        name
+        for name in fields
+        if name != "dependabot_security_updates" and (current.get(name) or {}).get("status") != "enabled"
+    ]
+
 
-    ok, _, err = api_call("PATCH", f"repos/{repo_full}", fields)
+def enable_secret_scanning(client: GitHubClient, repo_full: str, repo: RepoRecord) -> StepOutcome:
+    settings = {name: {"status": "enabled"} for name in security_fields_to_enable(repo)}
+    ok, _, err = api_call(client, "PATCH", f"repos/{repo_full}", {"security_and_analysis": settings})
     if ok:
-        run.details.append("security_and_analysis_baseline=applied")
-    else:
-        run.errors.append(f"security_and_analysis_failed:{err}")
+        return StepOutcome(details=["security_and_analysis_baseline=applied"])
+    return StepOutcome(errors=[f"security_and_analysis_failed:{err}"])
 
 
-def enable_codeql_default_setup(repo_full: str, run: RepoRun) -> None:
+def enable_codeql_default_setup(client: GitHubClient, repo_full: str, repo: RepoRecord) -> StepOutcome:
     ok, _, err = api_call(
+        client,
         "PATCH",
         f"repos/{repo_full}/code-scanning/default-setup",
-        fields=["state=configured"],
+        {"state": "configured"},
     )
     if ok:
-        run.details.append("codeql_default_setup=configured")
-    else:
-        run.errors.append(f"codeql_default_setup_failed:{err}")
+        return StepOutcome(details=["codeql_default_setup=configured"])
+    return StepOutcome(errors=[f"codeql_default_setup_failed:{err}"])
 
 
-def apply_repo(org: str, repo: RepoRecord) -> RepoRun:
+@dataclass(frozen=True)
+class BaselineStep:
+    name: str
+    apply: Callable[[GitHubClient, str, RepoRecord], StepOutcome]
+    after: tuple[str, ...] = ()
+    requires_success: bool = False
+
+
+# security_and_analysis also sets dependabot_security_updates, so it waits for alerts too.
+BASELINE_STEPS = (
+    BaselineStep("vulnerability_alerts", enable_vulnerability_alerts),
+    BaselineStep(
+        "automated_security_fixes",
+        enable_automated_security_fixes,
+        after=("vulnerability_alerts",),
+        requires_success=True,
+    ),
+    BaselineStep("security_and_analysis", enable_secret_scanning, after=("vulnerability_alerts",)),
+    BaselineStep("codeql_default_setup", enable_codeql_default_setup),
+)
+
+
+def plan_repo(client: GitHubClient, repo_full: str, repo: RepoRecord) -> dict[str, str]:
+    changes: dict[str, str] = {}
+    if repo.vulnerability_alerts is None:
+        alerts_enabled = client.request("GET", f"repos/{repo_full}/vulnerability-alerts").status == 204
+    else:
+        alerts_enabled = repo.vulnerability_alerts
+    if not alerts_enabled:
+        changes["vulnerability_alerts"] = "vulnerability_alerts:disabled->enabled"
+
+    current = repo.security_and_analysis or {}
+    updates_status = (current.get("dependabot_security_updates") or {}).get("status", "unknown")
+    if updates_status != "enabled":
+        changes["automated_security_fixes"] = f"dependabot_security_updates:{updates_status}->enabled"
+    pending_fields = security_fields_to_enable(repo)
+    if pending_fields:
+        changes["security_and_analysis"] = f"security_and_analysis:{'+'.join(pending_fields)}->enabled"
+
+    state = repo.codeql_state if repo.codeql_state is not None else read_codeql_state(client, repo_full)
+    if state != "configured":
+        changes["codeql_default_setup"] = f"codeql_default_setup:{state}->configured"
+    return changes
+
+
+def read_codeql_state(client: GitHubClient, repo_full: str) -> str:
+    codeql = client.request("GET", f"repos/{repo_full}/code-scanning/default-setup")
+    return (codeql.json() or {}).get("state", "unknown") if codeql.ok else "unknown"
+
+
+def step_succeeded(outcome: StepOutcome | None) -> bool:
+    return outcome is not None and outcome.ok
+
+
+def run_steps(
+    client: GitHubClient,
+    repo_full: str,
+    repo: RepoRecord,
+    steps: tuple[BaselineStep, ...],
+    step_executor: Executor | None,
+    journal: CheckpointJournal | None = None,
+) -> dict[str, StepOutcome | None]:
+    outcomes: dict[str, StepOutcome | None] = {}
+    names = {step.name for step in steps}
+    remaining = list(steps)
+    while remaining:
+        ready = [
+            step for step in remaining if all(name in outcomes or name not in names for name in step.after)
+        ]
+        if not ready:
+            raise ValueError(f"Unresolvable step dependencies: {[step.name for step in remaining]}")
+        runnable: list[BaselineStep] = []
+        for step in ready:
+            remaining.remove(step)
+            blocked = step.requires_success and any(
+                name in names and not step_succeeded(outcomes[name]) for name in step.after
+            )
+            if blocked:
+                outcomes[step.name] = None
+            else:
+                runnable.append(step)
+        if step_executor is None or len(runnable) < 2:
+            results = [step.apply(client, repo_full, repo) for step in runnable]
+        else:
+            futures = [step_executor.submit(step.apply, client, repo_full, repo) for step in runnable]
+            results = [future.result() for future in futures]
+        outcomes.update((step.name, result) for step, result in zip(runnable, results))
+        if journal is not None:
+            for step, result in zip(runnable, results):
+                if result.ok:
+                    journal.record(repo.name, step.name)
+    return outcomes
+
+
+def apply_repo(
+    client: GitHubClient,
+    org: str,
+    repo: RepoRecord,
+    step_executor: Executor | None = None,
+    only_steps: set[str] | None = None,
+    journal: CheckpointJournal | None = None,
+) -> RepoRun:
     repo_full = f"{org}/{repo.name}"
     visibility = "private" if repo.is_private else "public"
     run = RepoRun(name=repo.name, visibility=visibility, success=True, details=[], warnings=[], errors=[])
 
-    enable_dependabot(repo_full, run)
-    enable_secret_scanning(repo_full, repo.is_private, run)
-    enable_codeql_default_setup(repo_full, run)
+    done = journal.steps_done(repo.name) if journal is not None else set()
+    steps: list[BaselineStep] = []
+    for step in BASELINE_STEPS:
+        if step.name in done:
+            run.details.append(f"{step.name}=journaled")
+        elif only_steps is not None and step.name not in only_steps:
+            run.details.append(f"{step.name}=unchanged")
+            if journal is not None:
+                journal.record(repo.name, step.name)
+        else:
+            steps.append(step)
+
+    outcomes = run_steps(client, repo_full, repo, tuple(steps), step_executor, journal)
+    for step in steps:
+        outcome = outcomes[step.name]
+        if outcome is not None:
+            run.details.extend(outcome.details)
+            run.errors.extend(outcome.errors)
 
     run.success = not run.errors
     return run
 
 
-def print_report(org: str, results: list[RepoRun]) -> None:
+def process_repo(
+    client: GitHubClient,
+    org: str,
+    repo: RepoRecord,
+    step_executor: Executor | None,
+    mode: str,
+    journal: CheckpointJournal | None = None,
+    recorder: CallRecorder | None = None,
+) -> RepoRun:
+    if mode == "apply" or (journal is not None and journal_covers(journal, repo.name)):
+        with timed_phase(recorder, "apply"):
+            return apply_repo(client, org, repo, step_executor, journal=journal)
+    visibility = "private" if repo.is_private else "public"
+    run = RepoRun(name=repo.name, visibility=visibility, success=True, details=[], warnings=[], errors=[])
+    try:
+        with timed_phase(recorder, "read_state"):
+            changes = plan_repo(client, f"{org}/{repo.name}", repo)
+    except RuntimeError as error:
+        run.success = False
+        run.errors.append(f"read_state_failed:{error}")
+        return run
+    if mode == "diff":
+        with timed_phase(recorder, "apply"):
+            return apply_repo(client, org, repo, step_executor, only_steps=set(changes), journal=journal)
+    run.details.extend(changes[step.name] for step in BASELINE_STEPS if step.name in changes)
+    return run
+
+
+def journal_covers(journal: CheckpointJournal, repo_name: str) -> bool:
+    done = journal.steps_done(repo_name)
+    return CONFIGURATION_STEP in done or all(step.name in done for step in BASELINE_STEPS)
+
+
+def attach_configuration(client: GitHubClient, org: str, configuration_id: int, repo_ids: list[int]) -> None:
+    client.rest(
+        "POST",
+        f"orgs/{org}/code-security/configurations/{configuration_id}/attach",
+        {"scope": "selected", "selected_repository_ids": repo_ids},
+    )
+
+
+def configuration_statuses(
+    client: GitHubClient,
+    org: str,
+    configuration_id: int,
+    statuses: tuple[str, ...],
+) -> dict[int, str]:
+    base_path = f"orgs/{org}/code-security/configurations/{configuration_id}/repositories"
+    query: str | None = f"per_page=100&status={','.join(statuses)}"
+    found: dict[int, str] = {}
+    while query is not None:
+        response = client.request("GET", f"{base_path}?{query}")
+        if not response.ok:
+            raise ApiError(response.status, f"GET {base_path}: {response.error_message()}")
+        for entry in response.json() or []:
+            found[entry["repository"]["id"]] = entry["status"]
+        query = next_page_query(response)
+    return found
+
+
+def wait_for_configuration(client: GitHubClient, org: str, configuration_id: int, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    delay = 2.0
+    while configuration_statuses(client, org, configuration_id, CONFIGURATION_PENDING_STATUSES):
+        if time.monotonic() + delay > deadline:
+            return
+        time.sleep(delay)
+        delay = min(delay * 2, 30.0)
+
+
+def apply_configuration(
+    client: GitHubClient,
+    org: str,
+    configuration_id: int,
+    targets: list[RepoRecord],
+    batch_size: int,
+    timeout: float,
+) -> dict[str, str]:
+    by_id = {repo.repo_id: repo.name for repo in targets if repo.repo_id is not None}
+    attached_ids: list[int] = []
+    repo_ids = list(by_id)
+    for start in range(0, len(repo_ids), batch_size):
+        batch = repo_ids[start : start + batch_size]
+        try:
+            attach_configuration(client, org, configuration_id, batch)
+        except RuntimeError as error:
+            print(f"Configuration attach failed for {len(batch)} repos: {error}", file=sys.stderr)
+            continue
+        attached_ids.extend(batch)
+    if not attached_ids:
+        return {}
+
+    wait_for_configuration(client, org, configuration_id, timeout)
+    applied = configuration_statuses(client, org, configuration_id, CONFIGURATION_APPLIED_STATUSES)
+    return {by_id[repo_id]: applied[repo_id] for repo_id in attached_ids if repo_id in applied}
+
+
+def configuration_run(repo: RepoRecord, status: str) -> RepoRun:
+    visibility = "private" if repo.is_private else "public"
+    run = RepoRun(name=repo.name, visibility=visibility, success=True, details=[], warnings=[], errors=[])
+    run.details.append(f"{CONFIGURATION_STEP}={status}")
+    return run
+
+
+def print_report_header(org: str) -> None:
     print(f"Org: {org}")
     print("")
     print("repo\tvisibility\tsuccess\terrors\twarnings")
-    for run in results:
-        errors = ",".join(run.errors) if run.errors else "-"
-        warnings = ",".join(run.warnings) if run.warnings else "-"
-        print(f"{run.name}\t{run.visibility}\t{'yes' if run.success else 'no'}\t{errors}\t{warnings}")
+
+
+def print_run_row(run: RepoRun) -> None:
+    errors = ",".join(run.errors) if run.errors else "-"
+    warnings = ",".join(run.warnings) if run.warnings else "-"
+    print(f"{run.name}\t{run.visibility}\t{'yes' if run.success else 'no'}\t{errors}\t{warnings}", flush=True)
+
+
+def run_with_configuration(
+    client: GitHubClient,
+    args: argparse.Namespace,
+    targets: list[RepoRecord],
+    process: Callable[[RepoRecord], RepoRun],
+    print_row: Callable[[RepoRun], None],
+    journal: CheckpointJournal | None = None,
+    recorder: CallRecorder | None = None,
+) -> list[RepoRun]:
+    pending = [repo for repo in targets if journal is None or not journal_covers(journal, repo.name)]
+    applied: dict[str, str] = {}
+    if pending:
+        with timed_phase(recorder, "configuration_attach"):
+            applied = apply_configuration(
+                client,
+                args.org,
+                args.configuration_id,
+                pending,
+                args.attach_batch_size,
+                args.attach_timeout,
+            )
+    if journal is not None:
+        for name in applied:
+            journal.record(name, CONFIGURATION_STEP)
+    results: list[RepoRun] = []
+    for repo in targets:
+        if repo.name in applied:
+            run = configuration_run(repo, applied[repo.name])
+            print_row(run)
+            results.append(run)
+    # Fallback rows follow the attached ones and are printed (and streamed) as each repo finishes.
+    fallback = [repo for repo in targets if repo.name not in applied]
+    for run in ordered_map(process, fallback, args.concurrency):
+        print_row(run)
+        results.append(run)
+    return results
+
+
+def run_to_dict(run: RepoRun) -> dict[str, Any]:
+    return {
+        "name": run.name,
+        "visibility": run.visibility,
+        "success": run.success,
+        "details": run.details,
+        "warnings": run.warnings,
+        "errors": run.errors,
+    }
+
+
+def print_and_record(print_row: Callable[[RepoRun], None], ndjson: NdjsonReportWriter, run: RepoRun) -> None:
+    print_row(run)
+    ndjson.write_result(run_to_dict(run))
+
+
+def print_plan_header(org: str) -> None:
+    print(f"Org: {org}")
+    print("Mode: plan (no changes applied)")
+    print("")
+    print("repo\tvisibility\tplanned_changes")
+
+
+def print_plan_row(run: RepoRun) -> None:
+    changes = ",".join(run.details) if run.details else "-"
+    print(f"{run.name}\t{run.visibility}\t{changes}", flush=True)
 
 
 def main() -> int:
     args = parse_args()
-    repos = list_repos(args.org)
-    targets = [r for r in repos if include_repo(r, args.visibility, set(args.exclude))]
+    mode = "plan" if args.plan else "diff" if args.read_first else "apply"
+    snapshot = load_snapshot(args.snapshot) if args.snapshot else None
+    client = GitHubClient(OfflineTransport()) if snapshot is not None else client_from_args(args)
+    recorder = client.recorder if args.profile else None
+    excluded = set(args.exclude)
+    if snapshot is not None:
+        listing = iter_snapshot_repos(snapshot, args.org)
+    elif mode == "apply":
+        listing = iter_repos(client, args.org)
+    else:
+        listing = iter_repos_with_security(client, args.org)
+    if recorder is not None:
+        listing = recorder.timed_iter("list_repositories", listing)
+    targets = (
+        r
+        for r in listing
+        if include_repo(r, args.visibility, excluded) and in_shard(f"{args.org}/{r.name}", args.shard)
+    )
 
+    header = {"org": args.org, "visibility": args.visibility, "mode": mode}
+    if args.shard is not None:
+        header["shard"] = "/".join(map(str, args.shard))
+    if snapshot is not None:
+        header["snapshot_captured_at"] = snapshot.captured_at
+    ndjson = NdjsonReportWriter(args.output_ndjson, SECURITY_BASELINE, header) if args.output_ndjson else None
+    print_header, print_row = print_report_header, print_run_row
+    if mode == "plan":
+        print_header, print_row = print_plan_header, print_plan_row
+    if ndjson is not None:
+        print_row = partial(print_and_record, print_row, ndjson)
+    print_header(args.org)
     results: list[RepoRun] = []
-    for repo in targets:
-        results.append(apply_repo(args.org, repo))
-
-    print_report(args.org, results)
-
-    payload = {
-        "org": args.org,
-        "visibility": args.visibility,
-        "checked_repositories": len(results),
-        "failed_repositories": [r.name for r in results if not r.success],
-        "results": [
-            {
-                "name": r.name,
-                "visibility": r.visibility,
-                "success": r.success,
-                "details": r.details,
-                "warnings": r.warnings,
-                "errors": r.errors,
-            }
-            for r in results
-        ],
-    }
+    journal = None
+    if args.journal or args.resume:
+        journal = CheckpointJournal(
+            args.journal or args.resume, args.org, resume=bool(args.resume), overwrite=args.overwrite_journal
+        )
+    step_executor = ThreadPoolExecutor(max_workers=args.concurrency * 2) if args.concurrency > 1 else None
+    process = partial(
+        process_repo,
+        client,
+        args.org,
+        step_executor=step_executor,
+        mode=mode,
+        journal=journal,
+        recorder=recorder,
+    )
+    try:
+        if args.configuration_id is not None and mode != "plan":
+            results = run_with_configuration(
+                client, args, list(targets), process, print_row, journal, recorder
+            )
+        else:
+            for run in ordered_map(process, targets, args.concurrency):
+                print_row(run)
+                results.append(run)
+    finally:
+        if step_executor is not None:
+            step_executor.shutdown()
+        if journal is not None:
+            journal.close()
+
+    failed = [r.name for r in results if not r.success]
+    summary: dict[str, Any] = {"checked_repositories": len(results), "failed_repositories": failed}
+    if recorder is not None:
+        summary["profile"] = recorder.summary()
+        print_profile(summary["profile"])
+    if ndjson is not None:
+        ndjson.close(summary)
     if args.output_json:
-        Path(args.output_json).write_text(json.dumps(payload, indent=2), encoding="utf-8")
+        write_json_report(args.output_json, build_report(header, summary, [run_to_dict(r) for r in results]))
 
-    if args.strict and payload["failed_repositories"]:
+    if args.strict and failed:
         return 1
     return 0
 
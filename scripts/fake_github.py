@@ -0,0 +1,539 @@
+#!/usr/bin/env python3
+"""Synthetic org generator and local stand-in for the GitHub GraphQL and REST endpoints."""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import hashlib
+import json
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from urllib.parse import parse_qs, urlsplit
+
+from instrumentation import endpoint_template
+
+TOPIC_VOCABULARY = tuple(
+    f"topic-{word}"
+    for word in (
+        "api cli data docs infra ml mobile ops python rust security testing tooling ui web "
+        "go java kotlin swift terraform k8s observability auth billing search"
+    ).split()
+)
+DEFAULT_LABELS = (
+    "bug",
+    "documentation",
+    "duplicate",
+    "enhancement",
+    "good first issue",
+    "help wanted",
+    "invalid",
+    "question",
+    "wontfix",
+)
+SECTION_TITLES = (
+    "Overview",
+    "What It Does",
+    "Quick Start",
+    "Usage",
+    "Installation",
+    "Getting Started",
+    "Testing",
+    "Testing and CI",
+    "Configuration",
+    "Contributing",
+    "License",
+)
+README_KINDS = ("missing", "minimal", "compliant", "large", "nested")
+README_WEIGHTS = (10, 15, 50, 20, 5)
+TOPIC_COUNTS = (0, 1, 2, 3, 4, 5, 8, 12)
+TOPIC_WEIGHTS = (10, 8, 10, 25, 20, 12, 10, 5)
+SECURITY_FIELDS = (
+    "dependabot_security_updates",
+    "secret_scanning",
+    "secret_scanning_push_protection",
+    "secret_scanning_non_provider_patterns",
+)
+WORDS = "the a service tool library builds runs checks data fast small config deploy cache org repo".split()
+PAGE_SIZE_PATTERN = re.compile(r"repositories\(first:\s*(\d+)")
+TOPICS_SIZE_PATTERN = re.compile(r"repositoryTopics\(first:\s*(\d+)")
+LABELS_SIZE_PATTERN = re.compile(r"labels\(first:\s*(\d+)")
+
+
+@dataclass
+class SyntheticRepo:
+    index: int
+    name: str
+    is_private: bool
+    description: str
+    topics: tuple[str, ...]
+    labels: tuple[str, ...]
+    readme_kind: str
+    security: dict[str, dict[str, str]] = field(default_factory=dict)
+    alerts_enabled: bool = False
+    codeql_state: str = "not-configured"
+
+
+class SyntheticOrg:
+    def __init__(self, name: str, repo_count: int, seed: int = 0, max_readme_kb: int = 64) -> None:
+        self.name = name
+        self.seed = seed
+        self.max_readme_kb = max_readme_kb
+        self.repos = [self.generate_repo(index) for index in range(repo_count)]
+        self.by_name = {repo.name: repo for repo in self.repos}
+
+    def rng(self, index: int, purpose: str) -> random.Random:
+        return random.Random(f"{self.seed}:{index}:{purpose}")
+
+    def generate_repo(self, index: int) -> SyntheticRepo:
+        rng = self.rng(index, "repo")
+        topic_count = rng.choices(TOPIC_COUNTS, TOPIC_WEIGHTS)[0]
+        topics = rng.sample(TOPIC_VOCABULARY, min(topic_count, len(TOPIC_VOCABULARY)))
+        if rng.random() < 0.6:
+            topics.append("shpit")
+        extra_labels = 120 if rng.random() < 0.02 else rng.randint(0, 12)
+        labels = list(DEFAULT_LABELS) + [f"area/{n}" for n in range(extra_labels)]
+        if rng.random() < 0.5:
+            labels.append("shpit")
+        security = {
+            name: {"status": "enabled" if rng.random() < 0.5 else "disabled"} for name in SECURITY_FIELDS
+        }
+        return SyntheticRepo(
+            index=index,
+            name=f"repo-{index:05d}",
+            is_private=rng.random() < 0.35,
+            description="" if rng.random() < 0.1 else " ".join(rng.choices(WORDS, k=rng.randint(2, 12))),
+            topics=tuple(topics),
+            labels=tuple(labels),
+            readme_kind=rng.choices(README_KINDS, README_WEIGHTS)[0],
+            security=security,
+            alerts_enabled=rng.random() < 0.5,
+            codeql_state="configured" if rng.random() < 0.3 else "not-configured",
+        )
+
+    def readme_text(self, repo: SyntheticRepo) -> str | None:
+        if repo.readme_kind == "missing":
+            return None
+        rng = self.rng(repo.index, "readme")
+        lines = [f"# {repo.name}", ""]
+        if repo.readme_kind == "minimal":
+            return "\n".join(lines + [repo.description or "TODO", ""])
+        badge = "https://img.shields.io/badge/ci-passing-green"
+        lines.append(f"[![CI]({badge})](https://ci.example/{repo.name})")
+        lines.append("")
+        target_bytes = 2048
+        if repo.readme_kind == "large":
+            target_bytes = rng.randint(8, max(8, self.max_readme_kb)) * 1024
+        size = 0
+        while size < target_bytes:
+            heading = f"## {rng.choice(SECTION_TITLES)}"
+            paragraph = " ".join(rng.choices(WORDS, k=rng.randint(20, 120)))
+            lines.extend([heading, "", paragraph, ""])
+            size += len(heading) + len(paragraph) + 3
+        return "\n".join(lines)
+
+    def graphql_node(
+        self, repo: SyntheticRepo, bulk: bool, topics_size: int = 100, labels_size: int = 100
+    ) -> dict[str, Any]:
+        node: dict[str, Any] = {
+            "databaseId": repo.index + 1,
+            "name": repo.name,
+            "isPrivate": repo.is_private,
+            "description": repo.description or None,
+            "url": f"https://github.com/{self.name}/{repo.name}",
+            "pushedAt": "2026-01-01T00:00:00Z",
+            "updatedAt": "2026-01-01T00:00:00Z",
+            "repositoryTopics": topic_connection(repo, 0, topics_size),
+        }
+        if bulk:
+            node["labels"] = {
+                "totalCount": len(repo.labels),
+                "nodes": [{"name": label} for label in repo.labels[:labels_size]],
+            }
+            text = self.readme_text(repo) if repo.readme_kind != "nested" else None
+            node["readme"] = None if text is None else {"text": text, "isBinary": False, "isTruncated": False}
+        return node
+
+    def rest_repo(self, repo: SyntheticRepo) -> dict[str, Any]:
+        return {
+            "id": repo.index + 1,
+            "name": repo.name,
+            "full_name": f"{self.name}/{repo.name}",
+            "private": repo.is_private,
+            "description": repo.description or None,
+            "html_url": f"https://github.com/{self.name}/{repo.name}",
+            "topics": list(repo.topics),
+            "pushed_at": "2026-01-01T00:00:00Z",
+            "updated_at": "2026-01-01T00:00:00Z",
+            "security_and_analysis": repo.security,
+        }
+
+
+def topic_connection(repo: SyntheticRepo, start: int, size: int) -> dict[str, Any]:
+    end = min(start + size, len(repo.topics))
+    return {
+        "totalCount": len(repo.topics),
+        "pageInfo": {"hasNextPage": end < len(repo.topics), "endCursor": str(end)},
+        "nodes": [{"topic": {"name": topic}} for topic in repo.topics[start:end]],
+    }
+
+
+def revalidate(
+    headers: dict[str, str], extra: dict[str, str], payload: Any
+) -> tuple[int, dict[str, str], Any]:
+    data = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+    etag = f'"{hashlib.sha256(data).hexdigest()[:16]}"'
+    if headers.get("if-none-match") == etag:
+        return 304, {**extra, "ETag": etag}, b""
+    return 200, {**extra, "ETag": etag}, data
+
+
+def first_argument(pattern: re.Pattern[str], query: str) -> int:
+    match = pattern.search(query)
+    return int(match.group(1)) if match else 100
+
+
+class FakeGitHubServer:
+    def __init__(
+        self,
+        org: SyntheticOrg,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        rate_limit: int | None = None,
+        rate_window: float = 60.0,
+        max_inflight: int | None = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        extra_orgs: tuple[SyntheticOrg, ...] = (),
+        graphql_node_limit: int | None = None,
+    ) -> None:
+        self.org = org
+        self.orgs = {candidate.name: candidate for candidate in (org, *extra_orgs)}
+        self.latency = latency_ms / 1000.0
+        self.jitter = jitter_ms / 1000.0
+        self.rate_limit = rate_limit
+        self.rate_window = rate_window
+        self.max_inflight = max_inflight
+        # Repository queries asking for more nodes than this fail with 502, like GitHub's query timeouts.
+        self.graphql_node_limit = graphql_node_limit
+        self.lock = threading.Lock()
+        self.inflight = 0
+        self.window_reset = time.time() + rate_window
+        self.remaining = rate_limit or 0
+        self.reset_stats()
+        self.httpd = ThreadingHTTPServer((host, port), self.handler_class())
+        self.httpd.daemon_threads = True
+        self.thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def reset_stats(self) -> None:
+        with self.lock:
+            self.calls: Counter[str] = Counter()
+            self.statuses: Counter[int] = Counter()
+            self.repo_spans: dict[str, list[float]] = {}
+
+    def start(self) -> str:
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self.url
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def repo_latencies(self) -> list[float]:
+        with self.lock:
+            return [end - start for start, end in self.repo_spans.values()]
+
+    def admit(self) -> tuple[int, dict[str, str], dict[str, Any]] | None:
+        with self.lock:
+            if self.max_inflight is not None and self.inflight >= self.max_inflight:
+                return 429, {"Retry-After": "1"}, {"message": "You have exceeded a secondary rate limit."}
+            if self.rate_limit is None:
+                self.inflight += 1
+                return None
+            now = time.time()
+            if now >= self.window_reset:
+                self.window_reset = now + self.rate_window
+                self.remaining = self.rate_limit
+            if self.remaining <= 0:
+                return 403, self.rate_headers(), {"message": "API rate limit exceeded"}
+            self.remaining -= 1
+            self.inflight += 1
+            return None
+
+    def rate_headers(self) -> dict[str, str]:
+        if self.rate_limit is None:
+            return {}
+        return {
+            "X-RateLimit-Limit": str(self.rate_limit),
+            "X-RateLimit-Remaining": str(self.remaining),
+            "X-RateLimit-Reset": str(int(self.window_reset)),
+            "X-RateLimit-Used": str(self.rate_limit - self.remaining),
+        }
+
+    def handle(
+        self, method: str, target: str, headers: dict[str, str], body: bytes
+    ) -> tuple[int, dict[str, str], bytes]:
+        started = time.monotonic()
+        parts = urlsplit(target)
+        path = parts.path.strip("/")
+        with self.lock:
+            self.calls[endpoint_template(method, path)] += 1
+        rejected = self.admit()
+        if rejected is not None:
+            status, extra, payload = rejected
+            with self.lock:
+                self.statuses[status] += 1
+            return status, extra, json.dumps(payload).encode()
+        try:
+            if self.latency or self.jitter:
+                time.sleep(self.latency + random.uniform(0, self.jitter))
+            status, extra, payload = self.route(method, path, parse_qs(parts.query), headers, body)
+            if method == "GET" and status == 200:
+                status, extra, payload = revalidate(headers, extra, payload)
+        finally:
+            with self.lock:
+                self.inflight -= 1
+        with self.lock:
+            self.statuses[status] += 1
+            repo_match = re.match(r"^repos/[^/]+/([^/]+)", path)
+            if repo_match:
+                span = self.repo_spans.setdefault(repo_match.group(1), [started, started])
+                span[1] = time.monotonic()
+            extra = {**self.rate_headers(), **extra}
+        data = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+        return status, extra, data
+
+    def route(
+        self,
+        method: str,
+        path: str,
+        query: dict[str, list[str]],
+        headers: dict[str, str],
+        body: bytes,
+    ) -> tuple[int, dict[str, str], Any]:
+        if path == "graphql" and method == "POST":
+            return self.graphql(json.loads(body or b"{}"))
+        segments = path.split("/")
+        org = self.orgs.get(segments[1]) if len(segments) > 1 else None
+        if org is None:
+            return 404, {}, {"message": "Not Found"}
+        if segments[0] == "orgs" and len(segments) == 3 and segments[2] == "repos" and method == "GET":
+            return self.list_org_repos(org, query)
+        if segments[0] != "repos" or len(segments) < 3:
+            return 404, {}, {"message": "Not Found"}
+        repo = org.by_name.get(segments[2])
+        if repo is None:
+            return 404, {}, {"message": "Not Found"}
+        rest = "/".join(segments[3:])
+        payload = json.loads(body) if body else {}
+        if rest == "labels" and method == "GET":
+            return self.list_labels(org, repo, query)
+        if rest == "readme" and method == "GET":
+            text = org.readme_text(repo)
+            if text is None:
+                return 404, {}, {"message": "Not Found"}
+            if "vnd.github.raw" in headers.get("accept", ""):
+                return 200, {}, text.encode()
+            encoded = base64.b64encode(text.encode()).decode()
+            return 200, {}, {"encoding": "base64", "size": len(text.encode()), "content": encoded}
+        if rest == "vulnerability-alerts":
+            if method == "PUT":
+                repo.alerts_enabled = True
+                return 204, {}, b""
+            if method == "GET":
+                return (204, {}, b"") if repo.alerts_enabled else (404, {}, {"message": "Not Found"})
+        if rest == "automated-security-fixes" and method == "PUT":
+            if not repo.alerts_enabled:
+                return 422, {}, {"message": "Vulnerability alerts must be enabled"}
+            repo.security["dependabot_security_updates"] = {"status": "enabled"}
+            return 204, {}, b""
+        if rest == "code-scanning/default-setup":
+            if method == "PATCH":
+                repo.codeql_state = payload.get("state", "configured")
+                return 202, {}, {}
+            if method == "GET":
+                return 200, {}, {"state": repo.codeql_state}
+        if rest == "" and method == "GET":
+            return 200, {}, org.rest_repo(repo)
+        if rest == "" and method == "PATCH":
+            for name, setting in (payload.get("security_and_analysis") or {}).items():
+                repo.security[name] = dict(setting)
+            return 200, {}, org.rest_repo(repo)
+        return 404, {}, {"message": "Not Found"}
+
+    def graphql(self, request: dict[str, Any]) -> tuple[int, dict[str, str], Any]:
+        query = request.get("query", "")
+        variables = request.get("variables") or {}
+        if "repository(owner:" in query:
+            return self.graphql_repository(variables)
+        page_size = first_argument(PAGE_SIZE_PATTERN, query)
+        topics_size = first_argument(TOPICS_SIZE_PATTERN, query)
+        bulk = "labels(" in query
+        labels_size = first_argument(LABELS_SIZE_PATTERN, query) if bulk else 0
+        nested = ([topics_size] if "repositoryTopics(" in query else []) + ([labels_size] if bulk else [])
+        # GitHub charges one point per 100 connection requests: the page itself plus each nested connection.
+        requests = 1 + page_size * len(nested)
+        node_count = page_size * (1 + sum(nested))
+        if self.graphql_node_limit is not None and node_count > self.graphql_node_limit:
+            return 502, {}, {"message": "Server Error"}
+        org = self.orgs.get(variables.get("org", ""))
+        if org is None:
+            message = f"Could not resolve to an Organization with the login of '{variables.get('org')}'."
+            return 200, {}, {"data": {"organization": None}, "errors": [{"message": message}]}
+        start = int(variables.get("cursor") or 0)
+        end = min(start + page_size, len(org.repos))
+        nodes = [org.graphql_node(repo, bulk, topics_size, labels_size) for repo in org.repos[start:end]]
+        page = {"pageInfo": {"hasNextPage": end < len(org.repos), "endCursor": str(end)}, "nodes": nodes}
+        data: dict[str, Any] = {"organization": {"repositories": page}}
+        if "rateLimit" in query:
+            data["rateLimit"] = self.graphql_rate_limit(max(1, round(requests / 100)))
+        return 200, {}, {"data": data}
+
+    def graphql_repository(self, variables: dict[str, Any]) -> tuple[int, dict[str, str], Any]:
+        org = self.orgs.get(variables.get("owner", ""))
+        repo = org.by_name.get(variables.get("name", "")) if org is not None else None
+        if repo is None:
+            return 200, {}, {"data": {"repository": None}, "errors": [{"message": "Could not resolve"}]}
+        connection = topic_connection(repo, int(variables.get("cursor") or 0), 100)
+        return 200, {}, {"data": {"repository": {"repositoryTopics": connection}}}
+
+    def graphql_rate_limit(self, cost: int) -> dict[str, Any]:
+        with self.lock:
+            remaining = self.remaining if self.rate_limit is not None else 5000
+            reset = self.window_reset
+        return {
+            "cost": cost,
+            "remaining": remaining,
+            "resetAt": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(reset)),
+        }
+
+    def list_org_repos(
+        self, org: SyntheticOrg, query: dict[str, list[str]]
+    ) -> tuple[int, dict[str, str], Any]:
+        per_page = int(query.get("per_page", ["30"])[0])
+        page = int(query.get("page", ["1"])[0])
+        chunk = org.repos[(page - 1) * per_page : page * per_page]
+        return 200, {}, [org.rest_repo(repo) for repo in chunk]
+
+    def list_labels(
+        self, org: SyntheticOrg, repo: SyntheticRepo, query: dict[str, list[str]]
+    ) -> tuple[int, dict[str, str], Any]:
+        per_page = int(query.get("per_page", ["30"])[0])
+        page = int(query.get("page", ["1"])[0])
+        chunk = repo.labels[(page - 1) * per_page : page * per_page]
+        extra: dict[str, str] = {}
+        if page * per_page < len(repo.labels):
+            next_url = f"{self.url}/repos/{org.name}/{repo.name}/labels"
+            extra["Link"] = f'<{next_url}?per_page={per_page}&page={page + 1}>; rel="next"'
+        return 200, extra, [{"name": label} for label in chunk]
+
+    def handler_class(self) -> type[BaseHTTPRequestHandler]:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Buffer headers and body into one write and disable Nagle, or delayed ACKs dominate latency.
+            wbufsize = 64 * 1024
+            disable_nagle_algorithm = True
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+            def handle(self) -> None:
+                try:
+                    super().handle()
+                except ConnectionError:
+                    # Streaming clients hang up once they have read enough of a large README.
+                    pass
+
+            def dispatch(self) -> None:
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                headers = {key.lower(): value for key, value in self.headers.items()}
+                status, extra, data = server.handle(self.command, self.path, headers, body)
+                self.send_response(status)
+                for key, value in extra.items():
+                    self.send_header(key, value)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_GET = do_POST = do_PUT = do_PATCH = dispatch
+
+        return Handler
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--org",
+        action="append",
+        default=[],
+        help="Synthetic organization name (repeatable; default: bench-org).",
+    )
+    parser.add_argument("--repos", type=int, default=1000, help="Number of synthetic repositories per org")
+    parser.add_argument("--seed", type=int, default=0, help="Generator seed")
+    parser.add_argument("--max-readme-kb", type=int, default=64, help="Upper bound for large README bodies")
+    parser.add_argument("--port", type=int, default=8765, help="Port to listen on")
+    add_server_arguments(parser)
+    return parser.parse_args()
+
+
+def add_server_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Added latency per request")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Uniform random latency on top")
+    parser.add_argument(
+        "--rate-limit",
+        type=int,
+        default=None,
+        help="Primary rate limit per window; exhausted requests get 403 with X-RateLimit-Remaining: 0.",
+    )
+    parser.add_argument("--rate-window", type=float, default=60.0, help="Primary rate limit window (seconds)")
+    parser.add_argument(
+        "--max-inflight",
+        type=int,
+        default=None,
+        help="Concurrent requests above this get a 429 secondary rate limit with Retry-After.",
+    )
+
+
+def main() -> int:
+    args = parse_args()
+    names = args.org or ["bench-org"]
+    orgs = [SyntheticOrg(name, args.repos, args.seed + n, args.max_readme_kb) for n, name in enumerate(names)]
+    server = FakeGitHubServer(
+        orgs[0],
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        rate_limit=args.rate_limit,
+        rate_window=args.rate_window,
+        max_inflight=args.max_inflight,
+        port=args.port,
+        extra_orgs=tuple(orgs[1:]),
+    )
+    print(f"Serving {args.repos} repos per org for {', '.join(names)} at {server.url}", flush=True)
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
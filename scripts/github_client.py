@@ -0,0 +1,784 @@
+"""Shared GitHub API client with pooled HTTPS and `gh` CLI transports."""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import http.client
+import json
+import os
+import queue
+import random
+import subprocess
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Protocol
+from urllib.parse import urlsplit
+
+from instrumentation import CallRecord, CallRecorder, endpoint_template, response_cost
+
+DEFAULT_API_URL = "https://api.github.com"
+USER_AGENT = "silkietools-org-scripts"
+DEFAULT_HEADERS = {
+    "Accept": "application/vnd.github+json",
+    "X-GitHub-Api-Version": "2022-11-28",
+}
+STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError)
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+# GitHub asks clients to wait at least a minute after a secondary rate limit that sends no Retry-After.
+SECONDARY_LIMIT_DELAY = 60.0
+TIMEOUT_STATUSES = {502, 504}
+# Set by callers that answer a gateway timeout themselves (e.g. with a smaller query); the scheduler
+# then returns 502/504 at once instead of retrying, and does not forward the header.
+NO_TIMEOUT_RETRY_HEADER = "X-Client-No-Timeout-Retry"
+RAW_MEDIA_TYPE = "application/vnd.github.raw"
+STREAM_CHUNK_BYTES = 16 * 1024
+# Unread bodies up to this size are drained so the keep-alive connection can go back to the pool.
+STREAM_DRAIN_BYTES = 64 * 1024
+# Cache-only header on a stored streamed body that was not read to the end; holds the full size.
+PARTIAL_SIZE_HEADER = "x-cached-partial-size"
+
+# Receives each body chunk and the offset it starts at; returns False to stop reading.
+# Offset 0 means a fresh attempt, so consumers reset any state built from an earlier try.
+StreamConsumer = Callable[[bytes, int], bool]
+
+
+@dataclass
+class ApiResponse:
+    status: int
+    headers: dict[str, str]
+    body: bytes
+    size: int | None = None
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status < 300
+
+    def json(self) -> Any:
+        return json.loads(self.body) if self.body else None
+
+    def error_message(self) -> str:
+        message = self.body.decode("utf-8", errors="replace").strip()
+        try:
+            payload = json.loads(message)
+        except ValueError:
+            payload = None
+        if isinstance(payload, dict) and payload.get("message"):
+            message = str(payload["message"])
+        return f"{message} (HTTP {self.status})" if message else f"HTTP {self.status}"
+
+
+def next_page_query(response: ApiResponse) -> str | None:
+    for link in response.headers.get("link", "").split(","):
+        target, _, params = link.partition(";")
+        if 'rel="next"' in params:
+            return urlsplit(target.strip().strip("<>")).query
+    return None
+
+
+class ApiError(RuntimeError):
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+class Transport(Protocol):
+    def request(
+        self,
+        method: str,
+        path: str,
+        body: bytes | None,
+        headers: dict[str, str],
+    ) -> ApiResponse: ...
+
+    def stream(
+        self,
+        method: str,
+        path: str,
+        headers: dict[str, str],
+        consume: StreamConsumer,
+    ) -> ApiResponse: ...
+
+
+def feed_body(response: ApiResponse, consume: StreamConsumer) -> ApiResponse:
+    if response.status != 200:
+        return response
+    for offset in range(0, len(response.body), STREAM_CHUNK_BYTES):
+        if not consume(response.body[offset : offset + STREAM_CHUNK_BYTES], offset):
+            break
+    return ApiResponse(response.status, response.headers, b"", len(response.body))
+
+
+class HttpTransport:
+    def __init__(
+        self,
+        base_url: str = DEFAULT_API_URL,
+        token: str | None = None,
+        pool_size: int = 16,
+        timeout: float = 30.0,
+    ) -> None:
+        parts = urlsplit(base_url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError(f"Unsupported API URL: {base_url}")
+        self.scheme = parts.scheme
+        self.host = parts.hostname
+        self.port = parts.port
+        self.path_prefix = parts.path.rstrip("/")
+        self.token = token
+        self.timeout = timeout
+        self.idle_connections: queue.LifoQueue[http.client.HTTPConnection] = queue.LifoQueue(pool_size)
+
+    def new_connection(self) -> http.client.HTTPConnection:
+        if self.scheme == "https":
+            return http.client.HTTPSConnection(self.host, self.port, timeout=self.timeout)
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+    def acquire(self) -> tuple[http.client.HTTPConnection, bool]:
+        try:
+            return self.idle_connections.get_nowait(), True
+        except queue.Empty:
+            return self.new_connection(), False
+
+    def release(self, connection: http.client.HTTPConnection) -> None:
+        try:
+            self.idle_connections.put_nowait(connection)
+        except queue.Full:
+            connection.close()
+
+    def close(self) -> None:
+        while True:
+            try:
+                self.idle_connections.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def request(
+        self,
+        method: str,
+        path: str,
+        body: bytes | None,
+        headers: dict[str, str],
+    ) -> ApiResponse:
+        return self.send(method, path, body, headers, None)
+
+    def stream(
+        self,
+        method: str,
+        path: str,
+        headers: dict[str, str],
+        consume: StreamConsumer,
+    ) -> ApiResponse:
+        return self.send(method, path, None, headers, consume)
+
+    def send(
+        self,
+        method: str,
+        path: str,
+        body: bytes | None,
+        headers: dict[str, str],
+        consume: StreamConsumer | None,
+    ) -> ApiResponse:
+        url = f"{self.path_prefix}/{path.lstrip('/')}"
+        request_headers = {"User-Agent": USER_AGENT, **headers}
+        if self.token:
+            request_headers["Authorization"] = f"Bearer {self.token}"
+        if body is not None:
+            request_headers.setdefault("Content-Type", "application/json")
+
+        connection, reused = self.acquire()
+        try:
+            try:
+                response, reusable = self.exchange(connection, method, url, body, request_headers, consume)
+            except STALE_CONNECTION_ERRORS:
+                connection.close()
+                if not reused:
+                    raise
+                connection = self.new_connection()
+                response, reusable = self.exchange(connection, method, url, body, request_headers, consume)
+        except (OSError, http.client.HTTPException) as error:
+            connection.close()
+            raise ApiError(0, f"{method} {path} failed: {error}") from error
+
+        if not reusable or response.headers.get("connection", "").lower() == "close":
+            connection.close()
+        else:
+            self.release(connection)
+        return response
+
+    @staticmethod
+    def exchange(
+        connection: http.client.HTTPConnection,
+        method: str,
+        url: str,
+        body: bytes | None,
+        headers: dict[str, str],
+        consume: StreamConsumer | None,
+    ) -> tuple[ApiResponse, bool]:
+        connection.request(method, url, body=body, headers=headers)
+        raw = connection.getresponse()
+        response_headers = {key.lower(): value for key, value in raw.getheaders()}
+        if consume is None or raw.status != 200:
+            return ApiResponse(status=raw.status, headers=response_headers, body=raw.read()), True
+
+        offset = 0
+        wanted = True
+        while wanted:
+            chunk = raw.read(STREAM_CHUNK_BYTES)
+            if not chunk:
+                return ApiResponse(raw.status, response_headers, b"", offset), True
+            wanted = consume(chunk, offset)
+            offset += len(chunk)
+        length = response_headers.get("content-length")
+        if length is not None and int(length) - offset > STREAM_DRAIN_BYTES:
+            return ApiResponse(raw.status, response_headers, b"", int(length)), False
+        # Drain the rest: keeps the connection reusable, and counts the size when no length was sent.
+        while chunk := raw.read(STREAM_CHUNK_BYTES):
+            offset += len(chunk)
+        return ApiResponse(raw.status, response_headers, b"", offset), True
+
+
+class GhCliTransport:
+    def __init__(self) -> None:
+        self.env = os.environ.copy()
+        if "GH_TOKEN" not in self.env and "GITHUB_TOKEN" in self.env:
+            self.env["GH_TOKEN"] = self.env["GITHUB_TOKEN"]
+
+    def request(
+        self,
+        method: str,
+        path: str,
+        body: bytes | None,
+        headers: dict[str, str],
+    ) -> ApiResponse:
+        args = ["gh", "api", "--include", "-X", method, path]
+        for key, value in headers.items():
+            args.extend(["-H", f"{key}: {value}"])
+        if body is not None:
+            args.extend(["--input", "-"])
+        proc = subprocess.run(
+            args,
+            input=body,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            env=self.env,
+            check=False,
+        )
+        response = parse_included_response(proc.stdout)
+        if response is None:
+            message = proc.stderr.decode("utf-8", errors="replace").strip()
+            raise ApiError(0, message or f"gh api {method} {path} failed")
+        return response
+
+    def stream(
+        self,
+        method: str,
+        path: str,
+        headers: dict[str, str],
+        consume: StreamConsumer,
+    ) -> ApiResponse:
+        return feed_body(self.request(method, path, None, headers), consume)
+
+
+class OfflineTransport:
+    # Stands in for the network when a script runs from a snapshot, so any uncaptured request fails loudly.
+    def request(
+        self,
+        method: str,
+        path: str,
+        body: bytes | None,
+        headers: dict[str, str],
+    ) -> ApiResponse:
+        raise ApiError(0, f"{method} {path}: not available offline")
+
+    def stream(
+        self,
+        method: str,
+        path: str,
+        headers: dict[str, str],
+        consume: StreamConsumer,
+    ) -> ApiResponse:
+        raise ApiError(0, f"{method} {path}: not available offline")
+
+
+def parse_included_response(output: bytes) -> ApiResponse | None:
+    if not output.startswith(b"HTTP/"):
+        return None
+    normalized = output.replace(b"\r\n", b"\n")
+    head, _, body = normalized.partition(b"\n\n")
+    status_line, *header_lines = head.decode("iso-8859-1").split("\n")
+    headers: dict[str, str] = {}
+    for line in header_lines:
+        key, _, value = line.partition(":")
+        headers[key.strip().lower()] = value.strip()
+    return ApiResponse(status=int(status_line.split()[1]), headers=headers, body=body)
+
+
+class ResponseCache:
+    def __init__(self, directory: str | Path, max_bytes: int) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.entry_sizes: OrderedDict[str, int] = OrderedDict()
+        existing = sorted(self.directory.glob("*.cache"), key=lambda path: path.stat().st_mtime)
+        for path in existing:
+            self.entry_sizes[path.stem] = path.stat().st_size
+        self.total_bytes = sum(self.entry_sizes.values())
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(method: str, path: str, headers: dict[str, str]) -> str:
+        accept = headers.get("Accept", "")
+        return hashlib.sha256(f"{method} {path} {accept}".encode("utf-8")).hexdigest()
+
+    def entry_path(self, key: str) -> Path:
+        return self.directory / f"{key}.cache"
+
+    def load(self, key: str) -> ApiResponse | None:
+        with self.lock:
+            if key not in self.entry_sizes:
+                return None
+        try:
+            raw = self.entry_path(key).read_bytes()
+        except OSError:
+            return None
+        meta, _, body = raw.partition(b"\n")
+        stored = json.loads(meta)
+        return ApiResponse(status=stored["status"], headers=stored["headers"], body=body)
+
+    def store(self, key: str, response: ApiResponse) -> None:
+        meta = json.dumps({"status": response.status, "headers": response.headers}).encode("utf-8")
+        data = meta + b"\n" + response.body
+        if len(data) > self.max_bytes:
+            return
+        handle, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(handle, "wb") as temp_file:
+            temp_file.write(data)
+        os.replace(temp_path, self.entry_path(key))
+        with self.lock:
+            self.total_bytes += len(data) - self.entry_sizes.pop(key, 0)
+            self.entry_sizes[key] = len(data)
+            self.evict()
+
+    def touch(self, key: str) -> None:
+        with self.lock:
+            if key in self.entry_sizes:
+                self.entry_sizes.move_to_end(key)
+        try:
+            os.utime(self.entry_path(key))
+        except OSError:
+            pass
+
+    def evict(self) -> None:
+        while self.total_bytes > self.max_bytes and self.entry_sizes:
+            key, size = self.entry_sizes.popitem(last=False)
+            self.total_bytes -= size
+            self.entry_path(key).unlink(missing_ok=True)
+
+
+class CachingTransport:
+    def __init__(self, inner: Transport, cache: ResponseCache) -> None:
+        self.inner = inner
+        self.cache = cache
+
+    def request(
+        self,
+        method: str,
+        path: str,
+        body: bytes | None,
+        headers: dict[str, str],
+    ) -> ApiResponse:
+        if method != "GET":
+            return self.inner.request(method, path, body, headers)
+
+        key, cached, conditional_headers = self.conditional(method, path, headers)
+        response = self.inner.request(method, path, body, conditional_headers)
+        if response.status == 304 and cached is not None:
+            return self.not_modified(key, cached, response)
+
+        self.count_miss()
+        if response.status == 200 and ("etag" in response.headers or "last-modified" in response.headers):
+            self.cache.store(key, response)
+        return response
+
+    def stream(
+        self,
+        method: str,
+        path: str,
+        headers: dict[str, str],
+        consume: StreamConsumer,
+    ) -> ApiResponse:
+        key, cached, conditional_headers = self.conditional(method, path, headers, partial_ok=True)
+        captured = bytearray()
+
+        def capture(chunk: bytes, offset: int) -> bool:
+            del captured[offset:]
+            captured.extend(chunk)
+            return consume(chunk, offset)
+
+        response = self.inner.stream(method, path, conditional_headers, capture)
+        if response.status == 304 and cached is not None:
+            replayed = self.replay(key, cached, response, consume)
+            if replayed is not None:
+                return replayed
+            # The stored prefix ran out before the consumer was done, so read the body again.
+            response = self.inner.stream(method, path, headers, capture)
+
+        self.count_miss()
+        if response.status == 200 and ("etag" in response.headers or "last-modified" in response.headers):
+            stored_headers = response.headers
+            if len(captured) != response.size:
+                # Keep what was read plus the true size, so the next run can still revalidate it.
+                stored_headers = {**response.headers, PARTIAL_SIZE_HEADER: str(response.size)}
+            self.cache.store(key, ApiResponse(response.status, stored_headers, bytes(captured)))
+        return response
+
+    def replay(
+        self, key: str, cached: ApiResponse, response: ApiResponse, consume: StreamConsumer
+    ) -> ApiResponse | None:
+        full_size = cached.headers.get(PARTIAL_SIZE_HEADER)
+        if full_size is None:
+            return feed_body(self.not_modified(key, cached, response), consume)
+        wanted = True
+        for offset in range(0, len(cached.body), STREAM_CHUNK_BYTES):
+            wanted = consume(cached.body[offset : offset + STREAM_CHUNK_BYTES], offset)
+            if not wanted:
+                break
+        if wanted:
+            return None
+        served = self.not_modified(key, cached, response)
+        served.headers.pop(PARTIAL_SIZE_HEADER, None)
+        return ApiResponse(served.status, served.headers, b"", int(full_size))
+
+    def conditional(
+        self, method: str, path: str, headers: dict[str, str], partial_ok: bool = False
+    ) -> tuple[str, ApiResponse | None, dict[str, str]]:
+        key = self.cache.key(method, path, headers)
+        cached = self.cache.load(key)
+        if cached is not None and PARTIAL_SIZE_HEADER in cached.headers and not partial_ok:
+            # A stored prefix cannot answer a buffered request.
+            cached = None
+        conditional_headers = dict(headers)
+        if cached is not None:
+            if "etag" in cached.headers:
+                conditional_headers["If-None-Match"] = cached.headers["etag"]
+            if "last-modified" in cached.headers:
+                conditional_headers["If-Modified-Since"] = cached.headers["last-modified"]
+        return key, cached, conditional_headers
+
+    def not_modified(self, key: str, cached: ApiResponse, response: ApiResponse) -> ApiResponse:
+        with self.cache.lock:
+            self.cache.hits += 1
+        self.cache.touch(key)
+        rate_limit_headers = {
+            name: value for name, value in response.headers.items() if name.startswith("x-ratelimit-")
+        }
+        return ApiResponse(cached.status, {**cached.headers, **rate_limit_headers}, cached.body)
+
+    def count_miss(self) -> None:
+        with self.cache.lock:
+            self.cache.misses += 1
+
+
+class RequestScheduler:
+    def __init__(
+        self,
+        max_concurrency: int = 16,
+        max_retries: int = 5,
+        budget: int | None = None,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+        low_remaining: int = 100,
+        clock: Any = time.time,
+    ) -> None:
+        self.max_concurrency = max(1, max_concurrency)
+        self.concurrency_limit = self.max_concurrency
+        self.max_retries = max_retries
+        self.budget = budget
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.low_remaining = low_remaining
+        self.clock = clock
+        self.condition = threading.Condition()
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self.requests_sent = 0
+        self.retries = 0
+
+    def acquire(self) -> None:
+        with self.condition:
+            while True:
+                if self.budget is not None and self.requests_sent >= self.budget:
+                    raise ApiError(0, f"request budget of {self.budget} exhausted")
+                wait_for = self.paused_until - self.clock()
+                if wait_for > 0:
+                    self.condition.wait(wait_for)
+                elif self.in_flight >= self.concurrency_limit:
+                    self.condition.wait()
+                else:
+                    break
+            self.in_flight += 1
+            self.requests_sent += 1
+
+    def release(self) -> None:
+        with self.condition:
+            self.in_flight -= 1
+            self.condition.notify_all()
+
+    def pause(self, seconds: float) -> None:
+        with self.condition:
+            self.paused_until = max(self.paused_until, self.clock() + seconds)
+
+    def observe(self, response: ApiResponse) -> None:
+        remaining = response.headers.get("x-ratelimit-remaining")
+        reset = response.headers.get("x-ratelimit-reset")
+        with self.condition:
+            if is_throttled(response):
+                self.concurrency_limit = max(1, self.concurrency_limit // 2)
+            elif remaining is not None and int(remaining) < self.low_remaining:
+                self.concurrency_limit = 1
+            elif self.concurrency_limit < self.max_concurrency:
+                self.concurrency_limit += 1
+            if remaining is not None and int(remaining) == 0 and reset is not None:
+                self.paused_until = max(self.paused_until, float(reset) + 1)
+            self.condition.notify_all()
+
+    def retry_delay(self, attempt: int, response: ApiResponse | None) -> float:
+        if response is not None and "retry-after" in response.headers:
+            return float(response.headers["retry-after"])
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+        if response is None or not is_throttled(response):
+            return delay
+        # An exhausted primary limit already pauses until its reset in observe.
+        if response.headers.get("x-ratelimit-remaining") != "0":
+            return max(SECONDARY_LIMIT_DELAY, delay)
+        return delay
+
+
+def is_throttled(response: ApiResponse) -> bool:
+    if response.status == 429:
+        return True
+    if response.status != 403:
+        return False
+    if "retry-after" in response.headers or response.headers.get("x-ratelimit-remaining") == "0":
+        return True
+    return b"secondary rate limit" in response.body.lower()
+
+
+def should_retry(response: ApiResponse) -> bool:
+    return response.status in RETRYABLE_STATUSES or is_throttled(response)
+
+
+class ScheduledTransport:
+    def __init__(
+        self,
+        inner: Transport,
+        scheduler: RequestScheduler,
+        recorder: CallRecorder | None = None,
+    ) -> None:
+        self.inner = inner
+        self.scheduler = scheduler
+        self.recorder = recorder
+
+    def request(
+        self,
+        method: str,
+        path: str,
+        body: bytes | None,
+        headers: dict[str, str],
+    ) -> ApiResponse:
+        retry_timeouts = NO_TIMEOUT_RETRY_HEADER not in headers
+        headers = {name: value for name, value in headers.items() if name != NO_TIMEOUT_RETRY_HEADER}
+        return self.send(
+            method, path, lambda: self.inner.request(method, path, body, headers), retry_timeouts
+        )
+
+    def stream(
+        self,
+        method: str,
+        path: str,
+        headers: dict[str, str],
+        consume: StreamConsumer,
+    ) -> ApiResponse:
+        return self.send(method, path, lambda: self.inner.stream(method, path, headers, consume))
+
+    def send(
+        self,
+        method: str,
+        path: str,
+        call: Callable[[], ApiResponse],
+        retry_timeouts: bool = True,
+    ) -> ApiResponse:
+        started = time.perf_counter()
+        attempt = 0
+        cost = 0
+        while True:
+            self.scheduler.acquire()
+            try:
+                response = call()
+            except ApiError as error:
+                if attempt >= self.scheduler.max_retries:
+                    self.record(method, path, error.status, started, 0, attempt, cost)
+                    raise
+                response = None
+            finally:
+                self.scheduler.release()
+
+            if response is not None:
+                self.scheduler.observe(response)
+                cost += response_cost(path, response.status, response.body)
+                gave_up = not retry_timeouts and response.status in TIMEOUT_STATUSES
+                if gave_up or not should_retry(response) or attempt >= self.scheduler.max_retries:
+                    size = len(response.body) if response.size is None else response.size
+                    self.record(method, path, response.status, started, size, attempt, cost)
+                    return response
+            delay = self.scheduler.retry_delay(attempt, response)
+            if response is not None and is_throttled(response):
+                self.scheduler.pause(delay)
+            else:
+                time.sleep(delay)
+            attempt += 1
+            with self.scheduler.condition:
+                self.scheduler.retries += 1
+
+    def record(
+        self,
+        method: str,
+        path: str,
+        status: int,
+        started: float,
+        response_bytes: int,
+        retries: int,
+        cost: int,
+    ) -> None:
+        if self.recorder is None:
+            return
+        elapsed = time.perf_counter() - started
+        endpoint = endpoint_template(method, path)
+        self.recorder.record(CallRecord(endpoint, status, elapsed, response_bytes, retries, cost))
+
+
+class GitHubClient:
+    def __init__(self, transport: Transport, recorder: CallRecorder | None = None) -> None:
+        self.transport = transport
+        self.recorder = recorder if recorder is not None else CallRecorder()
+
+    def request(
+        self,
+        method: str,
+        path: str,
+        payload: Any = None,
+        headers: dict[str, str] | None = None,
+    ) -> ApiResponse:
+        body = None if payload is None else json.dumps(payload).encode("utf-8")
+        return self.transport.request(method, path, body, {**DEFAULT_HEADERS, **(headers or {})})
+
+    def stream(
+        self,
+        path: str,
+        consume: StreamConsumer,
+        headers: dict[str, str] | None = None,
+    ) -> ApiResponse:
+        return self.transport.stream("GET", path, {**DEFAULT_HEADERS, **(headers or {})}, consume)
+
+    def rest(
+        self, method: str, path: str, payload: Any = None, headers: dict[str, str] | None = None
+    ) -> Any:
+        response = self.request(method, path, payload, headers)
+        if not response.ok:
+            raise ApiError(response.status, f"{method} {path}: {response.error_message()}")
+        return response.json()
+
+    def graphql(self, query: str, variables: dict[str, Any], retry_timeouts: bool = True) -> Any:
+        headers = None if retry_timeouts else {NO_TIMEOUT_RETRY_HEADER: "1"}
+        data = self.rest("POST", "graphql", {"query": query, "variables": variables}, headers)
+        if data.get("errors"):
+            messages = "; ".join(error.get("message", "unknown error") for error in data["errors"])
+            raise ApiError(200, f"GraphQL error: {messages}")
+        return data
+
+
+def token_from_environment() -> str | None:
+    return os.environ.get("GH_TOKEN") or os.environ.get("GITHUB_TOKEN") or None
+
+
+def build_client(
+    transport: str = "auto",
+    api_url: str | None = None,
+    cache_dir: str | None = None,
+    cache_max_bytes: int = 256 * 1024 * 1024,
+    max_concurrency: int = 16,
+    max_retries: int = 5,
+    request_budget: int | None = None,
+) -> GitHubClient:
+    token = token_from_environment()
+    backend: Transport
+    if transport == "gh" or (transport == "auto" and not token and not api_url):
+        backend = GhCliTransport()
+    else:
+        backend = HttpTransport(api_url or DEFAULT_API_URL, token)
+    scheduler = RequestScheduler(max_concurrency, max_retries, request_budget)
+    recorder = CallRecorder()
+    backend = ScheduledTransport(backend, scheduler, recorder)
+    if cache_dir:
+        backend = CachingTransport(backend, ResponseCache(cache_dir, cache_max_bytes))
+    return GitHubClient(backend, recorder)
+
+
+def add_transport_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--transport",
+        choices=("auto", "http", "gh"),
+        default="auto",
+        help="API backend. auto uses pooled HTTPS when GH_TOKEN/GITHUB_TOKEN is set, else the gh CLI.",
+    )
+    parser.add_argument(
+        "--api-url",
+        default=None,
+        help=f"REST/GraphQL base URL (default {DEFAULT_API_URL}); point at a local fake API for tests.",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=None,
+        help="Directory for the conditional-request (ETag) cache of GET responses. Disabled by default.",
+    )
+    parser.add_argument(
+        "--cache-max-mb",
+        type=int,
+        default=256,
+        help="Size cap for --cache-dir; least recently used entries are evicted first.",
+    )
+    parser.add_argument(
+        "--max-retries",
+        type=int,
+        default=5,
+        help="Retries per request on 403/429 rate limits, 5xx and network errors (jittered backoff).",
+    )
+    parser.add_argument(
+        "--request-budget",
+        type=int,
+        default=None,
+        help="Stop issuing API requests after this many in one run.",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Print per-endpoint latency percentiles and phase timings, and embed them in the report.",
+    )
+
+
+def client_from_args(args: argparse.Namespace) -> GitHubClient:
+    return build_client(
+        args.transport,
+        args.api_url,
+        args.cache_dir,
+        args.cache_max_mb * 1024 * 1024,
+        max_concurrency=args.concurrency,
+        max_retries=args.max_retries,
+        request_budget=args.request_budget,
+    )
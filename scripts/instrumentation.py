@@ -0,0 +1,150 @@
+"""Per-call API instrumentation and phase timings for the org scripts."""
+
+from __future__ import annotations
+
+import json
+import re
+import sys
+import threading
+import time
+from collections.abc import Iterable, Iterator
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from dataclasses import dataclass
+from typing import Any, TextIO, TypeVar
+
+Item = TypeVar("Item")
+NUMERIC_SEGMENT = re.compile(r"^\d+$")
+
+
+@dataclass(frozen=True)
+class CallRecord:
+    endpoint: str
+    status: int
+    seconds: float
+    response_bytes: int
+    retries: int
+    cost: int
+
+
+def endpoint_template(method: str, path: str) -> str:
+    segments = path.split("?", 1)[0].strip("/").split("/")
+    if segments[0] == "repos" and len(segments) >= 3:
+        segments[1:3] = ["{owner}", "{repo}"]
+    elif segments[0] in ("orgs", "users") and len(segments) >= 2:
+        segments[1] = "{org}"
+    segments = ["{id}" if NUMERIC_SEGMENT.match(segment) else segment for segment in segments]
+    return f"{method} {'/'.join(segments)}"
+
+
+def response_cost(path: str, status: int, body: bytes) -> int:
+    if status == 304:
+        return 0
+    if path.startswith("graphql") and b'"rateLimit"' in body:
+        try:
+            return int(json.loads(body)["data"]["rateLimit"]["cost"])
+        except (ValueError, KeyError, TypeError):
+            return 1
+    return 1
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class CallRecorder:
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.calls: list[CallRecord] = []
+        self.phases: dict[str, list[float]] = {}
+
+    def record(self, record: CallRecord) -> None:
+        with self.lock:
+            self.calls.append(record)
+
+    def add_phase_time(self, name: str, seconds: float) -> None:
+        with self.lock:
+            totals = self.phases.setdefault(name, [0.0, 0])
+            totals[0] += seconds
+            totals[1] += 1
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_phase_time(name, time.perf_counter() - started)
+
+    def timed_iter(self, name: str, items: Iterable[Item]) -> Iterator[Item]:
+        iterator = iter(items)
+        while True:
+            started = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.add_phase_time(name, time.perf_counter() - started)
+                return
+            self.add_phase_time(name, time.perf_counter() - started)
+            yield item
+
+    def summary(self) -> dict[str, Any]:
+        with self.lock:
+            calls = list(self.calls)
+            phases = {name: (seconds, count) for name, (seconds, count) in self.phases.items()}
+        by_endpoint: dict[str, list[CallRecord]] = {}
+        for call in calls:
+            by_endpoint.setdefault(call.endpoint, []).append(call)
+        endpoints = []
+        for endpoint, records in sorted(by_endpoint.items()):
+            latencies = [record.seconds * 1000 for record in records]
+            endpoints.append(
+                {
+                    "endpoint": endpoint,
+                    "calls": len(records),
+                    "errors": sum(1 for record in records if not 200 <= record.status < 400),
+                    "retries": sum(record.retries for record in records),
+                    "bytes": sum(record.response_bytes for record in records),
+                    "rate_limit_cost": sum(record.cost for record in records),
+                    "p50_ms": round(percentile(latencies, 0.50), 2),
+                    "p90_ms": round(percentile(latencies, 0.90), 2),
+                    "p99_ms": round(percentile(latencies, 0.99), 2),
+                    "max_ms": round(max(latencies), 2),
+                }
+            )
+        return {
+            "calls": len(calls),
+            "retries": sum(call.retries for call in calls),
+            "bytes": sum(call.response_bytes for call in calls),
+            "rate_limit_cost": sum(call.cost for call in calls),
+            "endpoints": endpoints,
+            "phases": {
+                name: {"seconds": round(seconds, 4), "count": count}
+                for name, (seconds, count) in sorted(phases.items())
+            },
+        }
+
+
+def timed_phase(recorder: CallRecorder | None, name: str) -> AbstractContextManager[None]:
+    return recorder.phase(name) if recorder is not None else nullcontext()
+
+
+def print_profile(profile: dict[str, Any], stream: TextIO = sys.stderr) -> None:
+    print("", file=stream)
+    print(
+        f"API calls: {profile['calls']}, retries: {profile['retries']}, "
+        f"rate limit cost: {profile['rate_limit_cost']}, bytes: {profile['bytes']}",
+        file=stream,
+    )
+    print("endpoint\tcalls\terrors\tretries\tcost\tp50_ms\tp90_ms\tp99_ms\tmax_ms", file=stream)
+    for row in profile["endpoints"]:
+        print(
+            f"{row['endpoint']}\t{row['calls']}\t{row['errors']}\t{row['retries']}\t{row['rate_limit_cost']}"
+            f"\t{row['p50_ms']:.1f}\t{row['p90_ms']:.1f}\t{row['p99_ms']:.1f}\t{row['max_ms']:.1f}",
+            file=stream,
+        )
+    print("phase\tseconds\tcount", file=stream)
+    for name, phase in profile["phases"].items():
+        print(f"{name}\t{phase['seconds']:.3f}\t{phase['count']}", file=stream)
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""Capture everything the audit and security baseline read from an org into one compressed snapshot."""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from datetime import datetime, timezone
+
+from enforce_security_baseline import RepoRecord as SecurityRecord
+from enforce_security_baseline import iter_repos_with_security, read_codeql_state
+from github_client import RAW_MEDIA_TYPE, GitHubClient, add_transport_arguments, client_from_args
+from instrumentation import print_profile
+from repo_metadata_audit import RepoRecord, fetch_labels, iter_repository_pages
+from snapshot_io import Snapshot, SnapshotRepo, write_snapshot
+from work_pool import ordered_map
+
+
+def fetch_readme_text(client: GitHubClient, org: str, repo: str) -> str | None:
+    response = client.request("GET", f"repos/{org}/{repo}/readme", headers={"Accept": RAW_MEDIA_TYPE})
+    if response.status == 404:
+        return None
+    if not response.ok:
+        raise RuntimeError(f"GET repos/{org}/{repo}/readme: {response.error_message()}")
+    return response.body.decode("utf-8", errors="replace")
+
+
+def capture_repo(
+    client: GitHubClient, org: str, record: RepoRecord, security: SecurityRecord | None
+) -> SnapshotRepo:
+    repo_full = f"{org}/{record.name}"
+    labels = record.labels if record.labels is not None else fetch_labels(client, org, record.name)
+    readme_text = record.readme_text
+    if readme_text is None:
+        readme_text = fetch_readme_text(client, org, record.name)
+    alerts = client.request("GET", f"repos/{repo_full}/vulnerability-alerts")
+    return SnapshotRepo(
+        name=record.name,
+        is_private=record.is_private,
+        description=record.description,
+        url=record.url,
+        topics=list(record.topics),
+        labels=list(labels),
+        readme_text=readme_text,
+        pushed_at=record.pushed_at,
+        updated_at=record.updated_at,
+        repo_id=security.repo_id if security is not None else None,
+        security_and_analysis=(security.security_and_analysis or {}) if security is not None else {},
+        vulnerability_alerts=alerts.status == 204,
+        codeql_state=read_codeql_state(client, repo_full),
+    )
+
+
+def capture_org(client: GitHubClient, org: str, concurrency: int) -> list[SnapshotRepo]:
+    # The bulk listing already carries labels and most root READMEs; the REST listing adds security settings.
+    records = [record for page in iter_repository_pages(client, org, bulk=True) for record in page]
+    security = {repo.name: repo for repo in iter_repos_with_security(client, org)}
+    return list(
+        ordered_map(
+            lambda record: capture_repo(client, org, record, security.get(record.name)),
+            records,
+            concurrency,
+        )
+    )
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--org", action="append", required=True, help="Organization to capture (repeatable)")
+    parser.add_argument("--output", required=True, help="Snapshot path, e.g. org-snapshot.json.gz")
+    parser.add_argument("--concurrency", type=int, default=8, help="Repositories captured in parallel")
+    add_transport_arguments(parser)
+    args = parser.parse_args()
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    return args
+
+
+def main() -> int:
+    args = parse_args()
+    client = client_from_args(args)
+    captured_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    orgs = {}
+    for org in dict.fromkeys(args.org):
+        orgs[org] = capture_org(client, org, args.concurrency)
+        print(f"{org}\t{len(orgs[org])} repositories", flush=True)
+    write_snapshot(args.output, Snapshot(captured_at=captured_at, orgs=orgs))
+    if args.profile:
+        print_profile(client.recorder.summary())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
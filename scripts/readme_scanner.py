@@ -0,0 +1,141 @@
+"""Single-pass README scanner for the metadata audit rules."""
+
+from __future__ import annotations
+
+import re
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+
+BADGE_PATTERN = re.compile(r"!\[[^\]]*]\(\s*(?:https?:)?//img\.shields\.io/[^)]+\)", re.IGNORECASE)
+HEADING_PATTERN = re.compile(r"^#{2,6}\s+(.+?)\s*$")
+# Longest unfinished badge markup carried into the next line, so alt text may wrap.
+BADGE_CARRY_CHARS = 1024
+LINE_BREAKS = ("\n", "\r", "\x0b", "\x0c", "\x1c", "\x1d", "\x1e", "\x85", "\u2028", "\u2029")
+
+
+def normalize_text(value: str) -> str:
+    return re.sub(r"\s+", " ", re.sub(r"[^a-z0-9]+", " ", value.lower())).strip()
+
+
+class MultiPatternMatcher:
+    def __init__(self, patterns: Iterable[str]) -> None:
+        self.patterns = tuple(sorted(set(patterns), key=len, reverse=True))
+        # "" occurs in any text, so it is reported by every search instead of going into the regex.
+        self.matches_empty = "" in self.patterns
+        searched = [pattern for pattern in self.patterns if pattern]
+        self.max_length = len(self.patterns[0]) if self.patterns else 0
+        alternation = "|".join(re.escape(pattern) for pattern in searched)
+        self.regex = re.compile(f"(?=({alternation}))") if searched else None
+        self.implied = {
+            pattern: frozenset(other for other in self.patterns if other in pattern)
+            for pattern in self.patterns
+        }
+
+    def search(self, text: str) -> set[str]:
+        found = {""} if self.matches_empty else set()
+        if self.regex is None:
+            return found
+        for match in self.regex.finditer(text):
+            found.update(self.implied[match.group(1)])
+        return found
+
+
+@dataclass(frozen=True)
+class ReadmeRules:
+    need_title: bool = False
+    badge_target: int = 0
+    section_groups: tuple[tuple[str, ...], ...] = ()
+    groups_target: int = 0
+    needles: tuple[str, ...] = ()
+
+
+@dataclass
+class ReadmeFacts:
+    title_line: str = ""
+    badge_count: int = 0
+    matched_candidates: set[str] = field(default_factory=set)
+    found_needles: set[str] = field(default_factory=set)
+
+    def groups_matched(self, section_groups: tuple[tuple[str, ...], ...]) -> int:
+        return sum(
+            1 for group in section_groups if any(candidate in self.matched_candidates for candidate in group)
+        )
+
+
+class ReadmeScanner:
+    def __init__(self, rules: ReadmeRules) -> None:
+        self.rules = rules
+        self.facts = ReadmeFacts()
+        self.title_seen = not rules.need_title
+        candidates = [candidate for group in rules.section_groups for candidate in group]
+        self.candidate_matcher = MultiPatternMatcher(candidates)
+        self.needle_matcher = MultiPatternMatcher(rules.needles)
+        self.needle_tail = ""
+        self.badge_tail = ""
+        self.pending_line = ""
+        self.done = self.decided()
+
+    def decided(self) -> bool:
+        return (
+            self.title_seen
+            and self.facts.badge_count >= self.rules.badge_target
+            and self.facts.groups_matched(self.rules.section_groups) >= self.rules.groups_target
+            and len(self.facts.found_needles) == len(self.needle_matcher.patterns)
+        )
+
+    def feed(self, chunk: str) -> None:
+        if self.done:
+            return
+        lines = (self.pending_line + chunk).splitlines(keepends=True)
+        self.pending_line = ""
+        if lines and not lines[-1].endswith(LINE_BREAKS):
+            self.pending_line = lines.pop()
+        for line in lines:
+            self.scan_line(line)
+            if self.done:
+                return
+
+    def finish(self) -> ReadmeFacts:
+        if self.pending_line and not self.done:
+            self.scan_line(self.pending_line)
+            self.pending_line = ""
+        return self.facts
+
+    def scan_line(self, raw_line: str) -> None:
+        facts = self.facts
+        if len(facts.found_needles) < len(self.needle_matcher.patterns):
+            window = self.needle_tail + raw_line
+            facts.found_needles.update(self.needle_matcher.search(window))
+            overlap = self.needle_matcher.max_length - 1
+            self.needle_tail = window[-overlap:] if overlap > 0 else ""
+
+        line = raw_line.strip()
+        if not line:
+            return
+        if not facts.title_line:
+            facts.title_line = line
+            self.title_seen = True
+        if facts.badge_count < self.rules.badge_target and (self.badge_tail or "![" in line):
+            self.scan_badges(raw_line)
+        if self.candidate_matcher.patterns and line.startswith("##"):
+            match = HEADING_PATTERN.match(line)
+            if match:
+                facts.matched_candidates.update(self.candidate_matcher.search(normalize_text(match.group(1))))
+        self.done = self.decided()
+
+    def scan_badges(self, raw_line: str) -> None:
+        window = self.badge_tail + raw_line
+        end = 0
+        for match in BADGE_PATTERN.finditer(window):
+            self.facts.badge_count += 1
+            end = match.end()
+        start = window.find("![", end)
+        while start >= 0 and len(window) - start > BADGE_CARRY_CHARS:
+            start = window.find("![", start + 2)
+        self.badge_tail = window[start:] if start >= 0 else ""
+
+
+def scan_readme(readme_text: str, rules: ReadmeRules) -> ReadmeFacts:
+    scanner = ReadmeScanner(rules)
+    scanner.feed(readme_text)
+    return scanner.finish()
@@ -4,16 +4,34 @@
 from __future__ import annotations
 
 import argparse
-import base64
+import codecs
+import hashlib
 import json
-import os
-import re
-import subprocess
 import sys
-from dataclasses import dataclass
+import time
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any
 
+from audit_history import AuditHistory
+from github_client import (
+    RAW_MEDIA_TYPE,
+    ApiError,
+    GitHubClient,
+    OfflineTransport,
+    add_transport_arguments,
+    client_from_args,
+    next_page_query,
+)
+from instrumentation import CallRecorder, print_profile, timed_phase
+from readme_scanner import ReadmeFacts, ReadmeRules, ReadmeScanner, normalize_text, scan_readme
+from report_io import METADATA_AUDIT, NdjsonReportWriter, build_report, read_report, write_json_report
+from snapshot_io import Snapshot, SnapshotRepo, load_snapshot
+from work_pool import add_shard_argument, in_shard, ordered_map, round_robin
+
+DEFAULT_README_MAX_KB = 512
+
 
 @dataclass
 class RepoRecord:
@@ -22,6 +40,13 @@ class RepoRecord:
     description: str
     url: str
     topics: list[str]
+    labels: list[str] | None = None
+    readme_text: str | None = None
+    pushed_at: str = ""
+    updated_at: str = ""
+    org: str = ""
+    # Set when the listing already knows there is no README, so none is fetched.
+    readme_absent: bool = False
 
 
 @dataclass
@@ -36,19 +61,52 @@ class RepoResult:
     readme_bytes: int
     violations: list[str]
     warnings: list[str]
+    pushed_at: str = ""
+    updated_at: str = ""
+    org: str = ""
+    skipped_fetches: list[str] = field(default_factory=list)
+    # Copied from the --since-report report; this run made no fetches or fetch decisions for it.
+    reused: bool = False
+    # Per-policy verdicts keyed by policy name, only set when several policies are evaluated.
+    policy_results: dict[str, dict[str, list[str]]] = field(default_factory=dict)
 
     @property
     def compliant(self) -> bool:
         return not self.violations
 
 
+@dataclass
+class ReadmeFetch:
+    present: bool
+    size: int
+    facts: ReadmeFacts
+
+
+@dataclass
+class PreviousReport:
+    results: dict[str, dict[str, Any]]
+    reusable_visibilities: set[str]
+
+
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description=__doc__)
-    parser.add_argument("--org", required=True, help="GitHub organization name")
+    parser.add_argument(
+        "--org",
+        action="append",
+        default=[],
+        help="GitHub organization name (repeatable; all orgs share one client, cache and request budget).",
+    )
+    parser.add_argument(
+        "--org-file",
+        default=None,
+        help="File with one organization per line (blank lines and # comments ignored), added to --org.",
+    )
     parser.add_argument(
         "--policy",
-        default="config/repo-metadata-policy.json",
-        help="Path to JSON policy config",
+        action="append",
+        default=[],
+        help="Path to JSON policy config (repeatable; extra policies are evaluated on the same fetched data "
+        "and reported as a repo x policy matrix, the first one sets the exit code).",
     )
     parser.add_argument(
         "--visibility",
@@ -61,122 +119,387 @@ def parse_args() -> argparse.Namespace:
         default=None,
         help="Optional file path for full JSON report",
     )
-    return parser.parse_args()
-
-
-def run_gh(args: list[str]) -> str:
-    env = os.environ.copy()
-    if "GH_TOKEN" not in env and "GITHUB_TOKEN" in env:
-        env["GH_TOKEN"] = env["GITHUB_TOKEN"]
-
-    proc = subprocess.run(
-        ["gh", *args],
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        text=True,
-        env=env,
-        check=False,
+    parser.add_argument(
+        "--output-ndjson",
+        default=None,
+        help="Optional NDJSON report, appended as each repo finishes (convert with report_io.py to-json).",
     )
-    if proc.returncode != 0:
-        raise RuntimeError(proc.stderr.strip() or f"gh command failed: {' '.join(args)}")
-    return proc.stdout
-
-
-def gh_api(path: str) -> Any:
-    return json.loads(run_gh(["api", path]))
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=1,
+        help="Repositories fetched in parallel (labels + README).",
+    )
+    parser.add_argument(
+        "--fetch-mode",
+        choices=("rest", "graphql"),
+        default="rest",
+        help="graphql pulls labels and HEAD:README.md with the repo listing; REST covers the rest.",
+    )
+    parser.add_argument(
+        "--since-report",
+        default=None,
+        help="Previous --output-json report; unchanged repos reuse their prior result without fetches.",
+    )
+    parser.add_argument(
+        "--snapshot",
+        default=None,
+        help="Evaluate a file from org_snapshot.py instead of the live API (orgs default to all captured).",
+    )
+    parser.add_argument(
+        "--history-db",
+        default=None,
+        help="Optional SQLite database that each run is appended to (query it with audit_history.py).",
+    )
+    parser.add_argument(
+        "--readme-max-kb",
+        type=int,
+        default=DEFAULT_README_MAX_KB,
+        help=f"Stop reading a README after this many KiB if the rules are still undecided "
+        f"(default: {DEFAULT_README_MAX_KB}).",
+    )
+    add_shard_argument(parser)
+    add_transport_arguments(parser)
+    args = parser.parse_args()
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    if args.readme_max_kb < 1:
+        parser.error("--readme-max-kb must be at least 1")
+    args.policies = list(dict.fromkeys(args.policy)) or ["config/repo-metadata-policy.json"]
+    if len(args.policies) > 1 and args.since_report:
+        parser.error("--since-report only supports a single --policy")
+    args.orgs = list(dict.fromkeys(args.org + (load_org_file(args.org_file) if args.org_file else [])))
+    if not args.orgs and not args.snapshot:
+        parser.error("at least one --org or an --org-file is required")
+    return args
 
 
-def gh_graphql(query: str, variables: dict[str, str]) -> Any:
-    args = ["api", "graphql", "-f", f"query={query}"]
-    for key, value in variables.items():
-        args.extend(["-f", f"{key}={value}"])
-    return json.loads(run_gh(args))
+def load_org_file(path: str) -> list[str]:
+    orgs = []
+    for line in Path(path).read_text(encoding="utf-8").splitlines():
+        org = line.split("#", 1)[0].strip()
+        if org:
+            orgs.append(org)
+    return orgs
 
 
 def load_policy(path: str) -> dict[str, Any]:
     return json.loads(Path(path).read_text(encoding="utf-8"))
 
 
-def fetch_repositories(org: str) -> list[RepoRecord]:
-    query = """
-    query($org: String!, $cursor: String) {
-      organization(login: $org) {
-        repositories(first: 100, after: $cursor, orderBy: {field: NAME, direction: ASC}) {
+REPOSITORY_QUERY = """
+query($org: String!, $cursor: String) {
+  rateLimit {
+    cost
+  }
+  organization(login: $org) {
+    repositories(first: %(page_size)d, after: $cursor, orderBy: {field: NAME, direction: ASC}) {
+      pageInfo {
+        hasNextPage
+        endCursor
+      }
+      nodes {
+        name
+        isPrivate
+        description
+        url
+        pushedAt
+        updatedAt
+        repositoryTopics(first: %(connection_size)d) {
+          totalCount
           pageInfo {
-            hasNextPage
             endCursor
           }
           nodes {
-            name
-            isPrivate
-            description
-            url
-            repositoryTopics(first: 100) {
-              nodes {
-                topic {
-                  name
-                }
-              }
+            topic {
+              name
             }
           }
+        }%(bulk_fields)s
+      }
+    }
+  }
+}
+""".strip()
+
+BULK_FIELDS = """
+        labels(first: %(connection_size)d) {
+          totalCount
+          nodes {
+            name
+          }
+        }
+        readme: object(expression: "HEAD:README.md") {
+          ... on Blob {
+            text
+            isBinary
+            isTruncated
+          }
+        }"""
+
+TOPICS_QUERY = """
+query($owner: String!, $name: String!, $cursor: String) {
+  repository(owner: $owner, name: $name) {
+    repositoryTopics(first: 100, after: $cursor) {
+      pageInfo {
+        hasNextPage
+        endCursor
+      }
+      nodes {
+        topic {
+          name
         }
       }
     }
-    """.strip()
+  }
+}
+""".strip()
+
+BULK_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 100
+MIN_PAGE_SIZE = 10
+MIN_CONNECTION_SIZE = 10
+# GraphQL latency grows with the nodes a page requests (repos times their nested connection slices),
+# so pages are capped to this many nodes; slow pages shrink and pages under half the limit grow.
+MAX_QUERY_NODES = 10_000
+SLOW_PAGE_SECONDS = 5.0
+
 
-    repos: list[RepoRecord] = []
+@dataclass
+class PageSizer:
+    page_size: int
+    # Nested connections requested per repo: topics, plus labels in bulk mode.
+    connections: int = 1
+    connection_size: int = MAX_PAGE_SIZE
+    largest_connection: int = 0
+    # Growth never returns to a page size that already timed out.
+    page_limit: int = MAX_PAGE_SIZE
+
+    def __post_init__(self) -> None:
+        self.page_size = min(self.page_size, self.node_limit)
+
+    @property
+    def node_limit(self) -> int:
+        nodes_per_repo = 1 + self.connections * self.connection_size
+        return max(MIN_PAGE_SIZE, MAX_QUERY_NODES // nodes_per_repo)
+
+    def observe(self, seconds: float, largest_connection: int) -> None:
+        # Nested connections follow the largest topic/label count seen; bigger ones are paginated separately.
+        self.largest_connection = max(self.largest_connection, largest_connection)
+        rounded = -(-self.largest_connection // MIN_CONNECTION_SIZE) * MIN_CONNECTION_SIZE
+        self.connection_size = min(MAX_PAGE_SIZE, max(MIN_CONNECTION_SIZE, rounded))
+        if seconds > SLOW_PAGE_SECONDS:
+            self.page_size = max(MIN_PAGE_SIZE, self.page_size // 2)
+        elif seconds * 2 <= SLOW_PAGE_SECONDS:
+            self.page_size = self.page_size + self.page_size // 2
+        self.page_size = max(MIN_PAGE_SIZE, min(self.page_size, self.page_limit, self.node_limit))
+
+    @property
+    def can_shrink(self) -> bool:
+        return self.page_size > MIN_PAGE_SIZE or self.connection_size > MIN_CONNECTION_SIZE
+
+    def shrink(self) -> bool:
+        if self.page_size > MIN_PAGE_SIZE:
+            self.page_limit = self.page_size - 1
+            self.page_size = max(MIN_PAGE_SIZE, self.page_size // 2)
+        elif self.connection_size > MIN_CONNECTION_SIZE:
+            self.connection_size = max(MIN_CONNECTION_SIZE, self.connection_size // 2)
+        else:
+            return False
+        return True
+
+
+def repository_query(bulk: bool, page_size: int | None = None, connection_size: int = MAX_PAGE_SIZE) -> str:
+    if page_size is None:
+        page_size = BULK_PAGE_SIZE if bulk else MAX_PAGE_SIZE
+    sizes = {"page_size": page_size, "connection_size": connection_size}
+    bulk_fields = BULK_FIELDS % sizes if bulk else ""
+    return REPOSITORY_QUERY % {**sizes, "bulk_fields": bulk_fields}
+
+
+def is_query_timeout(error: ApiError) -> bool:
+    message = str(error).lower()
+    return error.status in (502, 504) or "timeout" in message or "timed out" in message
+
+
+def readme_from_node(node: dict[str, Any]) -> str | None:
+    blob = node.get("readme")
+    if not blob or blob.get("isBinary") or blob.get("isTruncated") or blob.get("text") is None:
+        return None
+    return blob["text"]
+
+
+def record_from_node(node: dict[str, Any], org: str = "") -> RepoRecord:
+    record = RepoRecord(
+        name=node["name"],
+        is_private=bool(node["isPrivate"]),
+        description=node.get("description") or "",
+        url=node["url"],
+        topics=[
+            topic_node["topic"]["name"]
+            for topic_node in node["repositoryTopics"]["nodes"]
+            if topic_node.get("topic") and topic_node["topic"].get("name")
+        ],
+        pushed_at=node.get("pushedAt") or "",
+        updated_at=node.get("updatedAt") or "",
+        org=org,
+    )
+    if "labels" in node:
+        labels = node["labels"]
+        record.labels = [label_node["name"] for label_node in labels["nodes"]]
+        # A truncated label list is left unknown so the paginated REST fetch fills it if the policy needs it.
+        if labels.get("totalCount", 0) > len(record.labels):
+            record.labels = None
+        record.readme_text = readme_from_node(node)
+    return record
+
+
+def topics_overflow(node: dict[str, Any]) -> str | None:
+    topics = node["repositoryTopics"]
+    if topics.get("totalCount", 0) > len(topics["nodes"]):
+        return topics["pageInfo"]["endCursor"]
+    return None
+
+
+def largest_connection(nodes: list[dict[str, Any]]) -> int:
+    counts = [node["repositoryTopics"].get("totalCount", 0) for node in nodes]
+    counts += [node["labels"].get("totalCount", 0) for node in nodes if "labels" in node]
+    return max(counts, default=0)
+
+
+def fetch_remaining_topics(client: GitHubClient, org: str, repo: str, cursor: str) -> list[str]:
+    topics: list[str] = []
+    while True:
+        data = client.graphql(TOPICS_QUERY, {"owner": org, "name": repo, "cursor": cursor})
+        connection = data["data"]["repository"]["repositoryTopics"]
+        topics.extend(node["topic"]["name"] for node in connection["nodes"] if node.get("topic"))
+        if not connection["pageInfo"]["hasNextPage"]:
+            return topics
+        cursor = connection["pageInfo"]["endCursor"]
+
+
+def record_from_rest(item: dict[str, Any], org: str = "") -> RepoRecord:
+    return RepoRecord(
+        name=item["name"],
+        is_private=bool(item["private"]),
+        description=item.get("description") or "",
+        url=item["html_url"],
+        topics=list(item.get("topics") or []),
+        pushed_at=item.get("pushed_at") or "",
+        updated_at=item.get("updated_at") or "",
+        org=org,
+    )
+
+
+def fetch_repo_record(client: GitHubClient, org: str, repo: str) -> RepoRecord | None:
+    response = client.request("GET", f"repos/{org}/{repo}")
+    # Deleted repos 404; renamed and transferred ones answer with a redirect to the new location.
+    if response.status in (301, 404):
+        return None
+    if not response.ok:
+        raise RuntimeError(f"GET repos/{org}/{repo}: {response.error_message()}")
+    return record_from_rest(response.json(), org)
+
+
+def record_from_snapshot(repo: SnapshotRepo, org: str) -> RepoRecord:
+    return RepoRecord(
+        name=repo.name,
+        is_private=repo.is_private,
+        description=repo.description,
+        url=repo.url,
+        topics=list(repo.topics),
+        labels=list(repo.labels),
+        readme_text=repo.readme_text,
+        pushed_at=repo.pushed_at,
+        updated_at=repo.updated_at,
+        org=org,
+        readme_absent=repo.readme_text is None,
+    )
+
+
+def snapshot_pages(snapshot: Snapshot, org: str) -> Iterator[list[RepoRecord]]:
+    return iter([[record_from_snapshot(repo, org) for repo in snapshot.repos(org)]])
+
+
+def iter_repository_pages(client: GitHubClient, org: str, bulk: bool = False) -> Iterator[list[RepoRecord]]:
+    sizer = PageSizer(BULK_PAGE_SIZE if bulk else MAX_PAGE_SIZE, connections=2 if bulk else 1)
     cursor = ""
     while True:
         variables = {"org": org}
         if cursor:
             variables["cursor"] = cursor
-        data = gh_graphql(query, variables)
+        started = time.perf_counter()
+        query = repository_query(bulk, sizer.page_size, sizer.connection_size)
+        try:
+            # Timeouts come straight back here: retrying the same page size would likely time out again.
+            data = client.graphql(query, variables, retry_timeouts=not sizer.can_shrink)
+        except ApiError as error:
+            if is_query_timeout(error) and sizer.shrink():
+                continue
+            raise
+        seconds = time.perf_counter() - started
         repo_page = data["data"]["organization"]["repositories"]
-        for node in repo_page["nodes"]:
-            repos.append(
-                RepoRecord(
-                    name=node["name"],
-                    is_private=bool(node["isPrivate"]),
-                    description=node.get("description") or "",
-                    url=node["url"],
-                    topics=[
-                        topic_node["topic"]["name"]
-                        for topic_node in node["repositoryTopics"]["nodes"]
-                        if topic_node.get("topic") and topic_node["topic"].get("name")
-                    ],
-                )
-            )
+        nodes = repo_page["nodes"]
+        records = [record_from_node(node, org) for node in nodes]
+        for record, node in zip(records, nodes):
+            topics_cursor = topics_overflow(node)
+            if topics_cursor is not None:
+                record.topics.extend(fetch_remaining_topics(client, org, record.name, topics_cursor))
+        sizer.observe(seconds, largest_connection(nodes))
+        yield records
         if not repo_page["pageInfo"]["hasNextPage"]:
             break
         cursor = repo_page["pageInfo"]["endCursor"]
-    return repos
 
 
-def fetch_labels(org: str, repo: str) -> list[str]:
-    labels = gh_api(f"repos/{org}/{repo}/labels?per_page=100")
-    return [label["name"] for label in labels]
+def iter_targets(
+    pages: Iterable[list[RepoRecord]],
+    visibility: str,
+    excluded: set[str],
+) -> Iterator[RepoRecord]:
+    for page in pages:
+        for record in page:
+            if include_repo(record, visibility, excluded):
+                yield record
 
 
-def fetch_readme(org: str, repo: str) -> tuple[bool, str]:
-    env = os.environ.copy()
-    if "GH_TOKEN" not in env and "GITHUB_TOKEN" in env:
-        env["GH_TOKEN"] = env["GITHUB_TOKEN"]
-    proc = subprocess.run(
-        ["gh", "api", f"repos/{org}/{repo}/readme"],
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        text=True,
-        env=env,
-        check=False,
-    )
-    if proc.returncode != 0:
-        if "404" in proc.stderr:
-            return (False, "")
-        raise RuntimeError(proc.stderr.strip())
-    payload = json.loads(proc.stdout)
-    content = (payload.get("content") or "").replace("\n", "")
-    decoded = base64.b64decode(content).decode("utf-8", errors="replace") if content else ""
-    return (True, decoded)
+def fetch_labels(client: GitHubClient, org: str, repo: str) -> list[str]:
+    labels: list[str] = []
+    query: str | None = "per_page=100"
+    while query is not None:
+        path = f"repos/{org}/{repo}/labels?{query}"
+        response = client.request("GET", path)
+        if not response.ok:
+            raise ApiError(response.status, f"GET {path}: {response.error_message()}")
+        labels.extend(label["name"] for label in response.json())
+        query = next_page_query(response)
+    return labels
+
+
+def fetch_readme(client: GitHubClient, org: str, repo: str, rules: ReadmeRules, byte_cap: int) -> ReadmeFetch:
+    # The raw media type skips the base64 JSON envelope, so the body can be scanned as it arrives and
+    # abandoned once every rule is decided or byte_cap is reached.
+    state: dict[str, Any] = {}
+
+    def consume(chunk: bytes, offset: int) -> bool:
+        if offset == 0:
+            state["decoder"] = codecs.getincrementaldecoder("utf-8")(errors="replace")
+            state["scanner"] = ReadmeScanner(rules)
+        scanner: ReadmeScanner = state["scanner"]
+        if scanner.done or offset >= byte_cap:
+            return False
+        scanner.feed(state["decoder"].decode(chunk[: byte_cap - offset]))
+        return not scanner.done and offset + len(chunk) < byte_cap
+
+    response = client.stream(f"repos/{org}/{repo}/readme", consume, {"Accept": RAW_MEDIA_TYPE})
+    if response.status == 404:
+        return ReadmeFetch(False, 0, ReadmeFacts())
+    if not response.ok:
+        raise RuntimeError(f"GET repos/{org}/{repo}/readme: {response.error_message()}")
+    scanner = state.get("scanner") or ReadmeScanner(rules)
+    if "decoder" in state:
+        scanner.feed(state["decoder"].decode(b"", final=True))
+    return ReadmeFetch(True, response.size or 0, scanner.finish())
 
 
 def include_repo(record: RepoRecord, visibility: str, excluded: set[str]) -> bool:
@@ -191,52 +514,182 @@ def include_repo(record: RepoRecord, visibility: str, excluded: set[str]) -> boo
     raise ValueError(f"Unsupported visibility mode: {visibility}")
 
 
-def normalize_text(value: str) -> str:
-    return re.sub(r"\s+", " ", re.sub(r"[^a-z0-9]+", " ", value.lower())).strip()
+@dataclass(frozen=True)
+class ReadmeMinimum:
+    require_title: bool
+    min_badges: int
+    section_groups: tuple[tuple[str, ...], ...]
+    min_groups_matched: int
+
+
+@dataclass(frozen=True)
+class VisibilityRules:
+    required_topics: tuple[str, ...]
+    warn_topics: tuple[str, ...]
+    required_labels: tuple[str, ...]
+    warn_labels: tuple[str, ...]
+    min_topics: int
+    require_readme: bool
+    readme_contains: tuple[str, ...]
+    readme_minimum: ReadmeMinimum | None
+    readme_rules: ReadmeRules
+    readme_byte_cap: int
+    needs_labels: bool
+    needs_readme: bool
+
+
+@dataclass(frozen=True)
+class CompiledPolicy:
+    name: str
+    require_description: bool
+    public: VisibilityRules
+    private: VisibilityRules
+
+    def rules_for(self, is_private: bool) -> VisibilityRules:
+        return self.private if is_private else self.public
+
+
+@dataclass(frozen=True)
+class PolicyMatrix:
+    policies: tuple[CompiledPolicy, ...]
+    # Union of every policy's needs, so each repo is fetched and each README scanned once.
+    plan: CompiledPolicy
+
+    @property
+    def names(self) -> list[str]:
+        return [policy.name for policy in self.policies]
+
+
+def compile_readme_minimum(minimum: dict[str, Any]) -> ReadmeMinimum | None:
+    if not minimum:
+        return None
+    groups = minimum.get("required_section_groups", []) or []
+    return ReadmeMinimum(
+        require_title=bool(minimum.get("require_title", False)),
+        min_badges=int(minimum.get("min_badges", 0) or 0),
+        section_groups=tuple(tuple(normalize_text(candidate) for candidate in group) for group in groups),
+        min_groups_matched=int(minimum.get("min_required_groups_matched", len(groups))),
+    )
 
 
-def readme_minimum_violations(readme_text: str, minimum: dict[str, Any]) -> list[str]:
+def compile_visibility_rules(
+    policy: dict[str, Any],
+    is_private: bool,
+    readme_max_bytes: int = DEFAULT_README_MAX_KB * 1024,
+) -> VisibilityRules:
+    def merged(key: str) -> tuple[str, ...]:
+        values = list(policy.get(key, []) or [])
+        if not is_private:
+            values.extend(policy.get(f"public_{key}", []) or [])
+        return tuple(sorted(set(values)))
+
+    minimum = policy.get("readme_minimum", {}) or {}
+    if not is_private and policy.get("public_readme_minimum"):
+        minimum = policy["public_readme_minimum"]
+    readme_minimum = compile_readme_minimum(minimum)
+    readme_contains = tuple(needle for needle in policy.get("required_readme_contains", []) or [] if needle)
+    readme_rules = readme_rules_for(readme_minimum, readme_contains)
+    body_decided = ReadmeScanner(readme_rules).done
+    required_labels, warn_labels = merged("required_labels"), merged("warn_labels")
+    require_readme = bool(policy.get("required_readme", False)) or (
+        not is_private and bool(policy.get("public_required_readme", False))
+    )
+
+    return VisibilityRules(
+        required_topics=merged("required_topics"),
+        warn_topics=merged("warn_topics"),
+        required_labels=required_labels,
+        warn_labels=warn_labels,
+        min_topics=0 if is_private else int(policy.get("public_min_topics", 0) or 0),
+        require_readme=require_readme,
+        readme_contains=readme_contains,
+        readme_minimum=readme_minimum,
+        readme_rules=readme_rules,
+        # Rules that need nothing from the README body only need its status and size.
+        readme_byte_cap=0 if body_decided else readme_max_bytes,
+        needs_labels=bool(required_labels or warn_labels),
+        needs_readme=require_readme or not body_decided,
+    )
+
+
+def compile_policy(
+    policy: dict[str, Any], readme_max_bytes: int = DEFAULT_README_MAX_KB * 1024
+) -> CompiledPolicy:
+    return CompiledPolicy(
+        name=policy.get("policy_name", "unknown"),
+        require_description=bool(policy.get("required_repo_description", False)),
+        public=compile_visibility_rules(policy, False, readme_max_bytes),
+        private=compile_visibility_rules(policy, True, readme_max_bytes),
+    )
+
+
+def compile_matrix(policies: list[CompiledPolicy]) -> PolicyMatrix:
+    names = [policy.name for policy in policies]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"policy names must be unique, got {', '.join(duplicates)} more than once")
+    plan = CompiledPolicy(
+        name=" + ".join(names),
+        require_description=any(policy.require_description for policy in policies),
+        public=merge_visibility_rules([policy.public for policy in policies]),
+        private=merge_visibility_rules([policy.private for policy in policies]),
+    )
+    return PolicyMatrix(policies=tuple(policies), plan=plan)
+
+
+def merge_visibility_rules(rules: list[VisibilityRules]) -> VisibilityRules:
+    def union(values: Iterable[tuple[str, ...]]) -> tuple[str, ...]:
+        return tuple(sorted({value for group in values for value in group}))
+
+    readme_rules = [rule.readme_rules for rule in rules]
+    section_groups = tuple(dict.fromkeys(group for rule in readme_rules for group in rule.section_groups))
+    # Scanning stops early only once every policy is decided, so wait for all merged groups.
+    groups_needed = any(rule.groups_target for rule in readme_rules)
+    return VisibilityRules(
+        required_topics=union(rule.required_topics for rule in rules),
+        warn_topics=union(rule.warn_topics for rule in rules),
+        required_labels=union(rule.required_labels for rule in rules),
+        warn_labels=union(rule.warn_labels for rule in rules),
+        min_topics=max(rule.min_topics for rule in rules),
+        require_readme=any(rule.require_readme for rule in rules),
+        readme_contains=union(rule.readme_contains for rule in rules),
+        readme_minimum=None,
+        readme_rules=ReadmeRules(
+            need_title=any(rule.need_title for rule in readme_rules),
+            badge_target=max(rule.badge_target for rule in readme_rules),
+            section_groups=section_groups,
+            groups_target=len(section_groups) if groups_needed else 0,
+            needles=union(rule.needles for rule in readme_rules),
+        ),
+        readme_byte_cap=max(rule.readme_byte_cap for rule in rules),
+        needs_labels=any(rule.needs_labels for rule in rules),
+        needs_readme=any(rule.needs_readme for rule in rules),
+    )
+
+
+def readme_rules_for(minimum: ReadmeMinimum | None, needles: tuple[str, ...]) -> ReadmeRules:
+    if minimum is None:
+        return ReadmeRules(needles=needles)
+    return ReadmeRules(
+        need_title=minimum.require_title,
+        badge_target=minimum.min_badges,
+        section_groups=minimum.section_groups,
+        groups_target=minimum.min_groups_matched if minimum.section_groups else 0,
+        needles=needles,
+    )
+
+
+def readme_minimum_violations(facts: ReadmeFacts, minimum: ReadmeMinimum) -> list[str]:
     violations: list[str] = []
-    lines = [line.strip() for line in readme_text.splitlines()]
-    non_empty = [line for line in lines if line]
-
-    if minimum.get("require_title", False):
-        first_line = non_empty[0] if non_empty else ""
-        if not first_line.startswith("# "):
-            violations.append("readme_missing_title")
-
-    min_badges = int(minimum.get("min_badges", 0) or 0)
-    if min_badges > 0:
-        badge_count = len(
-            re.findall(
-                r"!\[[^\]]*]\(\s*(?:https?:)?//img\.shields\.io/[^)]+\)",
-                readme_text,
-                flags=re.IGNORECASE,
-            )
-        )
-        if badge_count < min_badges:
-            violations.append(f"readme_badges_below_min:{badge_count}<{min_badges}")
-
-    required_groups = minimum.get("required_section_groups", []) or []
-    if required_groups:
-        normalized_headings: list[str] = []
-        for line in readme_text.splitlines():
-            match = re.match(r"^#{2,6}\s+(.+?)\s*$", line.strip())
-            if match:
-                normalized_headings.append(normalize_text(match.group(1)))
-
-        matched_groups = 0
-        for group in required_groups:
-            group_matched = False
-            for candidate in group:
-                normalized_candidate = normalize_text(candidate)
-                if any(normalized_candidate in heading for heading in normalized_headings):
-                    group_matched = True
-                    break
-            if group_matched:
-                matched_groups += 1
-
-        min_groups = int(minimum.get("min_required_groups_matched", len(required_groups)))
+    if minimum.require_title and not facts.title_line.startswith("# "):
+        violations.append("readme_missing_title")
+
+    if minimum.min_badges > 0 and facts.badge_count < minimum.min_badges:
+        violations.append(f"readme_badges_below_min:{facts.badge_count}<{minimum.min_badges}")
+
+    if minimum.section_groups:
+        matched_groups = facts.groups_matched(minimum.section_groups)
+        min_groups = minimum.min_groups_matched
         if matched_groups < min_groups:
             violations.append(f"readme_section_groups_below_min:{matched_groups}<{min_groups}")
 
@@ -248,65 +701,43 @@ def evaluate_repo(
     labels: list[str],
     readme_present: bool,
     readme_text: str,
-    policy: dict[str, Any],
+    policy: CompiledPolicy | dict[str, Any],
+    readme_facts: ReadmeFacts | None = None,
+    readme_bytes: int | None = None,
 ) -> RepoResult:
-    required_topics = list(policy.get("required_topics", []))
-    required_labels = list(policy.get("required_labels", []))
-    warn_topics = list(policy.get("warn_topics", []))
-    warn_labels = list(policy.get("warn_labels", []))
-
-    if not record.is_private:
-        required_topics.extend(policy.get("public_required_topics", []))
-        required_labels.extend(policy.get("public_required_labels", []))
-        warn_topics.extend(policy.get("public_warn_topics", []))
-        warn_labels.extend(policy.get("public_warn_labels", []))
+    compiled = policy if isinstance(policy, CompiledPolicy) else compile_policy(policy)
+    rules = compiled.rules_for(record.is_private)
+    topic_set = frozenset(record.topics)
+    label_set = frozenset(labels)
 
     violations: list[str] = []
     warnings: list[str] = []
 
-    if policy.get("required_repo_description", False) and not record.description.strip():
+    if compiled.require_description and not record.description.strip():
         violations.append("missing_description")
 
-    for topic in sorted(set(required_topics)):
-        if topic not in record.topics:
-            violations.append(f"missing_topic:{topic}")
-
-    public_min_topics = int(policy.get("public_min_topics", 0) or 0)
-    if not record.is_private and public_min_topics > 0 and len(record.topics) < public_min_topics:
-        violations.append(f"public_topics_below_min:{len(record.topics)}<{public_min_topics}")
-
-    for topic in sorted(set(warn_topics)):
-        if topic not in record.topics:
-            warnings.append(f"missing_topic_warning:{topic}")
-
-    for label in sorted(set(required_labels)):
-        if label not in labels:
-            violations.append(f"missing_label:{label}")
-
-    for label in sorted(set(warn_labels)):
-        if label not in labels:
-            warnings.append(f"missing_label_warning:{label}")
-
-    require_readme = bool(policy.get("required_readme", False))
-    if not record.is_private and policy.get("public_required_readme", False):
-        require_readme = True
+    violations.extend(f"missing_topic:{topic}" for topic in rules.required_topics if topic not in topic_set)
+    if rules.min_topics > 0 and len(record.topics) < rules.min_topics:
+        violations.append(f"public_topics_below_min:{len(record.topics)}<{rules.min_topics}")
+    warnings.extend(f"missing_topic_warning:{topic}" for topic in rules.warn_topics if topic not in topic_set)
+    violations.extend(f"missing_label:{label}" for label in rules.required_labels if label not in label_set)
+    warnings.extend(f"missing_label_warning:{label}" for label in rules.warn_labels if label not in label_set)
 
-    if require_readme and not readme_present:
+    if rules.require_readme and not readme_present:
         violations.append("missing_readme")
 
     if readme_present:
-        for needle in policy.get("required_readme_contains", []) or []:
-            if needle not in readme_text:
-                violations.append(f"readme_missing_text:{needle}")
-
-        minimum = policy.get("readme_minimum", {}) or {}
-        if not record.is_private:
-            public_minimum = policy.get("public_readme_minimum", {}) or {}
-            if public_minimum:
-                minimum = public_minimum
-        if minimum:
-            violations.extend(readme_minimum_violations(readme_text, minimum))
+        facts = readme_facts if readme_facts is not None else scan_readme(readme_text, rules.readme_rules)
+        violations.extend(
+            f"readme_missing_text:{needle}"
+            for needle in rules.readme_contains
+            if needle not in facts.found_needles
+        )
+        if rules.readme_minimum is not None:
+            violations.extend(readme_minimum_violations(facts, rules.readme_minimum))
 
+    if readme_bytes is None:
+        readme_bytes = len(readme_text.encode("utf-8"))
     visibility = "private" if record.is_private else "public"
     return RepoResult(
         name=record.name,
@@ -316,69 +747,390 @@ def evaluate_repo(
         topics=sorted(record.topics),
         labels=sorted(labels),
         readme_present=readme_present,
-        readme_bytes=len(readme_text.encode("utf-8")) if readme_present else 0,
+        readme_bytes=readme_bytes if readme_present else 0,
         violations=sorted(set(violations)),
         warnings=sorted(set(warnings)),
+        pushed_at=record.pushed_at,
+        updated_at=record.updated_at,
+    )
+
+
+def fetch_failed_result(record: RepoRecord, error: str) -> RepoResult:
+    return RepoResult(
+        name=record.name,
+        visibility="private" if record.is_private else "public",
+        url=record.url,
+        description_present=bool(record.description.strip()),
+        topics=sorted(record.topics),
+        labels=[],
+        readme_present=False,
+        readme_bytes=0,
+        violations=[f"fetch_failed:{' '.join(error.split())}"],
+        warnings=[],
+    )
+
+
+PRIVATE_POLICY_KEYS = (
+    "required_repo_description",
+    "required_readme",
+    "required_topics",
+    "required_labels",
+    "warn_topics",
+    "warn_labels",
+    "required_readme_contains",
+    "readme_minimum",
+)
+PUBLIC_POLICY_KEYS = PRIVATE_POLICY_KEYS + (
+    "public_min_topics",
+    "public_required_topics",
+    "public_required_labels",
+    "public_warn_topics",
+    "public_warn_labels",
+    "public_required_readme",
+    "public_readme_minimum",
+)
+
+
+def policy_fingerprints(policy: dict[str, Any]) -> dict[str, str]:
+    fingerprints: dict[str, str] = {}
+    for visibility, keys in (("private", PRIVATE_POLICY_KEYS), ("public", PUBLIC_POLICY_KEYS)):
+        rules = {key: policy.get(key) for key in keys}
+        encoded = json.dumps(rules, sort_keys=True).encode("utf-8")
+        fingerprints[visibility] = hashlib.sha256(encoded).hexdigest()
+    return fingerprints
+
+
+def load_previous_report(path: str, policy: dict[str, Any]) -> PreviousReport:
+    _, report = read_report(path)
+    previous_fingerprints = report.get("policy_fingerprints", {})
+    current_fingerprints = policy_fingerprints(policy)
+    report_org = report.get("org", "")
+    results = report.get("results", [])
+    return PreviousReport(
+        results={f"{result.get('org') or report_org}/{result['name']}": result for result in results},
+        reusable_visibilities={
+            visibility
+            for visibility, fingerprint in current_fingerprints.items()
+            if previous_fingerprints.get(visibility) == fingerprint
+        },
     )
 
 
-def print_report(org: str, policy_name: str, visibility: str, results: list[RepoResult]) -> None:
+def reuse_previous_result(record: RepoRecord, previous: PreviousReport, org: str) -> RepoResult | None:
+    visibility = "private" if record.is_private else "public"
+    prior = previous.results.get(f"{org}/{record.name}")
+    if visibility not in previous.reusable_visibilities or prior is None:
+        return None
+    if not record.pushed_at or not record.updated_at:
+        return None
+    if (prior.get("pushed_at"), prior.get("updated_at")) != (record.pushed_at, record.updated_at):
+        return None
+    if prior.get("visibility") != visibility or any(
+        violation.startswith("fetch_failed:") for violation in prior.get("violations", [])
+    ):
+        return None
+    result = result_from_dict(prior)
+    result.reused = True
+    return result
+
+
+def result_to_dict(result: RepoResult) -> dict[str, Any]:
+    return {
+        "name": result.name,
+        "org": result.org,
+        "visibility": result.visibility,
+        "url": result.url,
+        "description_present": result.description_present,
+        "topics": result.topics,
+        "labels": result.labels,
+        "readme_present": result.readme_present,
+        "readme_bytes": result.readme_bytes,
+        "violations": result.violations,
+        "warnings": result.warnings,
+        "pushed_at": result.pushed_at,
+        "updated_at": result.updated_at,
+        "skipped_fetches": result.skipped_fetches,
+        **({"policies": result.policy_results} if result.policy_results else {}),
+        **({"reused": True} if result.reused else {}),
+    }
+
+
+def result_from_dict(data: dict[str, Any]) -> RepoResult:
+    return RepoResult(
+        name=data["name"],
+        visibility=data["visibility"],
+        url=data["url"],
+        description_present=data["description_present"],
+        topics=list(data["topics"]),
+        labels=list(data["labels"]),
+        readme_present=data["readme_present"],
+        readme_bytes=data["readme_bytes"],
+        violations=list(data["violations"]),
+        warnings=list(data["warnings"]),
+        pushed_at=data.get("pushed_at", ""),
+        updated_at=data.get("updated_at", ""),
+        org=data.get("org", ""),
+        skipped_fetches=list(data.get("skipped_fetches", [])),
+        policy_results=dict(data.get("policies", {})),
+    )
+
+
+def audit_repo(
+    client: GitHubClient,
+    org: str,
+    record: RepoRecord,
+    policy: CompiledPolicy | PolicyMatrix,
+    previous: PreviousReport | None = None,
+    recorder: CallRecorder | None = None,
+) -> RepoResult:
+    result = reuse_previous_result(record, previous, org) if previous is not None else None
+    if result is None:
+        result = fetch_and_evaluate(client, org, record, policy, recorder)
+    result.org = org
+    return result
+
+
+def fetch_and_evaluate(
+    client: GitHubClient,
+    org: str,
+    record: RepoRecord,
+    policy: CompiledPolicy | PolicyMatrix,
+    recorder: CallRecorder | None,
+) -> RepoResult:
+    plan = policy.plan if isinstance(policy, PolicyMatrix) else policy
+    # Only fetch what this repo's visibility rules can use; the rest is listed in skipped_fetches.
+    rules = plan.rules_for(record.is_private)
+    skipped: list[str] = []
+    try:
+        with timed_phase(recorder, "fetch"):
+            labels: list[str] = []
+            if record.labels is not None:
+                labels = record.labels
+            elif rules.needs_labels:
+                labels = fetch_labels(client, org, record.name)
+            else:
+                skipped.append("labels")
+            readme = None
+            if record.readme_absent:
+                readme = ReadmeFetch(False, 0, ReadmeFacts())
+            elif record.readme_text is None:
+                if rules.needs_readme:
+                    readme = fetch_readme(client, org, record.name, rules.readme_rules, rules.readme_byte_cap)
+                else:
+                    readme = ReadmeFetch(False, 0, ReadmeFacts())
+                    skipped.append("readme")
+    except (RuntimeError, ValueError) as error:
+        result = fetch_failed_result(record, str(error))
+        if isinstance(policy, PolicyMatrix):
+            result.policy_results = {name: verdict_of(result) for name in policy.names}
+        return result
+    with timed_phase(recorder, "evaluate"):
+        if isinstance(policy, PolicyMatrix):
+            result = evaluate_matrix(record, labels, readme, policy)
+        elif readme is None:
+            result = evaluate_repo(record, labels, True, record.readme_text or "", policy)
+        else:
+            result = evaluate_repo(record, labels, readme.present, "", policy, readme.facts, readme.size)
+    result.skipped_fetches = skipped
+    return result
+
+
+def evaluate_matrix(
+    record: RepoRecord, labels: list[str], readme: ReadmeFetch | None, matrix: PolicyMatrix
+) -> RepoResult:
+    if readme is None:
+        text = record.readme_text or ""
+        facts = scan_readme(text, matrix.plan.rules_for(record.is_private).readme_rules)
+        readme = ReadmeFetch(True, len(text.encode("utf-8")), facts)
+    results = [
+        evaluate_repo(record, labels, readme.present, "", policy, readme.facts, readme.size)
+        for policy in matrix.policies
+    ]
+    # The first policy fills the usual result fields; every policy's verdict goes in policy_results.
+    primary = results[0]
+    primary.policy_results = {
+        policy.name: verdict_of(result) for policy, result in zip(matrix.policies, results)
+    }
+    return primary
+
+
+def verdict_of(result: RepoResult) -> dict[str, list[str]]:
+    return {"violations": list(result.violations), "warnings": list(result.warnings)}
+
+
+def audit_repos(
+    client: GitHubClient,
+    org: str,
+    targets: Iterable[RepoRecord],
+    policy: CompiledPolicy | PolicyMatrix,
+    concurrency: int,
+    previous: PreviousReport | None = None,
+    recorder: CallRecorder | None = None,
+) -> Iterator[RepoResult]:
+    return ordered_map(
+        lambda record: audit_repo(client, record.org or org, record, policy, previous, recorder),
+        targets,
+        concurrency,
+    )
+
+
+def print_report_header(org: str, policy_name: str, visibility: str, matrix: list[str] | None = None) -> None:
     print(f"Org: {org}")
     print(f"Policy: {policy_name}")
     print(f"Visibility: {visibility}")
     print("")
-    print("repo\tvisibility\tcompliant\tviolations\twarnings")
-    for result in results:
-        status = "yes" if result.compliant else "no"
-        issues = ",".join(result.violations) if result.violations else "-"
-        warnings = ",".join(result.warnings) if result.warnings else "-"
-        print(f"{result.name}\t{result.visibility}\t{status}\t{issues}\t{warnings}")
+    if matrix:
+        print("\t".join(["repo", "visibility", *matrix]))
+    else:
+        print("repo\tvisibility\tcompliant\tviolations\twarnings")
+
+
+def print_result_row(result: RepoResult, show_org: bool = False) -> None:
+    status = "yes" if result.compliant else "no"
+    name = f"{result.org}/{result.name}" if show_org else result.name
+    issues = ",".join(result.violations) if result.violations else "-"
+    warnings = ",".join(result.warnings) if result.warnings else "-"
+    print(f"{name}\t{result.visibility}\t{status}\t{issues}\t{warnings}", flush=True)
+
+
+def print_matrix_row(result: RepoResult, show_org: bool = False) -> None:
+    name = f"{result.org}/{result.name}" if show_org else result.name
+    verdicts = ["no" if verdict["violations"] else "yes" for verdict in result.policy_results.values()]
+    print("\t".join([name, result.visibility, *verdicts]), flush=True)
+
+
+def print_policy_summaries(policy_summaries: dict[str, dict[str, int]]) -> None:
+    print("")
+    print("policy\tnon_compliant\twarnings")
+    for name, counts in policy_summaries.items():
+        print(f"{name}\t{counts['non_compliant_count']}\t{counts['warning_count']}", flush=True)
+
+
+def print_org_summaries(org_summaries: dict[str, dict[str, int]]) -> None:
+    print("")
+    print("org\tchecked\tnon_compliant\twarnings")
+    for org, counts in org_summaries.items():
+        checked, non_compliant = counts["checked_repositories"], counts["non_compliant_count"]
+        print(f"{org}\t{checked}\t{non_compliant}\t{counts['warning_count']}", flush=True)
 
 
 def main() -> int:
     args = parse_args()
-    policy = load_policy(args.policy)
+    policies = [load_policy(path) for path in args.policies]
+    # The first policy sets visibility, exclusions, fingerprints and the exit code.
+    policy = policies[0]
     visibility = args.visibility or policy.get("default_visibility", "public")
     excluded = set(policy.get("exclude_repositories", []))
 
-    records = fetch_repositories(args.org)
-    targets = [record for record in records if include_repo(record, visibility, excluded)]
-    results: list[RepoResult] = []
-
-    for record in targets:
-        labels = fetch_labels(args.org, record.name)
-        readme_present, readme_text = fetch_readme(args.org, record.name)
-        results.append(evaluate_repo(record, labels, readme_present, readme_text, policy))
+    compiled = [compile_policy(candidate, args.readme_max_kb * 1024) for candidate in policies]
+    compiled_policy = compiled[0]
+    try:
+        matrix = compile_matrix(compiled) if len(compiled) > 1 else None
+    except ValueError as error:
+        print(f"error: {error}", file=sys.stderr)
+        return 2
+    previous = load_previous_report(args.since_report, policy) if args.since_report else None
 
-    print_report(args.org, policy.get("policy_name", "unknown"), visibility, results)
+    snapshot = load_snapshot(args.snapshot) if args.snapshot else None
+    if snapshot is not None:
+        args.orgs = args.orgs or list(snapshot.orgs)
+        client = GitHubClient(OfflineTransport())
+        listings = [snapshot_pages(snapshot, org) for org in args.orgs]
+    else:
+        client = client_from_args(args)
+        bulk = args.fetch_mode == "graphql"
+        listings = [iter_repository_pages(client, org, bulk=bulk) for org in args.orgs]
+    recorder = client.recorder if args.profile else None
+    # Round-robin the org listings so every org's repos start flowing through the shared pool early.
+    pages = round_robin(listings)
+    if recorder is not None:
+        pages = recorder.timed_iter("list_repositories", pages)
+    targets = iter_targets(pages, visibility, excluded)
+    if args.shard is not None:
+        targets = (record for record in targets if in_shard(f"{record.org}/{record.name}", args.shard))
 
-    payload = {
-        "org": args.org,
-        "policy_name": policy.get("policy_name", "unknown"),
+    org_label = ", ".join(args.orgs)
+    header = {
+        "org": org_label,
+        "orgs": args.orgs,
+        "policy_name": compiled_policy.name,
         "visibility": visibility,
-        "checked_repositories": len(results),
-        "non_compliant_count": sum(1 for result in results if not result.compliant),
-        "warning_count": sum(len(result.warnings) for result in results),
-        "results": [
-            {
-                "name": result.name,
-                "visibility": result.visibility,
-                "url": result.url,
-                "description_present": result.description_present,
-                "topics": result.topics,
-                "labels": result.labels,
-                "readme_present": result.readme_present,
-                "readme_bytes": result.readme_bytes,
-                "violations": result.violations,
-                "warnings": result.warnings,
-            }
-            for result in results
-        ],
+        "policy_fingerprints": policy_fingerprints(policy),
+    }
+    if matrix is not None:
+        header["policy_names"] = matrix.names
+    if args.shard is not None:
+        header["shard"] = "/".join(map(str, args.shard))
+    if snapshot is not None:
+        header["snapshot_captured_at"] = snapshot.captured_at
+    ndjson = NdjsonReportWriter(args.output_ndjson, METADATA_AUDIT, header) if args.output_ndjson else None
+    history = AuditHistory(args.history_db) if args.history_db else None
+    run_id = history.start_run(header) if history is not None else 0
+
+    print_report_header(org_label, compiled_policy.name, visibility, matrix.names if matrix else None)
+    show_org = len(args.orgs) > 1
+    org_summaries = {
+        org: {"checked_repositories": 0, "non_compliant_count": 0, "warning_count": 0} for org in args.orgs
+    }
+    policy_summaries = {
+        name: {"non_compliant_count": 0, "warning_count": 0} for name in (matrix.names if matrix else [])
+    }
+    result_rows: list[dict[str, Any]] = []
+    skipped_fetches = 0
+    reused_results = 0
+    evaluated = matrix or compiled_policy
+    for result in audit_repos(client, "", targets, evaluated, args.concurrency, previous, recorder):
+        if matrix is not None:
+            print_matrix_row(result, show_org)
+        else:
+            print_result_row(result, show_org)
+        counts = org_summaries[result.org]
+        counts["checked_repositories"] += 1
+        counts["non_compliant_count"] += 0 if result.compliant else 1
+        counts["warning_count"] += len(result.warnings)
+        for name, verdict in result.policy_results.items():
+            policy_summaries[name]["non_compliant_count"] += 1 if verdict["violations"] else 0
+            policy_summaries[name]["warning_count"] += len(verdict["warnings"])
+        if result.reused:
+            reused_results += 1
+        else:
+            skipped_fetches += len(result.skipped_fetches)
+        row = result_to_dict(result)
+        if ndjson is not None:
+            ndjson.write_result(row)
+        if history is not None:
+            history.add_result(run_id, row)
+        if args.output_json:
+            result_rows.append(row)
+
+    if show_org:
+        print_org_summaries(org_summaries)
+    summary: dict[str, Any] = {
+        key: sum(counts[key] for counts in org_summaries.values())
+        for key in ("checked_repositories", "non_compliant_count", "warning_count")
     }
+    summary["org_summaries"] = org_summaries
+    if matrix is not None:
+        print_policy_summaries(policy_summaries)
+        summary["policy_summaries"] = policy_summaries
+    summary["skipped_fetches"] = skipped_fetches
+    summary["reused_results"] = reused_results
+    if skipped_fetches:
+        print(f"\nSkipped {skipped_fetches} label/README fetches the policy does not use.")
+    if reused_results:
+        print(f"\nReused {reused_results} unchanged results from --since-report.")
+    if recorder is not None:
+        summary["profile"] = recorder.summary()
+        print_profile(summary["profile"])
+    if ndjson is not None:
+        ndjson.close(summary)
+    if history is not None:
+        history.finish_run(run_id, summary)
+        history.close()
     if args.output_json:
-        Path(args.output_json).write_text(json.dumps(payload, indent=2), encoding="utf-8")
+        write_json_report(args.output_json, build_report(header, summary, result_rows))
 
-    return 1 if payload["non_compliant_count"] else 0
+    return 1 if summary["non_compliant_count"] else 0
 
 
 if __name__ == "__main__":
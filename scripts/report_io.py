@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""Streaming NDJSON report output and conversion back to the JSON report shape."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any, TextIO
+
+METADATA_AUDIT = "repo-metadata-audit"
+SECURITY_BASELINE = "security-baseline"
+
+
+class NdjsonReportWriter:
+    def __init__(self, path: str, report: str, header: dict[str, Any]) -> None:
+        self.handle: TextIO = Path(path).open("w", encoding="utf-8")
+        self.write_line({"type": "header", "report": report, **header})
+
+    def write_line(self, record: dict[str, Any]) -> None:
+        self.handle.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self.handle.flush()
+
+    def write_result(self, result: dict[str, Any]) -> None:
+        self.write_line({"type": "result", "result": result})
+
+    def close(self, summary: dict[str, Any]) -> None:
+        self.write_line({"type": "summary", **summary})
+        self.handle.close()
+
+
+# Every key summarize_results may return, whether or not a given shard's results produce it.
+SUMMARY_KEYS = {
+    METADATA_AUDIT: {
+        "checked_repositories",
+        "non_compliant_count",
+        "warning_count",
+        "org_summaries",
+        "policy_summaries",
+        "skipped_fetches",
+        "reused_results",
+    },
+    SECURITY_BASELINE: {"checked_repositories", "failed_repositories"},
+}
+
+
+def summarize_results(report: str, results: list[dict[str, Any]]) -> dict[str, Any]:
+    if report == METADATA_AUDIT:
+        org_summaries: dict[str, dict[str, int]] = {}
+        for result in results:
+            counts = org_summaries.setdefault(
+                result.get("org", ""),
+                {"checked_repositories": 0, "non_compliant_count": 0, "warning_count": 0},
+            )
+            counts["checked_repositories"] += 1
+            counts["non_compliant_count"] += 1 if result["violations"] else 0
+            counts["warning_count"] += len(result["warnings"])
+        summary: dict[str, Any] = {
+            "checked_repositories": len(results),
+            "non_compliant_count": sum(1 for result in results if result["violations"]),
+            "warning_count": sum(len(result["warnings"]) for result in results),
+            "org_summaries": org_summaries,
+        }
+        policy_summaries: dict[str, dict[str, int]] = {}
+        for result in results:
+            for name, verdict in result.get("policies", {}).items():
+                policy_counts = policy_summaries.setdefault(
+                    name, {"non_compliant_count": 0, "warning_count": 0}
+                )
+                policy_counts["non_compliant_count"] += 1 if verdict["violations"] else 0
+                policy_counts["warning_count"] += len(verdict["warnings"])
+        if policy_summaries:
+            summary["policy_summaries"] = policy_summaries
+        fresh = [result for result in results if not result.get("reused")]
+        summary["skipped_fetches"] = sum(len(result.get("skipped_fetches", [])) for result in fresh)
+        summary["reused_results"] = len(results) - len(fresh)
+        return summary
+    if report == SECURITY_BASELINE:
+        return {
+            "checked_repositories": len(results),
+            "failed_repositories": [result["name"] for result in results if not result["success"]],
+        }
+    raise ValueError(f"Unsupported report type: {report}")
+
+
+def build_report(
+    header: dict[str, Any], summary: dict[str, Any], results: list[dict[str, Any]]
+) -> dict[str, Any]:
+    return {**header, **summary, "results": results}
+
+
+def read_ndjson_report(path: str) -> tuple[str, dict[str, Any]]:
+    header: dict[str, Any] = {}
+    summary: dict[str, Any] | None = None
+    results: list[dict[str, Any]] = []
+    with Path(path).open(encoding="utf-8") as handle:
+        for line in handle:
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                break
+            kind = record.pop("type")
+            if kind == "header":
+                header = record
+            elif kind == "result":
+                results.append(record["result"])
+            elif kind == "summary":
+                summary = record
+    report = header.pop("report", METADATA_AUDIT)
+    if summary is None:
+        summary = {**summarize_results(report, results), "incomplete": True}
+    return report, build_report(header, summary, results)
+
+
+def read_report(path: str) -> tuple[str, dict[str, Any]]:
+    if path.endswith(".ndjson"):
+        return read_ndjson_report(path)
+    payload = json.loads(Path(path).read_text(encoding="utf-8"))
+    # JSON reports carry no type field; only the security baseline records a mode.
+    return (SECURITY_BASELINE if "mode" in payload else METADATA_AUDIT), payload
+
+
+def split_report(report: str, payload: dict[str, Any]) -> tuple[dict[str, Any], list[dict[str, Any]]]:
+    results = payload["results"]
+    per_run = SUMMARY_KEYS[report] | {"results", "shard", "profile", "shard_profiles", "incomplete"}
+    return {key: value for key, value in payload.items() if key not in per_run}, results
+
+
+def merge_reports(paths: list[str]) -> dict[str, Any]:
+    reports = [read_report(path) for path in paths]
+    kinds = sorted({kind for kind, _ in reports})
+    if len(kinds) > 1:
+        raise ValueError(f"cannot merge different report types: {', '.join(kinds)}")
+    report = kinds[0]
+    header: dict[str, Any] | None = None
+    merged: dict[tuple[str, str], dict[str, Any]] = {}
+    shards: dict[int, str] = {}
+    counts: set[int] = set()
+    profiles: list[dict[str, Any]] = []
+    incomplete = False
+    for path, (_, payload) in zip(paths, reports):
+        shard_header, results = split_report(report, payload)
+        if header is None:
+            header = shard_header
+        elif shard_header != header:
+            keys = header.keys() | shard_header.keys()
+            differing = sorted(key for key in keys if header.get(key) != shard_header.get(key))
+            raise ValueError(f"{path}: header differs from {paths[0]} in {', '.join(differing)}")
+        shard = payload.get("shard")
+        if shard is not None:
+            index, count = (int(part) for part in shard.split("/"))
+            if index in shards:
+                raise ValueError(f"{path}: shard {shard} already read from {shards[index]}")
+            shards[index] = path
+            counts.add(count)
+        incomplete = incomplete or bool(payload.get("incomplete"))
+        if "profile" in payload:
+            profiles.append({"shard": shard, "profile": payload["profile"]})
+        for result in results:
+            key = (result.get("org") or header.get("org", ""), result["name"])
+            if key in merged:
+                raise ValueError(f"{path}: {'/'.join(key)} appears in more than one report")
+            merged[key] = result
+    if shards and (len(shards) != len(paths) or len(counts) != 1):
+        raise ValueError("cannot merge sharded reports with unsharded ones or with a different shard count")
+    assert header is not None
+    results = [merged[key] for key in sorted(merged)]
+    summary = summarize_results(report, results)
+    if shards:
+        count = counts.pop()
+        header["shards"] = [f"{index}/{count}" for index in sorted(shards)]
+        incomplete = incomplete or len(shards) != count
+    if incomplete:
+        summary["incomplete"] = True
+    if profiles:
+        # Latency percentiles cannot be combined, so each shard's profile is kept as recorded.
+        summary["shard_profiles"] = sorted(profiles, key=lambda entry: shard_index(entry["shard"]))
+    return build_report(header, summary, results)
+
+
+def shard_index(shard: str | None) -> int:
+    return int(shard.split("/")[0]) if shard else 0
+
+
+def write_json_report(path: str, payload: dict[str, Any]) -> None:
+    Path(path).write_text(json.dumps(payload, indent=2), encoding="utf-8")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__)
+    commands = parser.add_subparsers(dest="command", required=True)
+    to_json = commands.add_parser("to-json", help="Convert an --output-ndjson file to the JSON report shape.")
+    to_json.add_argument("ndjson", help="Input NDJSON report")
+    to_json.add_argument("output", help="Output JSON report path")
+    merge = commands.add_parser(
+        "merge-reports", help="Combine --shard JSON or NDJSON reports into one JSON report with fresh totals."
+    )
+    merge.add_argument("reports", nargs="+", help="Shard reports (.json or .ndjson) from one script and run")
+    merge.add_argument("--output", required=True, help="Output JSON report path")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    if args.command == "to-json":
+        _, payload = read_ndjson_report(args.ndjson)
+        write_json_report(args.output, payload)
+        if payload.get("incomplete"):
+            print(f"{args.ndjson}: no summary record, counts recomputed from results", file=sys.stderr)
+    elif args.command == "merge-reports":
+        try:
+            payload = merge_reports(args.reports)
+        except ValueError as error:
+            print(f"error: {error}", file=sys.stderr)
+            return 2
+        write_json_report(args.output, payload)
+        if payload.get("incomplete"):
+            print(f"{args.output}: some shards are missing or incomplete", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
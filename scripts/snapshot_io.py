@@ -0,0 +1,60 @@
+"""Compressed offline org snapshots read by the audit and security baseline scripts."""
+
+from __future__ import annotations
+
+import gzip
+import json
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+SNAPSHOT_FORMAT = 1
+
+
+@dataclass
+class SnapshotRepo:
+    name: str
+    is_private: bool
+    description: str
+    url: str
+    topics: list[str]
+    labels: list[str]
+    # None when the repo has no README.
+    readme_text: str | None
+    pushed_at: str = ""
+    updated_at: str = ""
+    repo_id: int | None = None
+    security_and_analysis: dict[str, Any] = field(default_factory=dict)
+    vulnerability_alerts: bool = False
+    codeql_state: str = "unknown"
+
+
+@dataclass
+class Snapshot:
+    captured_at: str
+    orgs: dict[str, list[SnapshotRepo]]
+
+    def repos(self, org: str) -> list[SnapshotRepo]:
+        if org not in self.orgs:
+            raise ValueError(f"snapshot has no org {org!r} (captured: {', '.join(self.orgs) or 'none'})")
+        return self.orgs[org]
+
+
+def write_snapshot(path: str, snapshot: Snapshot) -> None:
+    payload = {
+        "format": SNAPSHOT_FORMAT,
+        "captured_at": snapshot.captured_at,
+        "orgs": {org: [asdict(repo) for repo in repos] for org, repos in snapshot.orgs.items()},
+    }
+    with gzip.open(path, "wt", encoding="utf-8", compresslevel=9) as handle:
+        json.dump(payload, handle, separators=(",", ":"))
+
+
+def load_snapshot(path: str) -> Snapshot:
+    with gzip.open(path, "rt", encoding="utf-8") as handle:
+        payload = json.load(handle)
+    if payload.get("format") != SNAPSHOT_FORMAT:
+        raise ValueError(f"{path}: unsupported snapshot format {payload.get('format')!r}")
+    return Snapshot(
+        captured_at=payload["captured_at"],
+        orgs={org: [SnapshotRepo(**repo) for repo in repos] for org, repos in payload["orgs"].items()},
+    )
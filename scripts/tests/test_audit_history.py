@@ -0,0 +1,102 @@
+from pathlib import Path
+import sys
+import tempfile
+import unittest
+
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from audit_history import AuditHistory, load_report  # noqa: E402
+from report_io import METADATA_AUDIT, NdjsonReportWriter  # noqa: E402
+
+
+def result(name: str, violations: list[str], warnings: list[str] | None = None) -> dict[str, object]:
+    return {
+        "name": name,
+        "org": "acme",
+        "visibility": "public",
+        "violations": violations,
+        "warnings": warnings or [],
+        "readme_bytes": 10,
+    }
+
+
+class AuditHistoryTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.history = AuditHistory(str(Path(self.tmp.name) / "history.sqlite"))
+        self.addCleanup(self.history.close)
+        self.header = {"org": "acme", "policy_name": "default", "visibility": "all"}
+
+    def record(self, results: list[dict[str, object]]) -> int:
+        run_id = self.history.start_run(self.header)
+        for row in results:
+            self.history.add_result(run_id, row)
+        self.history.finish_run(
+            run_id,
+            {
+                "checked_repositories": len(results),
+                "non_compliant_count": sum(1 for row in results if row["violations"]),
+                "warning_count": sum(len(row["warnings"]) for row in results),  # type: ignore[arg-type]
+            },
+        )
+        return run_id
+
+    def test_skipped_readme_sizes_are_stored_as_null(self) -> None:
+        skipped = dict(result("skipped", []), readme_bytes=0, skipped_fetches=["readme"])
+        self.record([result("fetched", []), skipped])
+        rows = self.history.connection.execute("SELECT readme_bytes FROM results ORDER BY repo_id").fetchall()
+        self.assertEqual([(10,), (None,)], rows)
+
+    def test_diff_lists_regressions_fixes_and_issue_changes(self) -> None:
+        old = self.record([result("one", []), result("two", ["missing_readme"]), result("gone", [])])
+        new = self.record([result("one", ["missing_readme"], ["w"]), result("two", []), result("fresh", [])])
+
+        diff = self.history.diff(old, new)
+
+        self.assertEqual(["acme/one"], diff["regressed"])
+        self.assertEqual(["acme/two"], diff["fixed"])
+        self.assertEqual(
+            [
+                {"repo": "acme/one", "kind": "violation", "code": "missing_readme"},
+                {"repo": "acme/one", "kind": "warning", "code": "w"},
+            ],
+            diff["added_issues"],
+        )
+        resolved = [{"repo": "acme/two", "kind": "violation", "code": "missing_readme"}]
+        self.assertEqual(resolved, diff["resolved_issues"])
+        self.assertEqual(["acme/fresh"], diff["added_repos"])
+        self.assertEqual(["acme/gone"], diff["removed_repos"])
+
+    def test_unfinished_run_is_rolled_back_and_trend_is_oldest_first(self) -> None:
+        first = self.record([result("one", [])])
+        second = self.record([result("one", ["missing_readme"])])
+        path = self.history.connection.execute("PRAGMA database_list").fetchone()[2]
+        self.history.start_run(self.header)
+        self.history.close()
+
+        reopened = AuditHistory(path)
+        self.addCleanup(reopened.close)
+
+        self.assertEqual([first, second], [run["id"] for run in reopened.runs()])
+        self.assertEqual([0, 1], [run["non_compliant"] for run in reopened.runs()])
+        self.assertEqual([second], reopened.latest_run_ids(1))
+        self.assertEqual([True, False], [row["compliant"] for row in reopened.repo_history("acme", "one")])
+
+    def test_import_reads_ndjson_reports(self) -> None:
+        path = str(Path(self.tmp.name) / "report.ndjson")
+        writer = NdjsonReportWriter(path, METADATA_AUDIT, self.header)
+        writer.write_result({**result("one", ["missing_readme"]), "org": ""})
+        writer.handle.close()
+
+        run_id = self.history.import_report(load_report(path))
+
+        self.assertEqual(1, self.history.runs()[0]["checked"])
+        self.assertFalse(self.history.repo_history("acme", "one")[0]["compliant"])
+        self.assertEqual(run_id, self.history.latest_run_ids(1)[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
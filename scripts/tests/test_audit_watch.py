@@ -0,0 +1,120 @@
+from pathlib import Path
+import json
+import sys
+import tempfile
+import threading
+import unittest
+from unittest import mock
+import urllib.error
+
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import audit_watch  # noqa: E402
+from audit_watch import (  # noqa: E402
+    AuditWatcher,
+    RepoCoalescer,
+    iter_replay_events,
+    make_server,
+    replay,
+    repos_from_event,
+)
+from fake_github import FakeGitHubServer, SyntheticOrg  # noqa: E402
+from github_client import GitHubClient, HttpTransport  # noqa: E402
+from repo_metadata_audit import compile_policy, load_policy  # noqa: E402
+
+POLICY_PATH = ROOT.parent / "config" / "repo-metadata-policy.json"
+
+
+def event(kind: str, org: str, repo: str, **extra: object) -> dict[str, object]:
+    return {"event": kind, "payload": {"repository": {"name": repo, "owner": {"login": org}}, **extra}}
+
+
+class EventParsingTests(unittest.TestCase):
+    def test_rename_touches_old_and_new_names_and_other_events_are_ignored(self) -> None:
+        renamed = event("repository", "acme", "new", action="renamed")["payload"]
+        renamed["changes"] = {"repository": {"name": {"from": "old"}}}  # type: ignore[index]
+
+        self.assertEqual([("acme", "new"), ("acme", "old")], repos_from_event("repository", renamed))
+        push = event("push", "acme", "demo")["payload"]
+        self.assertEqual([("acme", "demo")], repos_from_event("push", push))
+        self.assertEqual([], repos_from_event("issues", event("issues", "acme", "demo")["payload"]))
+
+    def test_coalescer_collapses_bursts_per_repo(self) -> None:
+        coalescer = RepoCoalescer(delay=0)
+        for key in [("acme", "one")] * 3 + [("acme", "two")]:
+            coalescer.add(key)
+
+        self.assertEqual([("acme", "one"), ("acme", "two")], coalescer.take_due())
+        self.assertEqual((4, 2), (coalescer.received, coalescer.coalesced))
+        self.assertFalse(coalescer.wait_idle(0))
+        coalescer.done(2)
+        self.assertTrue(coalescer.wait_idle(0))
+
+
+class WatchEndpointTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.org = SyntheticOrg("acme", 3)
+        self.github = FakeGitHubServer(self.org)
+        self.github.start()
+        self.addCleanup(self.github.stop)
+        transport = HttpTransport(self.github.url, "token")
+        self.addCleanup(transport.close)
+        header = {"org": "acme", "policy_name": "test", "visibility": "all"}
+        policy = compile_policy(load_policy(str(POLICY_PATH)))
+        self.watcher = AuditWatcher(GitHubClient(transport), ["acme"], policy, header, "all", set(), 2, 0.2)
+        self.watcher.start()
+        self.addCleanup(self.watcher.stop)
+        self.server = make_server(self.watcher, "127.0.0.1", 0, "s3cret")
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/"
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def replay_file(self, events: list[dict[str, object]]) -> int:
+        path = Path(self.tmp.name) / "events.ndjson"
+        path.write_text("".join(json.dumps(record) + "\n" for record in events), encoding="utf-8")
+        sent = replay(self.url, iter_replay_events([str(path)]), "s3cret", 0)
+        self.assertTrue(self.watcher.coalescer.wait_idle(5))
+        return sent
+
+    def test_replayed_bursts_reaudit_each_touched_repo_once(self) -> None:
+        burst = [event("push", "acme", "repo-00000") for _ in range(5)]
+        burst += [event("label", "ACME", "repo-00001"), event("push", "other-org", "repo-00002")]
+
+        self.assertEqual(7, self.replay_file(burst))
+
+        report = self.watcher.report()
+        self.assertEqual(["repo-00000", "repo-00001"], [row["name"] for row in report["results"]])
+        self.assertEqual(["acme", "acme"], [row["org"] for row in report["results"]])
+        self.assertEqual(2, report["checked_repositories"])
+        self.assertEqual(2, self.github.calls["GET repos/{owner}/{repo}"])
+        self.assertEqual(4, self.watcher.status()["coalesced"])
+
+        del self.org.by_name["repo-00001"]
+        self.replay_file([event("repository", "acme", "repo-00001", action="deleted")])
+
+        self.assertEqual(["repo-00000"], [row["name"] for row in self.watcher.report()["results"]])
+
+    def test_unexpected_audit_errors_keep_the_worker_running(self) -> None:
+        with mock.patch.object(audit_watch, "fetch_and_evaluate", side_effect=KeyError("nodes")):
+            self.replay_file([event("push", "acme", "repo-00000")])
+
+        status = self.watcher.status()
+        self.assertEqual((1, True, 0), (status["failures"], status["worker_alive"], status["indexed"]))
+        self.replay_file([event("push", "acme", "repo-00001")])
+        self.assertEqual(["repo-00001"], [row["name"] for row in self.watcher.report()["results"]])
+
+    def test_unsigned_payloads_are_rejected(self) -> None:
+        with self.assertRaises(urllib.error.HTTPError) as raised:
+            replay(self.url, [("push", event("push", "acme", "repo-00000")["payload"])], "wrong", 0)
+
+        self.assertEqual(401, raised.exception.code)
+        self.assertEqual(0, self.watcher.status()["received"])
+
+
+if __name__ == "__main__":
+    unittest.main()
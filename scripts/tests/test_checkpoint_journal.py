@@ -0,0 +1,62 @@
+from pathlib import Path
+import sys
+import tempfile
+import unittest
+
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from checkpoint_journal import CheckpointJournal  # noqa: E402
+
+
+class CheckpointJournalTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = str(Path(self.tmp.name) / "baseline.journal")
+
+    def test_resume_reloads_completed_steps_and_drops_torn_record(self) -> None:
+        journal = CheckpointJournal(self.path, "acme")
+        journal.record("one", "vulnerability_alerts")
+        journal.record("one", "codeql_default_setup")
+        journal.handle.write('{"repo":"two","st')
+        journal.close()
+
+        resumed = CheckpointJournal(self.path, "acme", resume=True)
+        resumed.record("two", "vulnerability_alerts")
+        resumed.close()
+
+        reloaded = CheckpointJournal(self.path, "acme", resume=True)
+        reloaded.close()
+        self.assertEqual({"vulnerability_alerts", "codeql_default_setup"}, reloaded.steps_done("one"))
+        self.assertEqual({"vulnerability_alerts"}, reloaded.steps_done("two"))
+        self.assertEqual(["baseline.journal"], sorted(path.name for path in Path(self.tmp.name).iterdir()))
+
+    def test_resume_rejects_journal_from_another_org(self) -> None:
+        CheckpointJournal(self.path, "acme").close()
+        with self.assertRaises(ValueError):
+            CheckpointJournal(self.path, "other", resume=True)
+
+    def test_without_resume_refuses_to_discard_records_unless_overwriting(self) -> None:
+        journal = CheckpointJournal(self.path, "acme")
+        journal.record("one", "vulnerability_alerts")
+        journal.close()
+
+        with self.assertRaisesRegex(ValueError, "already has records"):
+            CheckpointJournal(self.path, "acme")
+        self.assertIn('"repo":"one"', Path(self.path).read_text(encoding="utf-8"))
+
+        fresh = CheckpointJournal(self.path, "acme", overwrite=True)
+        fresh.close()
+        self.assertEqual(set(), fresh.steps_done("one"))
+
+    def test_resuming_an_empty_journal_writes_the_org_header(self) -> None:
+        Path(self.path).write_text("", encoding="utf-8")
+        CheckpointJournal(self.path, "acme", resume=True).close()
+        with self.assertRaises(ValueError):
+            CheckpointJournal(self.path, "other", resume=True)
+
+
+if __name__ == "__main__":
+    unittest.main()
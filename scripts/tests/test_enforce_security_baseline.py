@@ -1,12 +1,48 @@
+import argparse
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import sys
+import tempfile
+import threading
 import unittest
+from unittest import mock
 
 
 ROOT = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(ROOT))
 
-from enforce_security_baseline import RepoRecord, include_repo  # noqa: E402
+from checkpoint_journal import CheckpointJournal  # noqa: E402
+from enforce_security_baseline import (  # noqa: E402
+    RepoRecord,
+    RepoRun,
+    apply_configuration,
+    apply_repo,
+    include_repo,
+    plan_repo,
+    process_repo,
+    run_with_configuration,
+)
+from github_client import ApiResponse  # noqa: E402
+
+
+class FakeClient:
+    def __init__(self, failures: dict[tuple[str, str], list[ApiResponse]] | None = None) -> None:
+        self.failures = failures or {}
+        self.calls: list[tuple[str, str]] = []
+        self.payloads: list[object] = []
+        self.lock = threading.Lock()
+
+    def request(self, method: str, path: str, payload: object = None) -> ApiResponse:
+        with self.lock:
+            self.calls.append((method, path))
+            self.payloads.append(payload)
+            queued = self.failures.get((method, path))
+            if queued:
+                return queued.pop(0)
+        return ApiResponse(200, {}, b"{}")
+
+    def rest(self, method: str, path: str, payload: object = None) -> object:
+        return self.request(method, path, payload).json()
 
 
 class EnforceSecurityBaselineTests(unittest.TestCase):
@@ -26,5 +62,192 @@ class EnforceSecurityBaselineTests(unittest.TestCase):
         self.assertFalse(include_repo(public, "all", {"public-repo"}))
 
 
+class ApplyRepoTests(unittest.TestCase):
+    def test_steps_run_in_dependency_order_with_deterministic_details(self) -> None:
+        client = FakeClient()
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            run = apply_repo(client, "org", RepoRecord("demo", True), executor)
+
+        self.assertTrue(run.success)
+        self.assertEqual(
+            [
+                "vulnerability_alerts=enabled",
+                "dependabot_security_updates=enabled",
+                "security_and_analysis_baseline=applied",
+                "codeql_default_setup=configured",
+            ],
+            run.details,
+        )
+        paths = [path for _, path in client.calls]
+        alerts_index = paths.index("repos/org/demo/vulnerability-alerts")
+        self.assertLess(alerts_index, paths.index("repos/org/demo/automated-security-fixes"))
+        self.assertLess(alerts_index, paths.index("repos/org/demo"))
+
+    def test_failed_alerts_skip_security_fixes_but_not_other_controls(self) -> None:
+        denied = ApiResponse(403, {}, b'{"message": "Must have admin rights"}')
+        client = FakeClient({("PUT", "repos/org/demo/vulnerability-alerts"): [denied]})
+        run = apply_repo(client, "org", RepoRecord("demo", False))
+
+        self.assertFalse(run.success)
+        self.assertEqual(["vulnerability_alerts_failed:Must have admin rights (HTTP 403)"], run.errors)
+        self.assertNotIn(("PUT", "repos/org/demo/automated-security-fixes"), client.calls)
+        self.assertIn("codeql_default_setup=configured", run.details)
+
+    def test_security_fixes_poll_until_alerts_propagate(self) -> None:
+        pending = ApiResponse(422, {}, b'{"message": "Vulnerability alerts must be enabled"}')
+        client = FakeClient({("PUT", "repos/org/demo/automated-security-fixes"): [pending, pending]})
+        with mock.patch("enforce_security_baseline.time.sleep") as sleep:
+            run = apply_repo(client, "org", RepoRecord("demo", False))
+
+        self.assertTrue(run.success)
+        self.assertEqual([mock.call(0.5), mock.call(1.0)], sleep.call_args_list)
+
+
+class ResumeTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = str(Path(self.tmp.name) / "baseline.journal")
+
+    def test_resume_reruns_only_failed_steps(self) -> None:
+        denied = ApiResponse(403, {}, b'{"message": "Resource not accessible"}')
+        journal = CheckpointJournal(self.path, "org")
+        first = FakeClient({("PATCH", "repos/org/demo/code-scanning/default-setup"): [denied]})
+        self.assertFalse(apply_repo(first, "org", RepoRecord("demo", False), journal=journal).success)
+        journal.close()
+
+        resumed = CheckpointJournal(self.path, "org", resume=True)
+        second = FakeClient()
+        run = apply_repo(second, "org", RepoRecord("demo", False), journal=resumed)
+        resumed.close()
+
+        self.assertTrue(run.success)
+        self.assertEqual([("PATCH", "repos/org/demo/code-scanning/default-setup")], second.calls)
+        self.assertIn("vulnerability_alerts=journaled", run.details)
+
+    def test_fully_journaled_repo_skips_state_reads(self) -> None:
+        journal = CheckpointJournal(self.path, "org")
+        apply_repo(FakeClient(), "org", RepoRecord("demo", False), journal=journal)
+
+        client = FakeClient()
+        run = process_repo(client, "org", RepoRecord("demo", False), None, "diff", journal)
+        journal.close()
+
+        self.assertTrue(run.success)
+        self.assertEqual([], client.calls)
+
+
+class PlanTests(unittest.TestCase):
+    def compliant_security(self) -> dict[str, dict[str, str]]:
+        return {
+            name: {"status": "enabled"}
+            for name in (
+                "dependabot_security_updates",
+                "secret_scanning",
+                "secret_scanning_push_protection",
+                "secret_scanning_non_provider_patterns",
+            )
+        }
+
+    def test_compliant_repo_plans_no_changes(self) -> None:
+        client = FakeClient(
+            {
+                ("GET", "repos/org/demo/vulnerability-alerts"): [ApiResponse(204, {}, b"")],
+                ("GET", "repos/org/demo/code-scanning/default-setup"): [
+                    ApiResponse(200, {}, b'{"state": "configured"}')
+                ],
+            }
+        )
+        repo = RepoRecord("demo", False, security_and_analysis=self.compliant_security())
+        self.assertEqual({}, plan_repo(client, "org/demo", repo))
+
+    def test_plan_lists_only_differing_controls_and_apply_writes_only_those(self) -> None:
+        security = self.compliant_security()
+        security["secret_scanning_push_protection"] = {"status": "disabled"}
+        repo = RepoRecord("demo", False, security_and_analysis=security)
+        client = FakeClient(
+            {
+                ("GET", "repos/org/demo/vulnerability-alerts"): [ApiResponse(204, {}, b"")],
+                ("GET", "repos/org/demo/code-scanning/default-setup"): [
+                    ApiResponse(200, {}, b'{"state": "not-configured"}')
+                ],
+            }
+        )
+        changes = plan_repo(client, "org/demo", repo)
+        self.assertEqual(
+            {
+                "security_and_analysis": "security_and_analysis:secret_scanning_push_protection->enabled",
+                "codeql_default_setup": "codeql_default_setup:not-configured->configured",
+            },
+            changes,
+        )
+
+        writer = FakeClient()
+        run = apply_repo(writer, "org", repo, only_steps=set(changes))
+        self.assertTrue(run.success)
+        self.assertEqual(
+            [("PATCH", "repos/org/demo"), ("PATCH", "repos/org/demo/code-scanning/default-setup")],
+            writer.calls,
+        )
+        self.assertIn("vulnerability_alerts=unchanged", run.details)
+
+
+class ConfigurationTests(unittest.TestCase):
+    def test_attaches_in_batches_and_reports_uncovered_repos(self) -> None:
+        statuses_path = "orgs/org/code-security/configurations/7/repositories"
+        pending = f"{statuses_path}?per_page=100&status=attaching,updating"
+        applied = f"{statuses_path}?per_page=100&status=attached,enforced"
+        applied_page = (
+            b'[{"status": "attached", "repository": {"id": 1}},'
+            b' {"status": "enforced", "repository": {"id": 2}}]'
+        )
+        client = FakeClient(
+            {
+                ("GET", pending): [ApiResponse(200, {}, b"[]")],
+                ("GET", applied): [ApiResponse(200, {}, applied_page)],
+            }
+        )
+        targets = [
+            RepoRecord("one", False, repo_id=1),
+            RepoRecord("two", True, repo_id=2),
+            RepoRecord("three", True, repo_id=3),
+        ]
+
+        result = apply_configuration(client, "org", 7, targets, batch_size=2, timeout=0)
+
+        self.assertEqual({"one": "attached", "two": "enforced"}, result)
+        attach_payloads = [
+            payload
+            for (_, path), payload in zip(client.calls, client.payloads)
+            if path.endswith("/attach")
+        ]
+        self.assertEqual(
+            [
+                {"scope": "selected", "selected_repository_ids": [1, 2]},
+                {"scope": "selected", "selected_repository_ids": [3]},
+            ],
+            attach_payloads,
+        )
+
+    def test_fallback_rows_are_printed_as_each_repo_finishes(self) -> None:
+        events: list[str] = []
+        targets = [RepoRecord(name, False, repo_id=index) for index, name in enumerate(["a", "b", "c"])]
+
+        def process(repo: RepoRecord) -> RepoRun:
+            events.append(f"process {repo.name}")
+            return RepoRun(repo.name, "public", success=True, details=[], warnings=[], errors=[])
+
+        args = argparse.Namespace(
+            org="org", configuration_id=7, attach_batch_size=100, attach_timeout=0, concurrency=1
+        )
+        with mock.patch("enforce_security_baseline.apply_configuration", return_value={"b": "attached"}):
+            results = run_with_configuration(
+                FakeClient(), args, targets, process, lambda run: events.append(f"print {run.name}")
+            )
+
+        self.assertEqual(["print b", "process a", "print a", "process c", "print c"], events)
+        self.assertEqual(["b", "a", "c"], [run.name for run in results])
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,115 @@
+from pathlib import Path
+import sys
+import unittest
+
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from benchmark import benchmark_script  # noqa: E402
+from fake_github import FakeGitHubServer, SyntheticOrg  # noqa: E402
+from github_client import GitHubClient, HttpTransport, next_page_query  # noqa: E402
+from readme_scanner import ReadmeRules  # noqa: E402
+from repo_metadata_audit import fetch_readme, iter_repository_pages  # noqa: E402
+
+
+class SyntheticOrgTests(unittest.TestCase):
+    def test_generation_is_deterministic_per_seed(self) -> None:
+        first = SyntheticOrg("acme", 50, seed=3)
+        second = SyntheticOrg("acme", 50, seed=3)
+        other = SyntheticOrg("acme", 50, seed=4)
+
+        self.assertEqual(first.repos, second.repos)
+        self.assertEqual(
+            [first.readme_text(repo) for repo in first.repos],
+            [second.readme_text(repo) for repo in second.repos],
+        )
+        self.assertNotEqual(first.repos, other.repos)
+
+
+class FakeGitHubServerTests(unittest.TestCase):
+    def serve(self, org: SyntheticOrg, **options: object) -> tuple[FakeGitHubServer, GitHubClient]:
+        server = FakeGitHubServer(org, **options)  # type: ignore[arg-type]
+        server.start()
+        self.addCleanup(server.stop)
+        transport = HttpTransport(server.url, "token")
+        self.addCleanup(transport.close)
+        return server, GitHubClient(transport)
+
+    def test_labels_paginate_with_link_header(self) -> None:
+        org = SyntheticOrg("acme", 1)
+        org.repos[0].labels = tuple(f"label-{n}" for n in range(130))
+        server, client = self.serve(org)
+
+        first = client.request("GET", "repos/acme/repo-00000/labels?per_page=100")
+        second = client.request("GET", f"repos/acme/repo-00000/labels?{next_page_query(first)}")
+
+        self.assertEqual(100, len(first.json()))
+        self.assertEqual(30, len(second.json()))
+        self.assertEqual(2, server.calls["GET repos/{owner}/{repo}/labels"])
+
+    def test_primary_rate_limit_is_enforced_with_headers(self) -> None:
+        _, client = self.serve(SyntheticOrg("acme", 1), rate_limit=2)
+
+        first = client.request("GET", "repos/acme/repo-00000/readme")
+        client.request("GET", "repos/acme/repo-00000/readme")
+        limited = client.request("GET", "repos/acme/repo-00000/readme")
+
+        self.assertEqual("1", first.headers["x-ratelimit-remaining"])
+        self.assertEqual(403, limited.status)
+        self.assertEqual("0", limited.headers["x-ratelimit-remaining"])
+
+    def test_raw_readme_fetch_stops_once_decided_and_reports_true_size(self) -> None:
+        org = SyntheticOrg("acme", 1)
+        text = "# Demo\n" + "filler line\n" * 20000
+        org.readme_text = lambda repo: text  # type: ignore[method-assign]
+        _, client = self.serve(org)
+
+        decided = fetch_readme(client, "acme", "repo-00000", ReadmeRules(need_title=True), 512 * 1024)
+        capped = fetch_readme(client, "acme", "repo-00000", ReadmeRules(needles=("License",)), 32 * 1024)
+        missing = fetch_readme(client, "acme", "repo-99999", ReadmeRules(), 0)
+
+        self.assertEqual(("# Demo", len(text)), (decided.facts.title_line, decided.size))
+        self.assertEqual((set(), len(text)), (capped.facts.found_needles, capped.size))
+        self.assertFalse(missing.present)
+
+    def test_listing_shrinks_timed_out_pages_and_paginates_long_connections(self) -> None:
+        org = SyntheticOrg("acme", 30)
+        org.repos[3].topics = tuple(f"topic-{n}" for n in range(130))
+        org.repos[5].labels = tuple(f"label-{n}" for n in range(130))
+        server, client = self.serve(org, graphql_node_limit=3000)
+
+        pages = list(iter_repository_pages(client, "acme", bulk=True))
+        records = [record for page in pages for record in page]
+
+        self.assertEqual([repo.name for repo in org.repos], [record.name for record in records])
+        self.assertEqual(list(org.repos[3].topics), records[3].topics)
+        self.assertIsNone(records[5].labels)
+        self.assertEqual(list(org.repos[6].labels), records[6].labels)
+        self.assertGreater(server.statuses[502], 0)
+        # One follow-up query fetches the 30 topics past the listing's first 100.
+        self.assertEqual(len(pages) + server.statuses[502] + 1, server.calls["POST graphql"])
+
+
+class BenchmarkTests(unittest.TestCase):
+    def test_audit_benchmark_counts_calls_for_every_repo(self) -> None:
+        org = SyntheticOrg("bench-org", 20)
+        server = FakeGitHubServer(org)
+        server.start()
+        self.addCleanup(server.stop)
+
+        result = benchmark_script(server, "audit", "bench-org", 4, [])
+
+        # The shipped policy has no label or README rules for private repos, so only public ones are fetched.
+        public = sum(1 for repo in org.repos if not repo.is_private)
+        # Label lists over 100 are paginated rather than truncated.
+        label_pages = sum(-(-len(repo.labels) // 100) for repo in org.repos if not repo.is_private)
+        self.assertIn(result.exit_code, (0, 1))
+        self.assertEqual(1, result.calls_by_endpoint["POST graphql"])
+        self.assertEqual(label_pages, result.calls_by_endpoint["GET repos/{owner}/{repo}/labels"])
+        self.assertEqual(public, result.calls_by_endpoint["GET repos/{owner}/{repo}/readme"])
+        self.assertGreater(result.peak_rss_mb, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
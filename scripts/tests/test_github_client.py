@@ -0,0 +1,290 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+import json
+import sys
+import tempfile
+import threading
+import unittest
+
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from github_client import (  # noqa: E402
+    ApiError,
+    ApiResponse,
+    CachingTransport,
+    GitHubClient,
+    NO_TIMEOUT_RETRY_HEADER,
+    HttpTransport,
+    RequestScheduler,
+    ResponseCache,
+    ScheduledTransport,
+    parse_included_response,
+)
+
+
+BIG_README = b"# Big\n" + b"x" * 40000
+
+
+class FakeApiHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    seen: list[tuple[str, str, str, int]] = []
+
+    def log_message(self, format: str, *args: object) -> None:
+        return
+
+    def reply(self, status: int, payload: object) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        self.seen.append(("GET", self.path, self.headers.get("Authorization", ""), self.client_address[1]))
+        if self.path == "/repos/org/demo/labels?per_page=100":
+            self.reply(200, [{"name": "bug"}])
+        elif self.path == "/repos/org/cached/labels":
+            if self.headers.get("If-None-Match") == '"v1"':
+                self.send_response(304)
+                self.send_header("ETag", '"v1"')
+                self.send_header("X-RateLimit-Remaining", "4999")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+            else:
+                body = json.dumps([{"name": "bug"}]).encode("utf-8")
+                self.send_response(200)
+                self.send_header("ETag", '"v1"')
+                self.send_header("X-RateLimit-Remaining", "5000")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+        elif self.path == "/repos/org/big/readme":
+            if self.headers.get("If-None-Match") == '"r1"':
+                self.send_response(304)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("ETag", '"r1"')
+            self.send_header("Content-Length", str(len(BIG_README)))
+            self.end_headers()
+            self.wfile.write(BIG_README)
+        else:
+            self.reply(404, {"message": "Not Found"})
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length", "0"))
+        request = json.loads(self.rfile.read(length))
+        self.seen.append(("POST", self.path, self.headers.get("Authorization", ""), self.client_address[1]))
+        if request["variables"].get("org") == "missing":
+            self.reply(200, {"data": None, "errors": [{"message": "Could not resolve organization"}]})
+        else:
+            self.reply(200, {"data": {"echo": request["variables"]}})
+
+
+class GitHubClientTests(unittest.TestCase):
+    def setUp(self) -> None:
+        FakeApiHandler.seen = []
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), FakeApiHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.transport = HttpTransport(base_url, token="test-token")
+        self.client = GitHubClient(self.transport)
+
+    def tearDown(self) -> None:
+        self.transport.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_http_transport_reuses_one_authenticated_connection(self) -> None:
+        self.assertEqual([{"name": "bug"}], self.client.rest("GET", "repos/org/demo/labels?per_page=100"))
+        self.assertEqual(404, self.client.request("GET", "repos/org/demo/readme").status)
+        self.assertEqual({"org": "org"}, self.client.graphql("query", {"org": "org"})["data"]["echo"])
+
+        self.assertEqual(3, len(FakeApiHandler.seen))
+        self.assertEqual({"Bearer test-token"}, {entry[2] for entry in FakeApiHandler.seen})
+        self.assertEqual(1, len({entry[3] for entry in FakeApiHandler.seen}))
+
+    def test_errors_raise_api_error_with_status(self) -> None:
+        with self.assertRaises(ApiError) as raised:
+            self.client.rest("GET", "repos/org/missing")
+        self.assertEqual(404, raised.exception.status)
+        self.assertIn("Not Found (HTTP 404)", str(raised.exception))
+
+        with self.assertRaisesRegex(ApiError, "Could not resolve organization"):
+            self.client.graphql("query", {"org": "missing"})
+
+    def test_caching_transport_revalidates_with_etag(self) -> None:
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache = ResponseCache(cache_dir, max_bytes=1024 * 1024)
+            client = GitHubClient(CachingTransport(self.transport, cache))
+            first = client.request("GET", "repos/org/cached/labels")
+            second = client.request("GET", "repos/org/cached/labels")
+
+            reopened = ResponseCache(cache_dir, max_bytes=1024 * 1024)
+            reopened_client = GitHubClient(CachingTransport(self.transport, reopened))
+            third = reopened_client.request("GET", "repos/org/cached/labels")
+
+        self.assertEqual((1, 1), (cache.misses, cache.hits))
+        self.assertEqual(first.json(), second.json())
+        self.assertEqual(200, second.status)
+        self.assertEqual("4999", second.headers["x-ratelimit-remaining"])
+        self.assertEqual([{"name": "bug"}], third.json())
+        self.assertEqual(1, reopened.hits)
+
+    def test_stream_stops_early_but_reports_full_size(self) -> None:
+        chunks: list[tuple[int, int]] = []
+
+        def first_chunk_only(chunk: bytes, offset: int) -> bool:
+            chunks.append((offset, len(chunk)))
+            return False
+
+        response = self.client.stream("repos/org/big/readme", first_chunk_only)
+        missing = self.client.stream("repos/org/demo/readme", first_chunk_only)
+
+        self.assertEqual((200, len(BIG_README)), (response.status, response.size))
+        self.assertEqual([(0, 16 * 1024)], chunks)
+        self.assertEqual(404, missing.status)
+        self.assertIn("Not Found", missing.error_message())
+        self.assertEqual(1, len({entry[3] for entry in FakeApiHandler.seen}))
+
+    def test_caching_transport_revalidates_partially_read_streams(self) -> None:
+        def collect(into: bytearray, limit: int):
+            def consume(chunk: bytes, offset: int) -> bool:
+                del into[offset:]
+                into.extend(chunk)
+                return len(into) < limit
+
+            return consume
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache = ResponseCache(cache_dir, max_bytes=1024 * 1024)
+            client = GitHubClient(CachingTransport(self.transport, cache))
+            partial, replayed, full, cached = bytearray(), bytearray(), bytearray(), bytearray()
+            client.stream("repos/org/big/readme", collect(partial, 1))
+            prefix = client.stream("repos/org/big/readme", collect(replayed, 1))
+            client.stream("repos/org/big/readme", collect(full, len(BIG_README)))
+            response = client.stream("repos/org/big/readme", collect(cached, len(BIG_README)))
+
+        # The prefix answers a 304 while it suffices; a consumer that needs more reads the body again.
+        self.assertEqual((2, 2), (cache.misses, cache.hits))
+        self.assertEqual((200, len(BIG_README)), (prefix.status, prefix.size))
+        self.assertNotIn("x-cached-partial-size", prefix.headers)
+        self.assertEqual(BIG_README[: 16 * 1024], bytes(replayed))
+        self.assertEqual(BIG_README, bytes(full))
+        self.assertEqual(BIG_README, bytes(cached))
+        self.assertEqual(len(BIG_README), response.size)
+        statuses = [entry for entry in FakeApiHandler.seen if entry[1] == "/repos/org/big/readme"]
+        self.assertEqual(5, len(statuses))
+
+    def test_buffered_requests_ignore_a_stored_stream_prefix(self) -> None:
+        with tempfile.TemporaryDirectory() as cache_dir:
+            client = GitHubClient(CachingTransport(self.transport, ResponseCache(cache_dir, 1024 * 1024)))
+            client.stream("repos/org/big/readme", lambda chunk, offset: False)
+            response = client.request("GET", "repos/org/big/readme")
+
+        self.assertEqual((200, BIG_README), (response.status, response.body))
+
+    def test_response_cache_evicts_least_recently_used(self) -> None:
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache = ResponseCache(cache_dir, max_bytes=300)
+            entry = ApiResponse(200, {"etag": '"x"'}, b"x" * 60)
+            cache.store("a", entry)
+            cache.store("b", entry)
+            cache.touch("a")
+            cache.store("c", entry)
+
+            self.assertIsNotNone(cache.load("a"))
+            self.assertIsNone(cache.load("b"))
+            self.assertIsNotNone(cache.load("c"))
+            self.assertLessEqual(cache.total_bytes, 300)
+
+    def test_parse_included_response_from_gh_cli_output(self) -> None:
+        output = b'HTTP/2.0 404 Not Found\r\nEtag: "abc"\r\n\r\n{"message": "Not Found"}'
+        response = parse_included_response(output)
+        assert response is not None
+        self.assertEqual(404, response.status)
+        self.assertEqual('"abc"', response.headers["etag"])
+        self.assertEqual("Not Found (HTTP 404)", response.error_message())
+        self.assertIsNone(parse_included_response(b""))
+
+
+class ScriptedTransport:
+    def __init__(self, responses: list[ApiResponse]) -> None:
+        self.responses = responses
+        self.calls = 0
+
+    def request(self, method: str, path: str, body: bytes | None, headers: dict[str, str]) -> ApiResponse:
+        self.calls += 1
+        self.headers = headers
+        return self.responses.pop(0)
+
+
+class RequestSchedulerTests(unittest.TestCase):
+    def test_retries_secondary_rate_limit_and_halves_concurrency(self) -> None:
+        message = b'{"message": "You have exceeded a secondary rate limit"}'
+        throttled = ApiResponse(403, {"retry-after": "0"}, message)
+        inner = ScriptedTransport([throttled, ApiResponse(200, {}, b"[]")])
+        scheduler = RequestScheduler(max_concurrency=8, base_delay=0)
+        response = ScheduledTransport(inner, scheduler).request("GET", "repos/o/r/labels", None, {})
+
+        self.assertEqual(200, response.status)
+        self.assertEqual(2, inner.calls)
+        self.assertEqual(1, scheduler.retries)
+        self.assertEqual(5, scheduler.concurrency_limit)
+
+    def test_secondary_rate_limit_without_retry_after_waits_a_minute(self) -> None:
+        scheduler = RequestScheduler(base_delay=0)
+        secondary = ApiResponse(403, {}, b'{"message": "You have exceeded a secondary rate limit"}')
+        exhausted = ApiResponse(403, {"x-ratelimit-remaining": "0", "x-ratelimit-reset": "1060"}, b"")
+        self.assertEqual(60.0, scheduler.retry_delay(0, secondary))
+        self.assertEqual(60.0, scheduler.retry_delay(0, ApiResponse(429, {}, b"")))
+        self.assertEqual(5.0, scheduler.retry_delay(0, ApiResponse(429, {"retry-after": "5"}, b"")))
+        self.assertEqual(0.0, scheduler.retry_delay(0, exhausted))
+        self.assertEqual(0.0, scheduler.retry_delay(0, ApiResponse(502, {}, b"")))
+
+    def test_gives_up_after_max_retries_on_server_errors(self) -> None:
+        inner = ScriptedTransport([ApiResponse(502, {}, b"") for _ in range(3)])
+        scheduler = RequestScheduler(max_retries=2, base_delay=0)
+        response = ScheduledTransport(inner, scheduler).request("GET", "graphql", None, {})
+        self.assertEqual(502, response.status)
+        self.assertEqual(3, inner.calls)
+
+    def test_callers_can_take_gateway_timeouts_without_retries(self) -> None:
+        statuses = (502, 503, 200)
+        inner = ScriptedTransport([ApiResponse(status, {}, b"") for status in statuses])
+        transport = ScheduledTransport(inner, RequestScheduler(base_delay=0))
+        headers = {NO_TIMEOUT_RETRY_HEADER: "1", "Accept": "application/json"}
+
+        self.assertEqual(502, transport.request("POST", "graphql", b"{}", headers).status)
+        self.assertEqual({"Accept": "application/json"}, inner.headers)
+        self.assertEqual(200, transport.request("POST", "graphql", b"{}", headers).status)
+        self.assertEqual(3, inner.calls)
+
+    def test_not_found_is_not_retried(self) -> None:
+        inner = ScriptedTransport([ApiResponse(404, {}, b"")])
+        response = ScheduledTransport(inner, RequestScheduler(base_delay=0)).request("GET", "x", None, {})
+        self.assertEqual(404, response.status)
+        self.assertEqual(1, inner.calls)
+
+    def test_low_remaining_serializes_and_exhausted_limit_pauses_until_reset(self) -> None:
+        scheduler = RequestScheduler(max_concurrency=8, clock=lambda: 1000.0)
+        scheduler.observe(ApiResponse(200, {"x-ratelimit-remaining": "50", "x-ratelimit-reset": "1060"}, b""))
+        self.assertEqual(1, scheduler.concurrency_limit)
+        scheduler.observe(ApiResponse(200, {"x-ratelimit-remaining": "0", "x-ratelimit-reset": "1060"}, b""))
+        self.assertEqual(1061.0, scheduler.paused_until)
+
+    def test_request_budget_stops_further_requests(self) -> None:
+        inner = ScriptedTransport([ApiResponse(200, {}, b"") for _ in range(3)])
+        transport = ScheduledTransport(inner, RequestScheduler(budget=2))
+        transport.request("GET", "a", None, {})
+        transport.request("GET", "b", None, {})
+        with self.assertRaisesRegex(ApiError, "budget of 2 exhausted"):
+            transport.request("GET", "c", None, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+from pathlib import Path
+import sys
+import unittest
+
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from github_client import ApiResponse, RequestScheduler, ScheduledTransport  # noqa: E402
+from instrumentation import CallRecord, CallRecorder, endpoint_template, response_cost  # noqa: E402
+
+
+class ScriptedTransport:
+    def __init__(self, responses: list[ApiResponse]) -> None:
+        self.responses = responses
+
+    def request(self, method: str, path: str, body: bytes | None, headers: dict[str, str]) -> ApiResponse:
+        return self.responses.pop(0)
+
+
+class InstrumentationTests(unittest.TestCase):
+    def test_endpoint_template_hides_names_ids_and_query(self) -> None:
+        self.assertEqual(
+            "GET repos/{owner}/{repo}/labels",
+            endpoint_template("GET", "repos/acme/widget/labels?per_page=100&page=2"),
+        )
+        self.assertEqual(
+            "POST orgs/{org}/code-security/configurations/{id}/attach",
+            endpoint_template("POST", "orgs/acme/code-security/configurations/17/attach"),
+        )
+        self.assertEqual("POST graphql", endpoint_template("POST", "graphql"))
+
+    def test_response_cost_uses_graphql_rate_limit_and_skips_not_modified(self) -> None:
+        self.assertEqual(0, response_cost("repos/o/r/labels", 304, b""))
+        self.assertEqual(1, response_cost("repos/o/r/labels", 200, b"[]"))
+        body = b'{"data": {"rateLimit": {"cost": 3, "remaining": 4990}}}'
+        self.assertEqual(3, response_cost("graphql", 200, body))
+
+    def test_scheduled_transport_records_one_call_with_retries(self) -> None:
+        throttled = ApiResponse(429, {"retry-after": "0"}, b"{}")
+        inner = ScriptedTransport([throttled, ApiResponse(200, {}, b"[1, 2]")])
+        recorder = CallRecorder()
+        transport = ScheduledTransport(inner, RequestScheduler(base_delay=0), recorder)
+
+        transport.request("GET", "repos/o/r/labels?per_page=100", None, {})
+
+        self.assertEqual(1, len(recorder.calls))
+        call = recorder.calls[0]
+        self.assertEqual("GET repos/{owner}/{repo}/labels", call.endpoint)
+        self.assertEqual(200, call.status)
+        self.assertEqual(6, call.response_bytes)
+        self.assertEqual(1, call.retries)
+        self.assertEqual(2, call.cost)
+
+    def test_summary_reports_percentiles_and_phases(self) -> None:
+        recorder = CallRecorder()
+        for milliseconds in range(1, 101):
+            status = 404 if milliseconds == 100 else 200
+            seconds = milliseconds / 1000
+            recorder.record(CallRecord("GET repos/{owner}/{repo}/readme", status, seconds, 10, 0, 1))
+        with recorder.phase("evaluate"):
+            pass
+        list(recorder.timed_iter("list_repositories", [1, 2]))
+
+        summary = recorder.summary()
+
+        endpoint = summary["endpoints"][0]
+        self.assertEqual(100, endpoint["calls"])
+        self.assertEqual(1, endpoint["errors"])
+        self.assertEqual(51.0, endpoint["p50_ms"])
+        self.assertEqual(100.0, endpoint["max_ms"])
+        self.assertEqual(1000, summary["bytes"])
+        self.assertEqual(1, summary["phases"]["evaluate"]["count"])
+        self.assertEqual(3, summary["phases"]["list_repositories"]["count"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+from collections.abc import Iterable
+from pathlib import Path
+import sys
+import tempfile
+import unittest
+
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from enforce_security_baseline import (  # noqa: E402
+    RepoRecord,
+    iter_repos_with_security,
+    iter_snapshot_repos,
+    process_repo,
+)
+from fake_github import FakeGitHubServer, SyntheticOrg  # noqa: E402
+from github_client import GitHubClient, HttpTransport, OfflineTransport  # noqa: E402
+from org_snapshot import capture_org  # noqa: E402
+from repo_metadata_audit import (  # noqa: E402
+    audit_repos,
+    compile_policy,
+    iter_repository_pages,
+    iter_targets,
+    load_policy,
+    snapshot_pages,
+)
+from snapshot_io import Snapshot, load_snapshot, write_snapshot  # noqa: E402
+
+POLICY_PATH = ROOT.parent / "config" / "repo-metadata-policy.json"
+
+
+class OrgSnapshotTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.server = FakeGitHubServer(SyntheticOrg("acme", 40, seed=7))
+        cls.server.start()
+        cls.transport = HttpTransport(cls.server.url, "token")
+        cls.live = GitHubClient(cls.transport)
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.path = str(Path(cls.tmp.name) / "snapshot.json.gz")
+        captured = {"acme": capture_org(cls.live, "acme", 4)}
+        write_snapshot(cls.path, Snapshot("2026-01-01T00:00:00+00:00", captured))
+        cls.snapshot = load_snapshot(cls.path)
+        cls.offline = GitHubClient(OfflineTransport())
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.transport.close()
+        cls.server.stop()
+        cls.tmp.cleanup()
+
+    def test_audit_from_snapshot_matches_live_audit_without_requests(self) -> None:
+        policy = compile_policy(load_policy(str(POLICY_PATH)))
+
+        def audit(client: GitHubClient, pages: Iterable[list]) -> list[tuple[str, list[str], list[str]]]:
+            targets = iter_targets(pages, "all", set())
+            results = audit_repos(client, "acme", targets, policy, 4)
+            return [(result.name, result.violations, result.warnings) for result in results]
+
+        live = audit(self.live, iter_repository_pages(self.live, "acme"))
+        offline = audit(self.offline, snapshot_pages(self.snapshot, "acme"))
+
+        self.assertEqual(40, len(offline))
+        self.assertEqual(live, offline)
+        codes = [code for _, violations, _ in offline for code in violations]
+        self.assertFalse(any(code.startswith("fetch_failed") for code in codes))
+
+    def test_baseline_plan_from_snapshot_matches_live_plan(self) -> None:
+        def plan(client: GitHubClient, repos: Iterable[RepoRecord]) -> list[tuple[str, list[str], list[str]]]:
+            runs = [process_repo(client, "acme", repo, None, "plan") for repo in repos]
+            return [(run.name, run.details, run.errors) for run in runs]
+
+        live = plan(self.live, iter_repos_with_security(self.live, "acme"))
+        offline = plan(self.offline, iter_snapshot_repos(self.snapshot, "acme"))
+
+        self.assertEqual(live, offline)
+        self.assertTrue(all(not errors for _, _, errors in offline))
+
+    def test_unknown_org_is_reported(self) -> None:
+        with self.assertRaisesRegex(ValueError, "snapshot has no org 'other'"):
+            snapshot_pages(self.snapshot, "other")
+
+
+if __name__ == "__main__":
+    unittest.main()
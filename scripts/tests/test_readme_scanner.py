@@ -0,0 +1,79 @@
+from pathlib import Path
+import sys
+import unittest
+
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from readme_scanner import MultiPatternMatcher, ReadmeRules, ReadmeScanner, scan_readme  # noqa: E402
+
+
+class ReadmeScannerTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.rules = ReadmeRules(
+            need_title=True,
+            badge_target=1,
+            section_groups=(("what it does", "overview"), ("quick start", "usage")),
+            groups_target=2,
+            needles=("MIT License",),
+        )
+        self.readme = "\n".join(
+            [
+                "",
+                "# Demo",
+                "[![CI](https://img.shields.io/badge/ci-green)](https://example.com)",
+                "## Overview",
+                "## Usage Guide",
+                "Released under the MIT",
+                "License.",
+            ]
+        )
+
+    def test_matcher_reports_patterns_nested_in_longer_matches(self) -> None:
+        matcher = MultiPatternMatcher(["testing and ci", "testing", "ci", "quality"])
+        self.assertEqual({"testing and ci", "testing", "ci"}, matcher.search("unit testing and ci"))
+        self.assertEqual(set(), MultiPatternMatcher([]).search("anything"))
+        self.assertEqual({"", "ci"}, MultiPatternMatcher(["", "ci"]).search("ci"))
+        self.assertEqual({""}, MultiPatternMatcher([""]).search("anything"))
+
+    def test_empty_section_candidate_matches_any_heading(self) -> None:
+        rules = ReadmeRules(section_groups=(("", "never"),), groups_target=1)
+        self.assertEqual(0, scan_readme("# Demo\nNo sections.\n", rules).groups_matched(rules.section_groups))
+        self.assertEqual(1, scan_readme("# Demo\n## Anything\n", rules).groups_matched(rules.section_groups))
+
+    def test_badges_with_alt_text_spanning_lines_are_counted(self) -> None:
+        rules = ReadmeRules(badge_target=3)
+        readme = (
+            "# Demo\n"
+            "![build\nstatus](https://img.shields.io/badge/build-ok) ![a](https://img.shields.io/a) ![cover\n"
+            "age](https://img.shields.io/c)\n"
+            "![not a badge](https://example.com/x.png)\n"
+        )
+        self.assertEqual(3, scan_readme(readme, rules).badge_count)
+        self.assertEqual(0, scan_readme("# Demo\n![unclosed\n" + "x" * 2000 + "\n", rules).badge_count)
+
+    def test_scan_collects_all_rule_facts_in_one_pass(self) -> None:
+        facts = scan_readme(self.readme.replace("MIT\n", "MIT "), self.rules)
+        self.assertEqual("# Demo", facts.title_line)
+        self.assertEqual(1, facts.badge_count)
+        self.assertEqual({"overview", "usage"}, facts.matched_candidates)
+        self.assertEqual({"MIT License"}, facts.found_needles)
+
+    def test_chunked_feed_matches_needles_across_chunk_boundaries(self) -> None:
+        text = self.readme.replace("MIT\n", "MIT ")
+        scanner = ReadmeScanner(self.rules)
+        for start in range(0, len(text), 7):
+            scanner.feed(text[start : start + 7])
+        self.assertEqual(scan_readme(text, self.rules), scanner.finish())
+
+    def test_scanner_stops_once_every_rule_is_decided(self) -> None:
+        scanner = ReadmeScanner(ReadmeRules(need_title=True, badge_target=0))
+        scanner.feed("# Demo\n")
+        self.assertTrue(scanner.done)
+        scanner.feed("## Overview\n")
+        self.assertEqual(set(), scanner.finish().matched_candidates)
+
+
+if __name__ == "__main__":
+    unittest.main()
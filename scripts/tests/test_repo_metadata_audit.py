@@ -1,12 +1,33 @@
 from pathlib import Path
 import sys
 import unittest
+from unittest import mock
 
 
 ROOT = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(ROOT))
 
-from repo_metadata_audit import RepoRecord, evaluate_repo, include_repo  # noqa: E402
+import repo_metadata_audit  # noqa: E402
+from repo_metadata_audit import (  # noqa: E402
+    PageSizer,
+    PreviousReport,
+    ReadmeFetch,
+    RepoRecord,
+    audit_repo,
+    audit_repos,
+    compile_matrix,
+    compile_policy,
+    evaluate_repo,
+    include_repo,
+    policy_fingerprints,
+    record_from_node,
+    result_from_dict,
+    result_to_dict,
+)
+from readme_scanner import ReadmeFacts  # noqa: E402
+from report_io import METADATA_AUDIT, summarize_results  # noqa: E402
+
+NO_README = ReadmeFetch(False, 0, ReadmeFacts())
 
 
 class RepoMetadataAuditTests(unittest.TestCase):
@@ -30,6 +51,10 @@ class RepoMetadataAuditTests(unittest.TestCase):
                 "min_required_groups_matched": 2,
             },
         }
+        self.compiled = compile_policy(self.policy)
+        # Private repos need labels and a README under this variant, so fetch paths are exercised.
+        fetching = dict(self.policy, required_labels=["bug"], readme_minimum={"require_title": True})
+        self.fetching = compile_policy(fetching)
 
     def test_include_repo_respects_visibility_and_exclusions(self) -> None:
         public = RepoRecord("demo", False, "desc", "https://example.com/demo", [])
@@ -128,6 +153,217 @@ class RepoMetadataAuditTests(unittest.TestCase):
         self.assertTrue(result.compliant)
         self.assertEqual([], result.warnings)
 
+    def test_audit_repos_keeps_order_and_isolates_fetch_errors(self) -> None:
+        targets = [
+            RepoRecord(f"repo-{index}", True, "", f"https://example.com/repo-{index}", [])
+            for index in range(6)
+        ]
+
+        def fake_labels(client: object, org: str, repo: str) -> list[str]:
+            if repo == "repo-3":
+                raise RuntimeError("HTTP 502: Bad Gateway\n(retry later)")
+            return ["bug"]
+
+        with mock.patch.object(repo_metadata_audit, "fetch_labels", fake_labels), mock.patch.object(
+            repo_metadata_audit, "fetch_readme", return_value=NO_README
+        ):
+            results = list(audit_repos(None, "org", targets, self.fetching, concurrency=4))
+
+        self.assertEqual([record.name for record in targets], [result.name for result in results])
+        self.assertEqual(
+            ["fetch_failed:HTTP 502: Bad Gateway (retry later)"],
+            results[3].violations,
+        )
+        self.assertTrue(all(result.compliant for index, result in enumerate(results) if index != 3))
+
+    def test_record_from_bulk_node_carries_labels_and_readme(self) -> None:
+        node = {
+            "name": "demo",
+            "isPrivate": False,
+            "description": None,
+            "url": "https://example.com/demo",
+            "repositoryTopics": {"nodes": [{"topic": {"name": "shpit"}}]},
+            "labels": {"nodes": [{"name": "bug"}]},
+            "readme": {"text": "# Demo", "isBinary": False, "isTruncated": False},
+        }
+        record = record_from_node(node)
+        self.assertEqual(["bug"], record.labels)
+        self.assertEqual("# Demo", record.readme_text)
+
+        node["readme"] = None
+        self.assertIsNone(record_from_node(node).readme_text)
+        del node["labels"]
+        self.assertIsNone(record_from_node(node).labels)
+
+        node["labels"] = {"totalCount": 101, "nodes": [{"name": "bug"}]}
+        self.assertIsNone(record_from_node(node).labels)
+
+    def test_page_sizer_follows_node_budget_latency_and_connection_sizes(self) -> None:
+        self.assertEqual(99, PageSizer(100).page_size)
+        sizer = PageSizer(50, connections=2)
+        self.assertEqual((49, 100), (sizer.page_size, sizer.connection_size))
+        sizer.observe(0.2, 12)
+        self.assertEqual((73, 20), (sizer.page_size, sizer.connection_size))
+        sizer.observe(0.2, 60)
+        self.assertEqual((82, 60), (sizer.page_size, sizer.connection_size))
+        sizer.observe(8.0, 3)
+        self.assertEqual(41, sizer.page_size)
+        sizer.observe(0.2, 0)
+        self.assertEqual(61, sizer.page_size)
+
+        self.assertTrue(sizer.shrink())
+        self.assertEqual(30, sizer.page_size)
+        sizer.observe(0.2, 0)
+        self.assertEqual(45, sizer.page_size)
+        sizer.observe(0.2, 0)
+        self.assertEqual(60, sizer.page_size)
+        sizer.observe(0.2, 0)
+        self.assertEqual(60, sizer.page_size)
+        while sizer.page_size > 10:
+            self.assertTrue(sizer.shrink())
+        self.assertEqual(60, sizer.connection_size)
+        while sizer.connection_size > 10:
+            self.assertTrue(sizer.shrink())
+        self.assertEqual((10, 10), (sizer.page_size, sizer.connection_size))
+        self.assertFalse(sizer.shrink())
+
+    def test_audit_repo_uses_prefetched_data_and_falls_back_for_readme(self) -> None:
+        record = RepoRecord("demo", True, "", "https://example.com/demo", [], labels=["bug"])
+        with mock.patch.object(repo_metadata_audit, "fetch_labels") as fetch_labels, mock.patch.object(
+            repo_metadata_audit, "fetch_readme", return_value=ReadmeFetch(True, 6, ReadmeFacts("# Demo"))
+        ) as fetch_readme:
+            result = audit_repo(None, "org", record, self.fetching)
+        fetch_labels.assert_not_called()
+        rules = self.fetching.private
+        fetch_readme.assert_called_once_with(None, "org", "demo", rules.readme_rules, rules.readme_byte_cap)
+        self.assertEqual(["bug"], result.labels)
+        self.assertTrue(result.readme_present)
+        self.assertEqual(6, result.readme_bytes)
+
+    def test_since_report_reuses_unchanged_repos_only(self) -> None:
+        unchanged = RepoRecord(
+            "unchanged", True, "", "https://example.com/unchanged", [], pushed_at="t1", updated_at="t1"
+        )
+        pushed = RepoRecord(
+            "pushed", True, "", "https://example.com/pushed", [], pushed_at="t2", updated_at="t1"
+        )
+        prior_results = {}
+        for record in (unchanged, pushed):
+            prior = evaluate_repo(record, ["bug"], False, "", self.policy)
+            prior.pushed_at, prior.updated_at = "t1", "t1"
+            prior.skipped_fetches = ["readme"]
+            prior_results[f"org/{record.name}"] = result_to_dict(prior)
+        previous = PreviousReport(results=prior_results, reusable_visibilities={"private"})
+
+        with mock.patch.object(
+            repo_metadata_audit, "fetch_labels", return_value=[]
+        ) as fetch_labels, mock.patch.object(repo_metadata_audit, "fetch_readme", return_value=NO_README):
+            results = list(audit_repos(None, "org", [unchanged, pushed], self.fetching, 1, previous))
+
+        fetch_labels.assert_called_once_with(None, "org", "pushed")
+        self.assertEqual(["bug"], results[0].labels)
+        self.assertEqual([], results[1].labels)
+        self.assertEqual([True, False], [result.reused for result in results])
+        summary = summarize_results(METADATA_AUDIT, [result_to_dict(result) for result in results])
+        self.assertEqual([], results[1].skipped_fetches)
+        self.assertEqual((1, 0), (summary["reused_results"], summary["skipped_fetches"]))
+
+    def test_multi_org_targets_fetch_and_reuse_per_org(self) -> None:
+        in_a, in_b = (
+            RepoRecord("demo", True, "", f"https://x/{org}", [], pushed_at="t1", updated_at="t1", org=org)
+            for org in ("a", "b")
+        )
+        prior = result_to_dict(evaluate_repo(in_a, ["bug"], False, "", self.policy))
+        previous = PreviousReport(results={"a/demo": prior}, reusable_visibilities={"private"})
+
+        with mock.patch.object(
+            repo_metadata_audit, "fetch_labels", return_value=[]
+        ) as fetch_labels, mock.patch.object(repo_metadata_audit, "fetch_readme", return_value=NO_README):
+            results = list(audit_repos(None, "", [in_a, in_b], self.fetching, 2, previous))
+
+        fetch_labels.assert_called_once_with(None, "b", "demo")
+        self.assertEqual(["a", "b"], [result.org for result in results])
+        self.assertEqual(["bug"], results[0].labels)
+
+    def test_fetch_plan_skips_sources_the_policy_does_not_use(self) -> None:
+        private = RepoRecord("internal", True, "", "https://example.com/internal", [])
+        public = RepoRecord("demo", False, "", "https://example.com/demo", [])
+        policy = compile_policy(dict(self.policy, public_warn_labels=["shpit"]))
+        self.assertEqual((False, False), (policy.private.needs_labels, policy.private.needs_readme))
+        self.assertEqual((True, True), (policy.public.needs_labels, policy.public.needs_readme))
+
+        with mock.patch.object(
+            repo_metadata_audit, "fetch_labels", return_value=[]
+        ) as fetch_labels, mock.patch.object(repo_metadata_audit, "fetch_readme", return_value=NO_README):
+            skipped, fetched = audit_repos(None, "org", [private, public], policy, 1)
+
+        fetch_labels.assert_called_once_with(None, "org", "demo")
+        self.assertEqual(["labels", "readme"], skipped.skipped_fetches)
+        self.assertTrue(skipped.compliant)
+        self.assertEqual(([], False, 0), (skipped.labels, skipped.readme_present, skipped.readme_bytes))
+        self.assertEqual(skipped, result_from_dict(result_to_dict(skipped)))
+        self.assertEqual([], fetched.skipped_fetches)
+        self.assertIn("missing_readme", fetched.violations)
+
+    def test_policy_matrix_fetches_once_and_matches_separate_evaluations(self) -> None:
+        stricter = dict(self.policy, policy_name="stricter")
+        stricter["public_readme_minimum"] = dict(
+            self.policy["public_readme_minimum"], min_badges=2, min_required_groups_matched=3
+        )
+        policies = [compile_policy(dict(self.policy, policy_name="current")), compile_policy(stricter)]
+        matrix = compile_matrix(policies)
+        readme = (
+            "# Demo\n![ci](https://img.shields.io/badge/ci-passing-green)\n"
+            "## Overview\nText\n## Usage\nRun it\n"
+        )
+        prefetched = RepoRecord("demo", False, "", "https://example.com/demo", ["a", "b", "c"], [], readme)
+        fetched = RepoRecord("other", False, "", "https://example.com/other", ["a", "b", "c"], [])
+
+        with mock.patch.object(repo_metadata_audit, "fetch_readme", return_value=NO_README) as fetch_readme:
+            results = list(audit_repos(None, "org", [prefetched, fetched], matrix, 1))
+
+        fetch_readme.assert_called_once()
+        self.assertEqual(3, fetch_readme.call_args.args[3].groups_target)
+        demo = results[0]
+        self.assertEqual(["current", "stricter"], list(demo.policy_results))
+        for policy in policies:
+            expected = evaluate_repo(prefetched, [], True, readme, policy)
+            self.assertEqual(expected.violations, demo.policy_results[policy.name]["violations"])
+        self.assertEqual([], demo.policy_results["current"]["violations"])
+        self.assertEqual(
+            ["readme_badges_below_min:1<2", "readme_section_groups_below_min:2<3"],
+            demo.policy_results["stricter"]["violations"],
+        )
+        self.assertEqual(demo.violations, demo.policy_results["current"]["violations"])
+        self.assertIn("policies", result_to_dict(demo))
+        single = evaluate_repo(prefetched, [], True, readme, self.compiled)
+        self.assertNotIn("policies", result_to_dict(single))
+        with self.assertRaisesRegex(ValueError, "unique"):
+            compile_matrix([self.compiled, self.compiled])
+
+    def test_compiled_policy_precomputes_rules_per_visibility(self) -> None:
+        policy = dict(self.policy, required_labels=["bug", "bug"], public_required_labels=["docs"])
+        compiled = compile_policy(policy)
+        self.assertEqual(("bug", "docs"), compiled.public.required_labels)
+        self.assertEqual(("bug",), compiled.private.required_labels)
+        self.assertIsNone(compiled.private.readme_minimum)
+        public_minimum = compiled.public.readme_minimum
+        assert public_minimum is not None
+        self.assertEqual(("what it does", "overview", "what is"), public_minimum.section_groups[0])
+
+        record = RepoRecord("demo", False, "", "https://example.com/demo", ["shpit"])
+        self.assertEqual(
+            evaluate_repo(record, ["bug"], False, "", policy),
+            evaluate_repo(record, ["bug"], False, "", compiled),
+        )
+
+    def test_policy_fingerprints_scope_changes_by_visibility(self) -> None:
+        original = policy_fingerprints(self.policy)
+        stricter_public = dict(self.policy, public_min_topics=5)
+        changed = policy_fingerprints(stricter_public)
+        self.assertEqual(original["private"], changed["private"])
+        self.assertNotEqual(original["public"], changed["public"])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,152 @@
+from pathlib import Path
+import json
+import sys
+import tempfile
+import unittest
+
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from report_io import (  # noqa: E402
+    METADATA_AUDIT,
+    SECURITY_BASELINE,
+    NdjsonReportWriter,
+    build_report,
+    merge_reports,
+    read_ndjson_report,
+    summarize_results,
+    write_json_report,
+)
+
+
+class NdjsonReportTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = str(Path(self.tmp.name) / "report.ndjson")
+        self.header = {"org": "acme", "policy_name": "default", "visibility": "all"}
+        self.results = [
+            {"name": "one", "violations": [], "warnings": ["description_too_short"]},
+            {"name": "two", "violations": ["missing_topics"], "warnings": []},
+        ]
+
+    def test_round_trip_matches_json_report_shape(self) -> None:
+        summary = {"checked_repositories": 2, "non_compliant_count": 1, "warning_count": 1}
+        writer = NdjsonReportWriter(self.path, METADATA_AUDIT, self.header)
+        for result in self.results:
+            writer.write_result(result)
+        writer.close(summary)
+
+        report, payload = read_ndjson_report(self.path)
+
+        self.assertEqual(METADATA_AUDIT, report)
+        self.assertEqual(build_report(self.header, summary, self.results), payload)
+        lines = Path(self.path).read_text(encoding="utf-8").splitlines()
+        kinds = [json.loads(line)["type"] for line in lines]
+        self.assertEqual(["header", "result", "result", "summary"], kinds)
+
+    def test_interrupted_report_recomputes_counts_and_drops_torn_line(self) -> None:
+        writer = NdjsonReportWriter(self.path, METADATA_AUDIT, self.header)
+        for result in self.results:
+            writer.write_result(result)
+        writer.handle.write('{"type": "result", "result": {"na')
+        writer.handle.close()
+
+        _, payload = read_ndjson_report(self.path)
+
+        self.assertTrue(payload["incomplete"])
+        self.assertEqual(2, payload["checked_repositories"])
+        self.assertEqual(1, payload["non_compliant_count"])
+        self.assertEqual(1, payload["warning_count"])
+        self.assertEqual(self.results, payload["results"])
+
+    def test_baseline_summary_lists_failed_repositories(self) -> None:
+        writer = NdjsonReportWriter(self.path, SECURITY_BASELINE, {"org": "acme", "mode": "apply"})
+        writer.write_result({"name": "one", "success": True})
+        writer.write_result({"name": "two", "success": False})
+        writer.handle.close()
+
+        report, payload = read_ndjson_report(self.path)
+
+        self.assertEqual(SECURITY_BASELINE, report)
+        self.assertEqual(["two"], payload["failed_repositories"])
+
+
+class MergeReportsTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.header = {"org": "acme", "orgs": ["acme"], "policy_name": "default", "visibility": "all"}
+
+    def shard(self, spec: str, results: list[dict[str, object]], ndjson: bool = False) -> str:
+        header = dict(self.header, shard=spec)
+        path = str(Path(self.tmp.name) / f"shard-{spec[0]}.{'ndjson' if ndjson else 'json'}")
+        if ndjson:
+            writer = NdjsonReportWriter(path, METADATA_AUDIT, header)
+            for result in results:
+                writer.write_result(result)
+            writer.close({"checked_repositories": len(results), "profile": {"calls": len(results)}})
+        else:
+            write_json_report(path, build_report(header, {"checked_repositories": len(results)}, results))
+        return path
+
+    def test_json_and_ndjson_shards_merge_with_recomputed_totals(self) -> None:
+        first = self.shard(
+            "1/2",
+            [
+                {"name": "zeta", "org": "acme", "violations": ["missing_readme"], "warnings": ["w"]},
+                {"name": "alpha", "org": "acme", "violations": [], "warnings": []},
+            ],
+        )
+        mid = {"name": "mid", "org": "acme", "violations": ["missing_topic:x"], "warnings": ["w", "v"]}
+        second = self.shard("2/2", [mid], ndjson=True)
+
+        merged = merge_reports([first, second])
+
+        self.assertEqual(["alpha", "mid", "zeta"], [result["name"] for result in merged["results"]])
+        totals = {"checked_repositories": 3, "non_compliant_count": 2, "warning_count": 3}
+        self.assertEqual(totals, {key: merged[key] for key in totals})
+        self.assertEqual(totals, merged["org_summaries"]["acme"])
+        self.assertEqual(["1/2", "2/2"], merged["shards"])
+        self.assertNotIn("shard", merged)
+        self.assertNotIn("profile", merged)
+        self.assertEqual([{"shard": "2/2", "profile": {"calls": 1}}], merged["shard_profiles"])
+        self.assertNotIn("incomplete", merged)
+
+    def test_missing_shards_are_flagged_and_mismatched_runs_rejected(self) -> None:
+        first = self.shard("1/3", [{"name": "one", "org": "acme", "violations": [], "warnings": []}])
+        self.assertTrue(merge_reports([first])["incomplete"])
+
+        self.header["policy_name"] = "other"
+        second = self.shard("2/3", [])
+        with self.assertRaisesRegex(ValueError, "header differs .* in policy_name"):
+            merge_reports([first, second])
+
+    def test_empty_multi_policy_shard_merges(self) -> None:
+        names = ["default", "strict"]
+        verdicts = {
+            "default": {"violations": [], "warnings": []},
+            "strict": {"violations": ["x"], "warnings": []},
+        }
+        row = {"name": "one", "org": "acme", "violations": [], "warnings": [], "policies": verdicts}
+        paths = []
+        for spec, results in (("1/2", [row]), ("2/2", [])):
+            path = str(Path(self.tmp.name) / f"shard-{spec[0]}.json")
+            summary = summarize_results(METADATA_AUDIT, results)
+            # The audit writes zero counts for every policy even when its shard has no repos.
+            summary.setdefault(
+                "policy_summaries", {name: {"non_compliant_count": 0, "warning_count": 0} for name in names}
+            )
+            header = dict(self.header, shard=spec, policy_names=names)
+            write_json_report(path, build_report(header, summary, results))
+            paths.append(path)
+
+        merged = merge_reports(paths)
+
+        self.assertEqual(1, merged["policy_summaries"]["strict"]["non_compliant_count"])
+        self.assertEqual(["1/2", "2/2"], merged["shards"])
+
+
+if __name__ == "__main__":
+    unittest.main()
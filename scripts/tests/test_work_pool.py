@@ -0,0 +1,64 @@
+from pathlib import Path
+import argparse
+import sys
+import threading
+import time
+import unittest
+
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from work_pool import in_shard, ordered_map, parse_shard, round_robin  # noqa: E402
+
+
+class OrderedMapTests(unittest.TestCase):
+    def test_results_keep_input_order_under_concurrency(self) -> None:
+        def slow_square(value: int) -> int:
+            time.sleep(0.01 * (5 - value % 5))
+            return value * value
+
+        self.assertEqual([value * value for value in range(20)], list(ordered_map(slow_square, range(20), 4)))
+
+    def test_input_is_pulled_lazily_within_a_bounded_window(self) -> None:
+        pulled: list[int] = []
+        lock = threading.Lock()
+
+        def source() -> object:
+            for value in range(1000):
+                with lock:
+                    pulled.append(value)
+                yield value
+
+        results = ordered_map(lambda value: value, source(), 2)
+        self.assertEqual(0, next(results))
+        self.assertLessEqual(len(pulled), 5)
+        results.close()
+
+
+
+class RoundRobinTests(unittest.TestCase):
+    def test_interleaves_streams_until_all_are_exhausted(self) -> None:
+        streams = [iter("abc"), iter(""), iter("de")]
+        self.assertEqual(["a", "d", "b", "e", "c"], list(round_robin(streams)))
+
+
+class ShardTests(unittest.TestCase):
+    def test_every_repo_lands_in_exactly_one_stable_shard(self) -> None:
+        names = [f"acme/repo-{n:05d}" for n in range(400)]
+        shards = [[name for name in names if in_shard(name, (index, 4))] for index in range(1, 5)]
+
+        self.assertEqual(sorted(names), sorted(name for shard in shards for name in shard))
+        self.assertTrue(all(60 < len(shard) < 140 for shard in shards))
+        self.assertEqual(in_shard("ACME/Repo-00000", (1, 4)), in_shard("acme/repo-00000", (1, 4)))
+        self.assertTrue(all(in_shard(name, None) for name in names))
+
+    def test_shard_spec_is_one_based(self) -> None:
+        self.assertEqual((2, 4), parse_shard("2/4"))
+        for value in ("0/4", "5/4", "2", "a/b"):
+            with self.assertRaises(argparse.ArgumentTypeError):
+                parse_shard(value)
+
+
+if __name__ == "__main__":
+    unittest.main()
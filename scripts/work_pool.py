@@ -0,0 +1,76 @@
+"""Bounded, order-preserving parallel map, stream interleaving and sharding shared by the org scripts."""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TypeVar
+
+Item = TypeVar("Item")
+Result = TypeVar("Result")
+
+
+def ordered_map(
+    function: Callable[[Item], Result],
+    items: Iterable[Item],
+    concurrency: int,
+) -> Iterator[Result]:
+    if concurrency <= 1:
+        for item in items:
+            yield function(item)
+        return
+
+    window = concurrency * 2
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        pending: deque[Future[Result]] = deque()
+        for item in items:
+            pending.append(executor.submit(function, item))
+            if len(pending) >= window:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def round_robin(streams: Iterable[Iterable[Item]]) -> Iterator[Item]:
+    active = deque(iter(stream) for stream in streams)
+    while active:
+        stream = active.popleft()
+        try:
+            item = next(stream)
+        except StopIteration:
+            continue
+        yield item
+        active.append(stream)
+
+
+def parse_shard(value: str) -> tuple[int, int]:
+    index, _, count = value.partition("/")
+    try:
+        shard = (int(index), int(count))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected i/N, got {value!r}") from None
+    if not 1 <= shard[0] <= shard[1]:
+        raise argparse.ArgumentTypeError(f"shard index must be between 1 and N, got {value!r}")
+    return shard
+
+
+def add_shard_argument(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--shard",
+        type=parse_shard,
+        default=None,
+        metavar="i/N",
+        help="Only handle repos whose stable name hash falls in shard i of N (1-based); "
+        "combine the reports with report_io.py merge-reports.",
+    )
+
+
+def in_shard(full_name: str, shard: tuple[int, int] | None) -> bool:
+    if shard is None:
+        return True
+    # sha256 rather than hash(): string hashing is salted per process, shards must agree across runners.
+    digest = hashlib.sha256(full_name.lower().encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % shard[1] == shard[0] - 1